@@ -2,10 +2,23 @@ import dash
 from dash import dcc, html, Input, Output, State, ctx, dash_table
 import flask
 import uuid
-from db import mysql_utils, mongodb_utils, neo4j_utils
-from db.neo4j_utils import get_citation_trend_by_keyword
+from db import (
+    cache_warmer,
+    clients,
+    comparison,
+    favorites,
+    figures,
+    instrumentation,
+    keyword_index,
+    mysql_utils,
+    neo4j_utils,
+    related_keywords,
+    search,
+    search_stats,
+    tracing,
+    university_index,
+)
 import dash_bootstrap_components as dbc
-import plotly.graph_objs as go
 
 # Flask server for session management
 server = flask.Flask(__name__)
@@ -16,6 +29,14 @@ server.secret_key = "your-secret-key"  # For session cookies
 app = dash.Dash(__name__, server=server, external_stylesheets=[dbc.themes.BOOTSTRAP])
 app.title = "Discover Research Across Universities"
 
+PUBLICATION_PAGE_SIZE = 10
+RELATED_KEYWORDS_SHOWN = 8
+MAX_COMPARED_UNIVERSITIES = 8
+
+# Server-Timing headers on every response, and TRACE_FILE for offline
+# flame graphs
+if tracing.TRACING_ENABLED:
+    tracing.install(server)
 
 # Setup session ID
 @app.server.before_request
@@ -25,6 +46,47 @@ def make_session_permanent():
         flask.session["session_id"] = str(uuid.uuid4())
 
 
+# Precompute the most-searched keywords' results in the background so the
+# first searches after a deploy hit a warm cache. Started by the first
+# request each server process handles, not on import, so scripts and tests
+# that import the app start no thread.
+@app.server.before_request
+def start_cache_warmer():
+    if cache_warmer.WARM_ON_STARTUP:
+        cache_warmer.warmer.start()
+
+
+# Liveness/readiness probes. Database clients are created lazily, so the app
+# starts and serves pages even if a backend is down.
+@server.route("/healthz")
+def healthz():
+    return flask.jsonify(clients.registry.liveness())
+
+
+@server.route("/readyz")
+def readyz():
+    status = clients.registry.readiness()
+    return flask.jsonify(status), 200 if status["ready"] else 503
+
+
+# Query latency, rows and errors per database helper, plus pool and cache
+# counters, for Prometheus to scrape
+@server.route("/metrics")
+def metrics():
+    return flask.Response(
+        instrumentation.render_prometheus(),
+        mimetype="text/plain; version=0.0.4; charset=utf-8",
+    )
+
+
+# Favorites of the current session with their stats, as JSON
+@server.route("/api/favorites")
+def favorites_summary():
+    session_id = flask.session.get("session_id")
+    favs = favorites.service.get(session_id)
+    return flask.jsonify(favorites.get_favorite_summaries(favs))
+
+
 # Layout
 app.layout = html.Div(
     [
@@ -85,66 +147,217 @@ app.layout = html.Div(
 )
 
 
-# Callback for MySQL keyword search
+# Callback for keyword search. It fetches only the MySQL rankings and hands
+# the resolved keywords to update_citation_trend through the trend-keywords
+# store, so a slow Neo4j never holds up the charts. The graphs and table live
+# in the layout, so only their data is sent back.
 @app.callback(
-    Output("university-output", "children"),
-    Output("professor-output", "children"),
-    Output("publication-output", "children"),
+    Output("search-message", "children"),
+    Output("university-graph", "figure"),
+    Output("professor-graph", "figure"),
+    Output("search-state", "data"),
+    Output("publication-table", "page_current"),
+    Output("trend-keywords", "data"),
     Input("search-button", "n_clicks"),
     State("keyword-input", "value"),
 )
+@tracing.traced
 def update_results(n_clicks, keyword):
-    try:
-        if not keyword:
-            raise ValueError("Please enter a keyword.")
-
-        keyword = keyword.strip().lower()
-        results = mysql_utils.run_all_keyword_queries_transactional(keyword)
-
-    except ValueError as e:
-        return html.Div(str(e), style={"color": "red"}), "", ""
-
-    # BAR CHART: Universities
-    uni_fig = {
-        "data": [
-            go.Bar(
-                x=[name for name, _ in results["universities"]],
-                y=[score for _, score in results["universities"]],
-                marker_color="indigo",
-            )
-        ],
-        "layout": go.Layout(
-            margin={"t": 30, "b": 70}, height=250, title="", xaxis={"tickangle": -30}
-        ),
-    }
+    empty = figures.xy_patch([], [])
+    if not keyword:
+        return (
+            html.Div("Please enter a keyword.", style={"color": "red"}),
+            empty,
+            empty,
+            None,
+            0,
+            None,
+        )
 
-    # BAR CHART: Professors
-    prof_fig = {
-        "data": [
-            go.Bar(
-                x=[name for name, _ in results["professors"]],
-                y=[score for _, score in results["professors"]],
-                marker_color="darkgreen",
-            )
-        ],
-        "layout": go.Layout(
-            margin={"t": 30, "b": 70}, height=250, title="", xaxis={"tickangle": -30}
-        ),
+    # "machine learning, robotics:2" searches several keywords at once
+    result = search.search_keywords(keyword, sources=("rankings",))
+    match = result["match"]
+    matches = result.get("matches") or ([match] if match is not None else [])
+    trend_keywords = [m.name for m in matches] or [result["keyword"]]
+
+    error = result["errors"].get("rankings")
+    if isinstance(error, ValueError):
+        # Nothing was found, so there is no trend to fetch either
+        message = html.Div(str(error), style={"color": "red"})
+        return message, empty, empty, None, 0, []
+    if isinstance(error, (RuntimeError, search.SourceTimeout)):
+        message = html.Div(str(error), style={"color": "red"})
+        return message, empty, empty, None, 0, trend_keywords
+    if error is not None:
+        raise error
+    results = result["results"]["rankings"]
+
+    message = ""
+    search_stats.stats.record(*(m.name for m in matches))
+    if "matches" in result:
+        weights = result["weights"]
+        message = html.Small(
+            "Ranking by "
+            + " + ".join(f"{weights[m.name]:g} × {m.name}" for m in result["matches"]),
+            className="text-muted",
+        )
+    elif match is not None and not match.exact:
+        message = html.Small(
+            f"Showing results for '{match.name}'", className="text-muted"
+        )
+
+    with tracing.span("rankings figures", "figure"):
+        universities = figures.ranking_patch(results["universities"])
+        professors = figures.ranking_patch(results["professors"])
+
+    # The publications table pages through the full ranking on its own; a
+    # multi-keyword search hands it the weighted top publications instead
+    state = {
+        "keyword": result["keyword"],
+        "keyword_id": match.keyword_id if match is not None else None,
     }
+    if "matches" in result:
+        state["publications"] = results["publications"]
+        state["keyword_ids"] = [m.keyword_id for m in result["matches"]]
+    return message, universities, professors, state, 0, trend_keywords
 
-    # TABLE: Publications
-    pub_table = dash_table.DataTable(
-        columns=[{"name": "Title", "id": "title"}, {"name": "Score", "id": "score"}],
-        data=[
-            {"title": title, "score": f"{score:.2f}"}
-            for title, score in results["publications"]
-        ],
-        style_table={"height": "250px", "overflowY": "auto"},
-        style_cell={"textAlign": "left", "padding": "5px", "whiteSpace": "normal"},
-        style_header={"fontWeight": "bold"},
-    )
 
-    return dcc.Graph(figure=uni_fig), dcc.Graph(figure=prof_fig), pub_table
+# Citation trend of the keywords the last search resolved, fetched from
+# Neo4j after the rankings have been sent
+@app.callback(
+    Output("neo4j-output", "children"),
+    Output("citation-trend-graph", "figure"),
+    Input("trend-keywords", "data"),
+)
+@tracing.traced
+def update_citation_trend(keyword_names):
+    if keyword_names is None:
+        return (
+            html.Div("No keyword provided", style={"color": "gray"}),
+            figures.trends_patch({}),
+        )
+    if not keyword_names:
+        return build_citation_trend({"results": {"citation_trend": []}, "errors": {}})
+    return build_citation_trend(search.citation_trend(keyword_names))
+
+
+# Related keywords from the precomputed neighbor table (related_keywords.py);
+# a memory-mapped lookup, no database query
+@app.callback(
+    Output("related-keywords", "children"),
+    Input("search-state", "data"),
+)
+@tracing.traced
+def update_related_keywords(state):
+    if not state:
+        return ""
+    searched = state.get("keyword_ids") or [state["keyword_id"]]
+    scores = {}
+    try:
+        for keyword_id in searched:
+            if keyword_id is None:
+                continue
+            for related_id, name, score in related_keywords.related.related(
+                keyword_id
+            ):
+                if related_id not in searched:
+                    scores[name] = scores.get(name, 0.0) + score
+    except Exception:
+        # The hint is optional; an unreadable table just shows nothing
+        return ""
+    if not scores:
+        return ""
+    names = sorted(scores, key=lambda name: -scores[name])[:RELATED_KEYWORDS_SHOWN]
+    badges = [
+        dbc.Badge(name, color="light", text_color="dark", className="me-1")
+        for name in names
+    ]
+    return html.Div([html.Small("Related: ", className="text-muted")] + badges)
+
+
+def _publication_page(keyword_id, sort, descending, page, after):
+    # Returns (page index, page) for the requested page, walking forward from
+    # the furthest page with a known cursor. after[i] is the cursor page i
+    # starts after and is extended in place; past the end, the last page is
+    # returned.
+    while True:
+        start = min(page, len(after) - 1)
+        cursor = tuple(after[start]) if after[start] is not None else None
+        result = mysql_utils.get_ranking_page(
+            keyword_id,
+            "publications",
+            sort=sort,
+            descending=descending,
+            after=cursor,
+            limit=PUBLICATION_PAGE_SIZE,
+        )
+        if start == page or result["next"] is None:
+            return start, result
+        after.append(list(result["next"]))
+
+
+# Keyset-paginated publications: each page continues after the last row of
+# the previous one, so deep pages cost the same as the first. The cursors of
+# the pages seen so far are kept in the browser, and the page count covers
+# only the pages reached so far plus the next one, so paging stops at the end.
+@app.callback(
+    Output("publication-table", "data"),
+    Output("publication-table", "page_count"),
+    Output("publication-message", "children"),
+    Output("publication-cursors", "data"),
+    Input("search-state", "data"),
+    Input("publication-table", "page_current"),
+    Input("publication-table", "sort_by"),
+    State("publication-cursors", "data"),
+)
+@tracing.traced
+def update_publication_page(state, page_current, sort_by, cursors):
+    if not state:
+        return [], 1, "", None
+    if "publications" in state:
+        rows = state["publications"] if not page_current else []
+        return figures.publication_rows(rows), 1, "", None
+
+    sort = sort_by[0] if sort_by else {"column_id": "score", "direction": "desc"}
+    column = "name" if sort["column_id"] == "title" else "score"
+    descending = sort["direction"] == "desc"
+    try:
+        keyword_id = state["keyword_id"]
+        if keyword_id is None:
+            keyword_id = mysql_utils.resolve_keyword_id(state["keyword"])
+            if keyword_id is None:
+                return [], 1, "", None
+
+        key = [keyword_id, column, descending]
+        after = cursors["after"] if cursors and cursors["key"] == key else [None]
+        page, result = _publication_page(
+            keyword_id, column, descending, page_current or 0, after
+        )
+    except Exception as e:
+        return [], 1, f"Error loading publications: {str(e)}", None
+
+    with tracing.span("publication rows", "figure"):
+        rows = figures.publication_rows(
+            [(name, score) for _, name, score in result["rows"]]
+        )
+    if result["next"] is not None and len(after) == page + 1:
+        after.append(list(result["next"]))
+    # after holds a cursor for every page known to exist
+    return rows, len(after), "", {"key": key, "after": after}
+
+
+# Keyword autocomplete, served from the in-memory keyword index
+@app.callback(
+    Output("keyword-suggestions", "children"),
+    Input("keyword-input", "value"),
+)
+@tracing.traced
+def update_keyword_suggestions(value):
+    try:
+        suggestions = keyword_index.keywords.suggest(value, limit=10)
+    except Exception:
+        suggestions = []
+    return [html.Option(value=name) for name in suggestions]
 
 
 @app.callback(
@@ -154,63 +367,103 @@ def update_results(n_clicks, keyword):
     State("favorite-type", "value"),
     State("favorite-input", "value"),
 )
+@tracing.traced
 def update_favorites(add_clicks, remove_clicks, category, item):
     session_id = flask.session.get("session_id")
+    message = None
 
-    mongodb_utils.get_or_create_session(session_id)
-
-    if category and item:
-        if ctx.triggered_id == "add-favorite":
-            mongodb_utils.add_favorite(session_id, category, item)
-        elif ctx.triggered_id == "remove-favorite":
-            mongodb_utils.remove_favorite(session_id, category, item)
+    try:
+        # Favorites are saved as resolved ids. One MongoDB round trip per
+        # add/remove; none to re-render a cached session.
+        entry = None
+        changing = ctx.triggered_id in ("add-favorite", "remove-favorite")
+        if category and item and changing:
+            entry = favorites.resolve_favorite(category, item)
+            if entry is None:
+                message = f"No match found for '{item}'."
+                try:
+                    similar = favorites.suggest_favorites(category, item)
+                except Exception:
+                    similar = []
+                if similar:
+                    message += " Did you mean: " + ", ".join(similar) + "?"
+
+        if entry is not None and ctx.triggered_id == "add-favorite":
+            favs = favorites.service.add(session_id, category, entry)
+        elif entry is not None and ctx.triggered_id == "remove-favorite":
+            favs = favorites.service.remove(session_id, category, entry)
+        else:
+            favs = favorites.service.get(session_id)
+
+        summaries = favorites.get_favorite_summaries(favs)
+    except Exception as e:
+        return html.Div(f"Error loading favorites: {str(e)}", style={"color": "red"})
 
-    favs = mongodb_utils.get_favorites(session_id)
-    return html.Div(
-        [
-            html.P("Professors: " + ", ".join(favs.get("professors", []))),
-            html.P("Universities: " + ", ".join(favs.get("universities", []))),
-            html.P("Topics: " + ", ".join(favs.get("topics", []))),
+    with tracing.span("favorites list", "figure"):
+        sections = [
+            ("Professors", "professors", "Top keywords"),
+            ("Universities", "universities", "Top keywords"),
+            ("Topics", "topics", "Top professors"),
         ]
-    )
+        children = [html.P(message, style={"color": "red"})] if message else []
+        for title, category_id, top_label in sections:
+            children.append(html.H6(title, className="mt-2 mb-1"))
+            children.append(
+                html.Ul(
+                    [
+                        build_favorite_item(summary, top_label)
+                        for summary in summaries[category_id]
+                    ],
+                    className="mb-1",
+                )
+            )
+    return html.Div(children)
 
 
-@app.callback(
-    Output("neo4j-output", "children"),
-    Input("search-button", "n_clicks"),
-    State("keyword-input", "value"),
-)
-def update_citation_trend_chart(n_clicks, keyword):
-    if not n_clicks or not keyword:
-        return html.Div("No keyword provided", style={"color": "gray"})
+def build_favorite_item(summary, top_label):
+    if "total_score" not in summary:
+        return html.Li(summary["name"])
+    details = (
+        f"score {summary['total_score']:.1f} · "
+        f"{summary['publications']} publications"
+    )
+    if summary["top"]:
+        details += f" · {top_label}: {', '.join(summary['top'])}"
+    return html.Li(
+        [html.Strong(summary["name"]), " ", html.Small(details, className="text-muted")]
+    )
 
-    try:
-        # Get citation trend data from Neo4j
-        trend_data = get_citation_trend_by_keyword(keyword.strip().lower())
-        if not trend_data:
-            return html.Div(
-                "No citation data found for that keyword.", style={"color": "gray"}
-            )
 
-        # Create a line chart for citation trend
-        fig = go.Figure(
-            data=[
-                go.Scatter(
-                    x=[entry["year"] for entry in trend_data],
-                    y=[entry["totalCitations"] for entry in trend_data],
-                    mode="lines+markers",  # This creates the line with markers on each data point
-                    name="Citations",
-                )
-            ]
+def build_citation_trend(result):
+    # (message, figure update) for the citation trend graph; one line per
+    # keyword for a multi-keyword search
+    error = result["errors"].get("citation_trend")
+    empty = figures.trends_patch({})
+    if isinstance(error, search.SourceTimeout):
+        message = html.Div(
+            "Citation data is taking too long, try again shortly.",
+            style={"color": "gray"},
         )
-        fig.update_layout(xaxis_title="Year", yaxis_title="Total Citations", height=350)
-
-        return dcc.Graph(figure=fig)
-
-    except Exception as e:
-        return html.Div(
-            f"Error fetching citation data: {str(e)}", style={"color": "red"}
+        return message, empty
+    if error is not None:
+        message = html.Div(
+            f"Error fetching citation data: {str(error)}", style={"color": "red"}
         )
+        return message, empty
+
+    trend_data = result["results"]["citation_trend"]
+    if isinstance(trend_data, list):
+        trend_data = {"Citations": trend_data} if trend_data else {}
+    trend_data = {name: trend for name, trend in trend_data.items() if trend}
+    if not trend_data:
+        message = html.Div(
+            "No citation data found for that keyword.", style={"color": "gray"}
+        )
+        return message, empty
+
+    with tracing.span("citation trend figure", "figure"):
+        figure = figures.trends_patch(trend_data)
+    return "", figure
 
 
 @app.callback(
@@ -218,6 +471,7 @@ def update_citation_trend_chart(n_clicks, keyword):
     Input("university-pie-button", "n_clicks"),
     State("university-pie-dropdown", "value"),
 )
+@tracing.traced
 def update_university_pie_chart(n_clicks, university_name):
     if not n_clicks or not university_name:
         return {}
@@ -259,15 +513,75 @@ def update_university_pie_chart(n_clicks, university_name):
         return {"data": [], "layout": {"title": f"Error: {str(e)}"}}
 
 
+# Server-side type-ahead: only the names matching what the user has typed
+# are sent to the browser, served from an in-memory index of universities.
+@app.callback(
+    Output("university-pie-dropdown", "options"),
+    Input("university-pie-dropdown", "search_value"),
+    State("university-pie-dropdown", "value"),
+)
+@tracing.traced
+def load_pie_dropdown_options(search_value, value):
+    try:
+        names = university_index.universities.search(search_value, limit=20)
+    except Exception:
+        names = []
+    if value and value not in names:
+        names = [value] + names
+    return [{"label": name, "value": name} for name in names]
+
+
+@app.callback(
+    Output("university-compare-graph", "figure"),
+    Output("university-similarity-graph", "figure"),
+    Output("university-compare-summary", "children"),
+    Input("university-compare-button", "n_clicks"),
+    State("university-compare-dropdown", "value"),
+)
+@tracing.traced
+def update_university_comparison(n_clicks, university_names):
+    if not n_clicks or not university_names:
+        return {}, {}, ""
+    if len(university_names) < 2:
+        return {}, {}, "Select at least two universities to compare."
+    university_names = university_names[:MAX_COMPARED_UNIVERSITIES]
+
+    try:
+        result = comparison.compare_universities(university_names)
+    except Exception as e:
+        return {}, {}, f"Error: {str(e)}"
+
+    notes = []
+    if result["missing"]:
+        notes.append(f"No keyword data for {', '.join(result['missing'])}.")
+    if len(result["universities"]) < 2:
+        return {}, {}, " ".join(notes) or "Not enough data to compare."
+
+    with tracing.span("comparison figures", "figure"):
+        bars = figures.comparison_figure(result)
+        heatmap = figures.similarity_figure(result)
+    shared = result["shared"]
+    notes.append(
+        f"{len(shared)} keywords shared by all"
+        + (f", led by {', '.join(shared[:5])}." if shared else ".")
+    )
+    return bars, heatmap, " ".join(notes)
+
+
 @app.callback(
-    Output("university-pie-dropdown", "options"), Input("university-pie-dropdown", "id")
+    Output("university-compare-dropdown", "options"),
+    Input("university-compare-dropdown", "search_value"),
+    State("university-compare-dropdown", "value"),
 )
-def load_pie_dropdown_options(_):
+@tracing.traced
+def load_compare_dropdown_options(search_value, value):
     try:
-        universities = neo4j_utils.get_all_universities()
-        return [{"label": name, "value": name} for name in universities]
+        names = university_index.universities.search(search_value, limit=20)
     except Exception:
-        return []
+        names = []
+    selected = value or []
+    names = selected + [name for name in names if name not in selected]
+    return [{"label": name, "value": name} for name in names]
 
 
 app.layout = dbc.Container(
@@ -289,7 +603,7 @@ app.layout = dbc.Container(
                                         ),
                                         dcc.Dropdown(
                                             id="university-pie-dropdown",
-                                            placeholder="Select university",
+                                            placeholder="Type to search universities",
                                             className="mb-2",
                                         ),
                                         dbc.Button(
@@ -322,7 +636,7 @@ app.layout = dbc.Container(
                                         html.H4("Favorites Manager"),
                                         dbc.Input(
                                             id="favorite-input",
-                                            placeholder="Enter professor or university name",
+                                            placeholder="Enter professor, university or topic name",
                                             className="mb-2",
                                         ),
                                         dcc.Dropdown(
@@ -385,7 +699,61 @@ app.layout = dbc.Container(
             ]
         ),
         html.Br(),
-        # Row 2: Keyword search + Top Results
+        # Row 2: University comparison
+        dbc.Row(
+            [
+                dbc.Col(
+                    [
+                        dbc.Card(
+                            [
+                                dbc.CardBody(
+                                    [
+                                        html.H4(
+                                            "Compare University Research Profiles",
+                                            className="mb-3",
+                                        ),
+                                        dcc.Dropdown(
+                                            id="university-compare-dropdown",
+                                            multi=True,
+                                            placeholder="Type to add universities",
+                                            className="mb-2",
+                                        ),
+                                        dbc.Button(
+                                            "Compare",
+                                            id="university-compare-button",
+                                            color="primary",
+                                            className="mb-2",
+                                        ),
+                                        html.Div(
+                                            id="university-compare-summary",
+                                            className="mb-2",
+                                        ),
+                                        dbc.Row(
+                                            [
+                                                dbc.Col(
+                                                    dcc.Graph(
+                                                        id="university-compare-graph"
+                                                    ),
+                                                    md=8,
+                                                ),
+                                                dbc.Col(
+                                                    dcc.Graph(
+                                                        id="university-similarity-graph"
+                                                    ),
+                                                    md=4,
+                                                ),
+                                            ]
+                                        ),
+                                    ]
+                                )
+                            ]
+                        )
+                    ]
+                )
+            ]
+        ),
+        html.Br(),
+        # Row 3: Keyword search + Top Results
         dbc.Row(
             [
                 dbc.Col(
@@ -400,12 +768,23 @@ app.layout = dbc.Container(
                                             type="text",
                                             placeholder="Enter Keyword",
                                             className="form-control mb-2",
+                                            list="keyword-suggestions",
                                         ),
+                                        html.Datalist(id="keyword-suggestions"),
                                         dbc.Button(
                                             "Search",
                                             id="search-button",
                                             color="primary",
                                         ),
+                                        html.Div(
+                                            id="search-message", className="mt-2"
+                                        ),
+                                        html.Div(
+                                            id="related-keywords", className="mt-2"
+                                        ),
+                                        dcc.Store(id="search-state"),
+                                        dcc.Store(id="trend-keywords"),
+                                        dcc.Store(id="publication-cursors"),
                                     ]
                                 )
                             ],
@@ -425,7 +804,10 @@ app.layout = dbc.Container(
                                 dbc.CardBody(
                                     [
                                         html.H5("Top Universities"),
-                                        html.Div(id="university-output"),
+                                        dcc.Graph(
+                                            id="university-graph",
+                                            figure=figures.bar_figure("indigo"),
+                                        ),
                                     ]
                                 )
                             ],
@@ -441,7 +823,10 @@ app.layout = dbc.Container(
                                 dbc.CardBody(
                                     [
                                         html.H5("Top Professors"),
-                                        html.Div(id="professor-output"),
+                                        dcc.Graph(
+                                            id="professor-graph",
+                                            figure=figures.bar_figure("darkgreen"),
+                                        ),
                                     ]
                                 )
                             ],
@@ -457,7 +842,35 @@ app.layout = dbc.Container(
                                 dbc.CardBody(
                                     [
                                         html.H5("Top Publications"),
-                                        html.Div(id="publication-output"),
+                                        dash_table.DataTable(
+                                            id="publication-table",
+                                            columns=[
+                                                {"name": "Title", "id": "title"},
+                                                {"name": "Score", "id": "score"},
+                                            ],
+                                            data=[],
+                                            page_action="custom",
+                                            page_current=0,
+                                            page_count=1,
+                                            page_size=PUBLICATION_PAGE_SIZE,
+                                            sort_action="custom",
+                                            sort_mode="single",
+                                            sort_by=[],
+                                            style_table={
+                                                "height": "250px",
+                                                "overflowY": "auto",
+                                            },
+                                            style_cell={
+                                                "textAlign": "left",
+                                                "padding": "5px",
+                                                "whiteSpace": "normal",
+                                            },
+                                            style_header={"fontWeight": "bold"},
+                                        ),
+                                        html.Div(
+                                            id="publication-message",
+                                            style={"color": "red"},
+                                        ),
                                     ]
                                 )
                             ],
@@ -469,7 +882,7 @@ app.layout = dbc.Container(
             ]
         ),
         html.Br(),
-        # Row 3: Citation Trend
+        # Row 4: Citation Trend
         dbc.Row(
             [
                 dbc.Col(
@@ -479,8 +892,10 @@ app.layout = dbc.Container(
                                 dbc.CardBody(
                                     [
                                         html.H4("Citation Trends", className="mb-3"),
-                                        html.Div(
-                                            id="neo4j-output",
+                                        html.Div(id="neo4j-output"),
+                                        dcc.Graph(
+                                            id="citation-trend-graph",
+                                            figure=figures.TREND_FIGURE,
                                             className="bg-light p-2 border rounded",
                                         ),
                                     ]
@@ -0,0 +1,123 @@
+import itertools
+import random
+
+# Number of universities, faculty, keywords and publications per scale
+SCALES = {
+    "small": {
+        "universities": 50,
+        "faculty": 2000,
+        "keywords": 500,
+        "publications": 10000,
+    },
+    "medium": {
+        "universities": 200,
+        "faculty": 10000,
+        "keywords": 2000,
+        "publications": 60000,
+    },
+    "large": {
+        "universities": 500,
+        "faculty": 40000,
+        "keywords": 5000,
+        "publications": 250000,
+    },
+}
+
+_TOPICS = [
+    "learning", "vision", "networks", "systems", "databases", "security",
+    "robotics", "graphics", "theory", "languages", "retrieval", "optimization",
+    "mining", "compilers", "architecture", "verification", "privacy", "control",
+    "inference", "semantics", "algorithms", "hardware", "storage", "sensing",
+]
+_QUALIFIERS = [
+    "machine", "deep", "distributed", "computer", "wireless", "quantum",
+    "statistical", "probabilistic", "parallel", "embedded", "cloud", "mobile",
+    "natural language", "information", "data", "formal", "social", "neural",
+    "reinforcement", "human", "biomedical", "autonomous", "secure", "scalable",
+]
+
+
+def _keyword_names(count):
+    names = [_TOPICS[i] for i in range(min(count, len(_TOPICS)))]
+    for qualifier, topic in itertools.product(_QUALIFIERS, _TOPICS):
+        if len(names) >= count:
+            break
+        names.append(f"{qualifier} {topic}")
+    while len(names) < count:
+        names.append(f"topic {len(names)}")
+    return names
+
+
+def zipf_weights(count, exponent=1.1):
+    # Keyword popularity: a few keywords account for most rows and searches
+    return [1.0 / (rank ** exponent) for rank in range(1, count + 1)]
+
+
+def generate(universities, faculty, keywords, publications, seed=7, exponent=1.1):
+    """Synthetic academicworld tables as lists of row tuples.
+
+    Column order matches the MySQL tables the db utils query:
+    keyword (id, name), university (id, name), faculty (id, name,
+    university_id), faculty_keyword (faculty_id, keyword_id, score),
+    publication (ID, title, year, num_citations), Publication_Keyword
+    (publication_id, keyword_id, score), faculty_publication (faculty_id,
+    publication_id). Keyword use follows a Zipf distribution.
+    """
+    rng = random.Random(seed)
+    keyword_ids = list(range(1, keywords + 1))
+    weights = zipf_weights(keywords, exponent)
+
+    data = {
+        "keyword": list(zip(keyword_ids, _keyword_names(keywords))),
+        "university": [
+            (i, f"University {i:04d}") for i in range(1, universities + 1)
+        ],
+        "faculty": [
+            (i, f"Professor {i:06d}", rng.randint(1, universities))
+            for i in range(1, faculty + 1)
+        ],
+        "faculty_keyword": [],
+        "publication": [],
+        "Publication_Keyword": [],
+        "faculty_publication": [],
+    }
+
+    for faculty_id in range(1, faculty + 1):
+        for keyword_id in set(rng.choices(keyword_ids, weights, k=rng.randint(3, 10))):
+            data["faculty_keyword"].append(
+                (faculty_id, keyword_id, round(rng.uniform(1, 100), 2))
+            )
+
+    for pub_id in range(1, publications + 1):
+        data["publication"].append(
+            (pub_id, f"Publication {pub_id:07d}", rng.randint(1990, 2023),
+             int(rng.paretovariate(1.5)) - 1)
+        )
+        for keyword_id in set(rng.choices(keyword_ids, weights, k=rng.randint(1, 4))):
+            data["Publication_Keyword"].append(
+                (pub_id, keyword_id, round(rng.uniform(0, 1), 4))
+            )
+        for faculty_id in set(rng.choices(range(1, faculty + 1), k=rng.randint(1, 3))):
+            data["faculty_publication"].append((faculty_id, pub_id))
+
+    return data
+
+
+class KeywordSampler:
+    # Draws search terms with the same skew as the data, so hot keywords
+    # dominate like they do in real traffic
+    def __init__(self, data, seed=11, exponent=1.1):
+        self.rng = random.Random(seed)
+        self.names = [name for _, name in data["keyword"]]
+        self.ids = [keyword_id for keyword_id, _ in data["keyword"]]
+        self.weights = zipf_weights(len(self.names), exponent)
+        self.universities = [name for _, name in data["university"]]
+
+    def keyword(self):
+        return self.rng.choices(self.names, self.weights)[0]
+
+    def keyword_id(self):
+        return self.rng.choices(self.ids, self.weights)[0]
+
+    def university(self):
+        return self.rng.choice(self.universities)
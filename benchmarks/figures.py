@@ -0,0 +1,134 @@
+"""Server-side cost of the keyword search outputs, old and new.
+
+"rebuild" is how update_results used to answer: new dcc.Graph components
+around plotly.graph_objs figures and a new DataTable on every search. "patch"
+is the current approach (figures.py): the components stay in the layout and
+only x/y data is sent as a dash.Patch. Each call builds the outputs for one
+synthetic search and serializes them the way Dash does.
+
+    python -m benchmarks.figures --iterations 2000
+"""
+import argparse
+import random
+import time
+from dash import dash_table, dcc
+import plotly.graph_objs as go
+from plotly.io.json import to_json_plotly
+from db import figures
+from benchmarks.stats import format_table, summarize
+
+
+def _search_result(rng):
+    def ranking(prefix):
+        return [
+            (f"{prefix} {rng.randrange(10000)}", round(rng.uniform(50, 500), 2))
+            for _ in range(5)
+        ]
+
+    trend = [
+        {"year": year, "totalCitations": rng.randrange(10000)}
+        for year in range(1990, 2024)
+    ]
+    return {
+        "universities": ranking("University"),
+        "professors": ranking("Professor"),
+        "publications": ranking("Publication"),
+        "trend": trend,
+    }
+
+
+def rebuild_outputs(result):
+    def bar(ranking, color):
+        return dcc.Graph(
+            figure={
+                "data": [
+                    go.Bar(
+                        x=[name for name, _ in ranking],
+                        y=[score for _, score in ranking],
+                        marker_color=color,
+                    )
+                ],
+                "layout": go.Layout(
+                    margin={"t": 30, "b": 70},
+                    height=250,
+                    title="",
+                    xaxis={"tickangle": -30},
+                ),
+            }
+        )
+
+    table = dash_table.DataTable(
+        columns=[{"name": "Title", "id": "title"}, {"name": "Score", "id": "score"}],
+        data=[
+            {"title": title, "score": f"{score:.2f}"}
+            for title, score in result["publications"]
+        ],
+        style_table={"height": "250px", "overflowY": "auto"},
+        style_cell={"textAlign": "left", "padding": "5px", "whiteSpace": "normal"},
+        style_header={"fontWeight": "bold"},
+    )
+    fig = go.Figure(
+        data=[
+            go.Scatter(
+                x=[entry["year"] for entry in result["trend"]],
+                y=[entry["totalCitations"] for entry in result["trend"]],
+                mode="lines+markers",
+                name="Citations",
+            )
+        ]
+    )
+    fig.update_layout(xaxis_title="Year", yaxis_title="Total Citations", height=350)
+    return (
+        bar(result["universities"], "indigo"),
+        bar(result["professors"], "darkgreen"),
+        table,
+        dcc.Graph(figure=fig),
+    )
+
+
+def patch_outputs(result):
+    return (
+        figures.ranking_patch(result["universities"]),
+        figures.ranking_patch(result["professors"]),
+        figures.publication_rows(result["publications"]),
+        figures.trend_patch(result["trend"]),
+    )
+
+
+def measure(build, results):
+    latencies = []
+    payload = 0
+    started = time.perf_counter()
+    for result in results:
+        start = time.perf_counter()
+        body = to_json_plotly(list(build(result)))
+        latencies.append(time.perf_counter() - start)
+        payload += len(body.encode())
+    stats = summarize(latencies, time.perf_counter() - started)
+    stats["avg_bytes"] = payload // len(results)
+    return stats
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--iterations", type=int, default=1000)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args(argv)
+
+    rng = random.Random(args.seed)
+    results = [_search_result(rng) for _ in range(args.iterations)]
+    rows = [
+        {"outputs": name, **measure(build, results)}
+        for name, build in (("rebuild", rebuild_outputs), ("patch", patch_outputs))
+    ]
+    print(
+        format_table(
+            rows, ["outputs", "calls", "p50_ms", "p95_ms", "p99_ms", "avg_bytes"]
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
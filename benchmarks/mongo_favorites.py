@@ -0,0 +1,104 @@
+"""Favorites lookup latency as the sessions collection grows.
+
+Seeds a scratch database (never the app's) with synthetic sessions up to each
+requested size and times find_one by session_id with the indexes from
+mongodb_utils.ensure_indexes and, with --compare-unindexed, without them.
+
+    python -m benchmarks.mongo_favorites --sizes 10000 100000 1000000
+"""
+import argparse
+import datetime
+import random
+import time
+import uuid
+from db import mongodb_utils
+from benchmarks.stats import format_table, summarize
+
+INSERT_BATCH = 10000
+
+
+def _session(rng):
+    return {
+        "session_id": str(uuid.uuid4()),
+        "professors": [
+            f"Professor {rng.randrange(20000)}" for _ in range(rng.randrange(4))
+        ],
+        "universities": [
+            f"University {rng.randrange(500)}" for _ in range(rng.randrange(3))
+        ],
+        "topics": [],
+        "last_touched": datetime.datetime.now(datetime.timezone.utc),
+    }
+
+
+def _grow(collection, session_ids, size, rng):
+    while len(session_ids) < size:
+        count = min(INSERT_BATCH, size - len(session_ids))
+        batch = [_session(rng) for _ in range(count)]
+        collection.insert_many(batch, ordered=False)
+        session_ids.extend(doc["session_id"] for doc in batch)
+
+
+def _time_lookups(collection, session_ids, lookups, rng):
+    latencies = []
+    started = time.perf_counter()
+    for i in range(lookups):
+        # One in ten lookups is for a session that doesn't exist yet
+        session_id = str(uuid.uuid4()) if i % 10 == 0 else rng.choice(session_ids)
+        start = time.perf_counter()
+        collection.find_one({"session_id": session_id})
+        latencies.append(time.perf_counter() - start)
+    return summarize(latencies, time.perf_counter() - started)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--sizes", type=int, nargs="+", default=[10000, 100000, 1000000]
+    )
+    parser.add_argument("--lookups", type=int, default=2000)
+    parser.add_argument("--database", default="academicworld_bench")
+    parser.add_argument(
+        "--compare-unindexed",
+        action="store_true",
+        help="also time lookups without the session_id index (slow at large sizes)",
+    )
+    parser.add_argument("--keep", action="store_true", help="keep the scratch data")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args(argv)
+
+    if args.database == mongodb_utils.MONGO_DB_NAME:
+        parser.error("refusing to benchmark against the application database")
+
+    rng = random.Random(args.seed)
+    collection = mongodb_utils._create_client()[args.database].favorites_bench
+    collection.drop()
+    session_ids = []
+    rows = []
+    try:
+        for size in sorted(args.sizes):
+            _grow(collection, session_ids, size, rng)
+            if args.compare_unindexed:
+                collection.drop_indexes()
+                # Collection scans are slow; fewer lookups keep the run short
+                stats = _time_lookups(
+                    collection, session_ids, max(50, args.lookups // 20), rng
+                )
+                rows.append({"sessions": size, "index": "none", **stats})
+            mongodb_utils.ensure_indexes(collection)
+            stats = _time_lookups(collection, session_ids, args.lookups, rng)
+            rows.append({"sessions": size, "index": "session_id_unique", **stats})
+    finally:
+        if not args.keep:
+            collection.drop()
+
+    print(
+        format_table(
+            rows,
+            ["sessions", "index", "calls", "p50_ms", "p95_ms", "p99_ms", "throughput"],
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,269 @@
+"""Latency and throughput of the app's data functions against local stand-ins.
+
+Generates a synthetic academicworld dataset, loads it into the stand-ins in
+benchmarks.stores (SQLite, a fake Neo4j session, mongomock) and calls the
+db functions with Zipf-distributed keywords. Reports p50/p95/p99 latency and
+throughput per scenario.
+
+    python -m benchmarks.run --scale medium --concurrency 8
+    python -m benchmarks.run --json results.json
+    python -m benchmarks.run --baseline results.json --max-regression 0.2
+
+With --baseline the run exits with status 1 if any scenario's p95 grew, or
+its throughput shrank, by more than --max-regression. The result cache is
+disabled unless --with-cache is given, so the numbers are for the queries.
+With --snapshot the stand-ins are exported with db.snapshot_export first and
+the MySQL and Neo4j read paths are answered from the snapshot instead.
+"""
+import argparse
+import json
+import shutil
+import sys
+import tempfile
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack, contextmanager
+from db import cache, comparison, favorites, mongodb_utils, mysql_utils, neo4j_utils
+from db import search
+from db import snapshot, snapshot_export
+from benchmarks import dataset
+from benchmarks.stats import format_table, summarize
+from benchmarks.stores import LocalStores
+
+COLUMNS = ["scenario", "calls", "errors", "p50_ms", "p95_ms", "p99_ms", "throughput"]
+
+
+def _favorites_sessions(sampler, data, count=200):
+    # Sessions with a few resolved favorites of each kind
+    session_ids = [f"bench-{uuid.uuid4()}" for _ in range(count)]
+    professors = [name for _, name, _ in data["faculty"]]
+    for session_id in session_ids:
+        for _ in range(3):
+            name = sampler.rng.choice(professors)
+            mongodb_utils.add_favorite(
+                session_id, "professors", favorites.resolve_favorite("professors", name)
+            )
+            mongodb_utils.add_favorite(
+                session_id,
+                "universities",
+                favorites.resolve_favorite("universities", sampler.university()),
+            )
+            mongodb_utils.add_favorite(
+                session_id,
+                "topics",
+                favorites.resolve_favorite("topics", sampler.keyword()),
+            )
+    return session_ids
+
+
+def _toggle_favorite(session_id, item):
+    mongodb_utils.add_favorite(session_id, "topics", item)
+    mongodb_utils.remove_favorite(session_id, "topics", item)
+
+
+def _render_favorites(session_id):
+    favs = mongodb_utils.get_favorites(session_id)
+    return favorites.get_favorite_summaries(favs)
+
+
+def scenarios(sampler, data, iterations, with_favorites=True):
+    # {name: (function, [argument tuples])}; arguments are drawn up front so
+    # sampling is not part of the measured time
+    def draw(make):
+        return [make() for _ in range(iterations)]
+
+    found = {
+        "rankings_by_name": (
+            mysql_utils.run_all_keyword_queries_transactional,
+            draw(lambda: (sampler.keyword(),)),
+        ),
+        "rankings_by_id": (
+            mysql_utils.get_keyword_rankings,
+            draw(lambda: (sampler.keyword_id(),)),
+        ),
+        "citation_trend": (
+            neo4j_utils.get_citation_trend_by_keyword,
+            draw(lambda: (sampler.keyword(),)),
+        ),
+        "university_keywords": (
+            neo4j_utils.get_top_keywords_by_university,
+            draw(lambda: (sampler.university(),)),
+        ),
+        "search_keyword": (search.search_keyword, draw(lambda: (sampler.keyword(),))),
+        "compare_universities": (
+            comparison.compare_universities,
+            draw(lambda: ([sampler.university() for _ in range(5)],)),
+        ),
+    }
+    if with_favorites:
+        session_ids = _favorites_sessions(sampler, data)
+        found["favorites_toggle"] = (
+            _toggle_favorite,
+            draw(
+                lambda: (
+                    sampler.rng.choice(session_ids),
+                    favorites.resolve_favorite("topics", sampler.keyword()),
+                )
+            ),
+        )
+        found["favorites_render"] = (
+            _render_favorites,
+            draw(lambda: (sampler.rng.choice(session_ids),)),
+        )
+    return found
+
+
+def _timed_call(func, args):
+    start = time.perf_counter()
+    try:
+        func(*args)
+        failed = False
+    except Exception:
+        failed = True
+    return time.perf_counter() - start, failed
+
+
+def run_scenario(func, calls, concurrency):
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        started = time.perf_counter()
+        outcomes = list(executor.map(lambda args: _timed_call(func, args), calls))
+        elapsed = time.perf_counter() - started
+    latencies = [latency for latency, _ in outcomes]
+    stats = summarize(latencies, elapsed)
+    stats["errors"] = sum(failed for _, failed in outcomes)
+    return stats
+
+
+def compare(results, baseline, max_regression):
+    # [(scenario, message)] for scenarios slower than the baseline allows
+    regressions = []
+    for scenario, stats in results.items():
+        before = baseline.get(scenario)
+        if before is None:
+            continue
+        allowed_p95 = before["p95_ms"] * (1 + max_regression)
+        if before["p95_ms"] and stats["p95_ms"] > allowed_p95:
+            regressions.append(
+                (scenario, f"p95 {before['p95_ms']}ms -> {stats['p95_ms']}ms")
+            )
+        if stats["throughput"] < before["throughput"] / (1 + max_regression):
+            regressions.append(
+                (
+                    scenario,
+                    f"throughput {before['throughput']}/s -> {stats['throughput']}/s",
+                )
+            )
+        if stats["errors"] > before.get("errors", 0):
+            regressions.append(
+                (scenario, f"errors {before.get('errors', 0)} -> {stats['errors']}")
+            )
+    return regressions
+
+
+@contextmanager
+def _snapshot_backend():
+    # Exports the current stand-ins and switches the read paths to the export
+    directory = tempfile.mkdtemp(prefix="academicworld_snapshot_")
+    backend, path = snapshot.DATA_BACKEND, snapshot.SNAPSHOT_DIR
+    try:
+        snapshot_export.export(directory)
+        snapshot.DATA_BACKEND, snapshot.SNAPSHOT_DIR = "snapshot", directory
+        snapshot.reset()
+        yield
+    finally:
+        snapshot.DATA_BACKEND, snapshot.SNAPSHOT_DIR = backend, path
+        snapshot.reset()
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--scale", choices=sorted(dataset.SCALES), default="small")
+    parser.add_argument("--iterations", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=1)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument(
+        "--scenario", action="append", help="only run these scenarios (repeatable)"
+    )
+    parser.add_argument(
+        "--live-citations",
+        action="store_true",
+        help="no precomputed citation series; trends use the live aggregation",
+    )
+    parser.add_argument("--no-favorites", action="store_true", help="skip MongoDB")
+    parser.add_argument(
+        "--snapshot",
+        action="store_true",
+        help="answer the MySQL and Neo4j read paths from an exported snapshot",
+    )
+    parser.add_argument("--with-cache", action="store_true")
+    parser.add_argument("--json", help="write the results to this file")
+    parser.add_argument("--baseline", help="results file from an earlier run")
+    parser.add_argument("--max-regression", type=float, default=0.2)
+    args = parser.parse_args(argv)
+
+    print(f"Generating {args.scale} dataset...", file=sys.stderr)
+    data = dataset.generate(**dataset.SCALES[args.scale], seed=args.seed)
+    sampler = dataset.KeywordSampler(data, seed=args.seed + 1)
+    cache.result_cache.configure(enabled=args.with_cache)
+
+    results = {}
+    with ExitStack() as stack:
+        stack.enter_context(
+            LocalStores(
+                data,
+                precomputed_citations=not args.live_citations,
+                mongo=not args.no_favorites,
+            )
+        )
+        if args.snapshot:
+            print("Exporting snapshot...", file=sys.stderr)
+            stack.enter_context(_snapshot_backend())
+        found = scenarios(
+            sampler, data, args.iterations, with_favorites=not args.no_favorites
+        )
+        for name, (func, calls) in found.items():
+            if args.scenario and name not in args.scenario:
+                continue
+            print(f"Running {name}...", file=sys.stderr)
+            results[name] = run_scenario(func, calls, args.concurrency)
+
+    rows = [{"scenario": name, **stats} for name, stats in results.items()]
+    print(format_table(rows, COLUMNS))
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(
+                {
+                    "scale": args.scale,
+                    "iterations": args.iterations,
+                    "concurrency": args.concurrency,
+                    "results": results,
+                },
+                f,
+                indent=2,
+            )
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        if (baseline["scale"], baseline["concurrency"]) != (
+            args.scale,
+            args.concurrency,
+        ):
+            print(
+                "Warning: baseline was run with a different scale or concurrency",
+                file=sys.stderr,
+            )
+        regressions = compare(results, baseline["results"], args.max_regression)
+        for scenario, message in regressions:
+            print(f"REGRESSION {scenario}: {message}")
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
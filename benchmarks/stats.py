@@ -0,0 +1,36 @@
+import math
+
+
+def percentile(values, pct):
+    # Nearest-rank percentile of an unsorted list
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, math.ceil(pct / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+def summarize(latencies, elapsed):
+    # latencies in seconds; returns milliseconds and calls per second
+    return {
+        "calls": len(latencies),
+        "p50_ms": round(percentile(latencies, 50) * 1000, 3),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 3),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 3),
+        "max_ms": round(max(latencies, default=0.0) * 1000, 3),
+        "throughput": round(len(latencies) / elapsed, 1) if elapsed else 0.0,
+    }
+
+
+def format_table(rows, columns):
+    widths = [
+        max(len(str(column)), *(len(str(row.get(column, ""))) for row in rows))
+        for column in columns
+    ]
+    lines = ["  ".join(str(c).ljust(w) for c, w in zip(columns, widths))]
+    lines.append("  ".join("-" * w for w in widths))
+    for row in rows:
+        lines.append(
+            "  ".join(str(row.get(c, "")).ljust(w) for c, w in zip(columns, widths))
+        )
+    return "\n".join(lines)
@@ -0,0 +1,326 @@
+"""Local stand-ins for MySQL, Neo4j and MongoDB seeded with benchmark data.
+
+MySQL is replaced by a SQLite file behind the same pool the app uses, Neo4j
+by an in-memory session that answers the queries in neo4j_utils, and MongoDB
+by mongomock. Nothing here talks to a real server.
+"""
+import collections
+import os
+import re
+import sqlite3
+import tempfile
+import time
+from db import clients, keyword_index, mongodb_utils, mysql_utils, neo4j_utils
+from db import schema, snapshot_export
+
+TABLES = {
+    "keyword": "id INTEGER PRIMARY KEY, name TEXT",
+    "university": "id INTEGER PRIMARY KEY, name TEXT",
+    "faculty": "id INTEGER PRIMARY KEY, name TEXT, university_id INTEGER",
+    "faculty_keyword": "faculty_id INTEGER, keyword_id INTEGER, score REAL, "
+    "PRIMARY KEY (faculty_id, keyword_id)",
+    "publication": "ID INTEGER PRIMARY KEY, title TEXT, year INTEGER, "
+    "num_citations INTEGER",
+    "Publication_Keyword": "publication_id INTEGER, keyword_id INTEGER, score REAL, "
+    "PRIMARY KEY (publication_id, keyword_id)",
+    "faculty_publication": "faculty_id INTEGER, publication_id INTEGER, "
+    "PRIMARY KEY (faculty_id, publication_id)",
+}
+
+# SQLite has no ORDER BY/SEPARATOR inside GROUP_CONCAT; the order of the
+# concatenated labels does not matter for timing
+_GROUP_CONCAT = re.compile(
+    r"GROUP_CONCAT\((?P<expr>[^)]*?)\s+ORDER BY[^)]*?SEPARATOR\s+(?P<sep>'[^']*')\)",
+    re.IGNORECASE,
+)
+
+
+def _to_sqlite(query):
+    query = _GROUP_CONCAT.sub(r"GROUP_CONCAT(\g<expr>, \g<sep>)", query)
+    return query.replace("%s", "?")
+
+
+class _Cursor:
+    def __init__(self, cursor, latency=0.0):
+        self._cursor = cursor
+        self._latency = latency
+
+    def execute(self, query, params=()):
+        if self._latency:
+            time.sleep(self._latency)
+        self._cursor.execute(_to_sqlite(query), tuple(params))
+
+    def fetchone(self):
+        return self._cursor.fetchone()
+
+    def fetchall(self):
+        return self._cursor.fetchall()
+
+    def fetchmany(self, size):
+        return self._cursor.fetchmany(size)
+
+    def close(self):
+        self._cursor.close()
+
+
+class SQLiteConnection:
+    # The subset of the mysql.connector connection API mysql_utils uses.
+    # latency is added to every statement, like a network round trip.
+
+    def __init__(self, path, latency=0.0):
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._latency = latency
+
+    def cursor(self, prepared=False):
+        return _Cursor(self._conn.cursor(), self._latency)
+
+    def start_transaction(self, readonly=False, isolation_level=None):
+        self._conn.execute("BEGIN")
+
+    @property
+    def in_transaction(self):
+        return self._conn.in_transaction
+
+    def commit(self):
+        self._conn.commit()
+
+    def rollback(self):
+        self._conn.rollback()
+
+    def is_connected(self):
+        return True
+
+    def close(self):
+        self._conn.close()
+
+
+def seed_sqlite(data, path):
+    # Creates the tables and the schema.INDEXES indexes, then loads data
+    conn = sqlite3.connect(path)
+    for table, columns in TABLES.items():
+        conn.execute(f"DROP TABLE IF EXISTS {table}")
+        conn.execute(f"CREATE TABLE {table} ({columns})")
+    for table, rows in data.items():
+        if rows:
+            placeholders = ", ".join("?" * len(rows[0]))
+            conn.executemany(f"INSERT INTO {table} VALUES ({placeholders})", rows)
+    for name, table, columns in schema.INDEXES:
+        # Index names are per table in MySQL but global in SQLite
+        conn.execute(
+            f"CREATE INDEX IF NOT EXISTS {table}_{name} ON {table} "
+            f"({', '.join(columns)})"
+        )
+    conn.execute("ANALYZE")
+    conn.commit()
+    conn.close()
+
+
+class _Result(list):
+    def consume(self):
+        return None
+
+
+class FakeNeo4jSession:
+    def __init__(self, graph, latency=0.0):
+        self.graph = graph
+        self.latency = latency
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def close(self):
+        pass
+
+    def run(self, query, **params):
+        handler = self.graph.handlers.get(query)
+        if handler is None:
+            raise NotImplementedError(f"fake Neo4j cannot answer: {query.strip()}")
+        if self.latency:
+            time.sleep(self.latency)
+        return _Result(handler(**params))
+
+
+class FakeNeo4jGraph:
+    """In-memory answers to the read queries in neo4j_utils and snapshot_export.
+
+    With ``precomputed`` false, every keyword lacks a citation series, so
+    trends take the live-aggregation fallback like a graph that has not been
+    through refresh_citation_series yet.
+    """
+
+    def __init__(self, data, precomputed=True):
+        universities = dict(data["university"])
+        keywords = dict(data["keyword"])
+        faculty_university = {
+            faculty_id: universities[university_id]
+            for faculty_id, _, university_id in data["faculty"]
+        }
+
+        self.university_names = sorted(universities.values())
+        self.university_keywords = collections.defaultdict(collections.Counter)
+        for faculty_id, keyword_id, _ in data["faculty_keyword"]:
+            self.university_keywords[faculty_university[faculty_id]][
+                keywords[keyword_id]
+            ] += 1
+
+        publications = {
+            pub_id: (year, citations)
+            for pub_id, _, year, citations in data["publication"]
+        }
+        self.publications = collections.defaultdict(list)
+        for pub_id, keyword_id, _ in data["Publication_Keyword"]:
+            self.publications[keywords[keyword_id].lower()].append(publications[pub_id])
+        self.keyword_names = {name.lower() for name in keywords.values()}
+        self.series = (
+            {name: self._aggregate(name) for name in self.keyword_names}
+            if precomputed
+            else {}
+        )
+
+        self.handlers = {
+            neo4j_utils.ALL_UNIVERSITIES_QUERY: self._all_universities,
+            neo4j_utils.UNIVERSITY_KEYWORDS_QUERY: self._university_keywords,
+            neo4j_utils.CITATION_SERIES_QUERY: self._citation_series,
+            neo4j_utils.CITATION_TREND_QUERY: self._citation_trend,
+            # Every fake keyword has name_lower, so this finds nothing new
+            neo4j_utils.CITATION_TREND_BY_NAME_QUERY: self._citation_trend,
+            neo4j_utils.UNIVERSITY_DISTRIBUTIONS_QUERY: self._distributions,
+            snapshot_export.UNIVERSITY_KEYWORD_COUNTS_QUERY: self._keyword_counts,
+            snapshot_export.CITATION_TOTALS_QUERY: self._citation_totals,
+        }
+
+    def _aggregate(self, name):
+        totals = collections.Counter()
+        for year, citations in self.publications.get(name, ()):
+            totals[year] += citations
+        return sorted(totals.items())
+
+    def _all_universities(self):
+        return [{"name": name} for name in self.university_names]
+
+    def _university_keywords(self, university_name):
+        counts = self.university_keywords.get(university_name, collections.Counter())
+        return [
+            {"keyword": keyword, "count": count}
+            for keyword, count in counts.most_common(10)
+        ]
+
+    def _distributions(self, university_names):
+        return [
+            {"university_name": name, "keyword": keyword, "count": count}
+            for name in university_names
+            for keyword, count in sorted(
+                self.university_keywords.get(name, {}).items(),
+                key=lambda item: (-item[1], item[0]),
+            )
+        ]
+
+    def _keyword_counts(self):
+        return [
+            {"university": university, "keyword": keyword, "count": count}
+            for university, counts in self.university_keywords.items()
+            for keyword, count in counts.items()
+        ]
+
+    def _citation_totals(self):
+        return [
+            {"keyword_name": name, "year": year, "totalCitations": total}
+            for name in self.publications
+            for year, total in self._aggregate(name)
+        ]
+
+    def _citation_series(self, keyword_names):
+        rows = []
+        for name in keyword_names:
+            if name not in self.keyword_names:
+                continue
+            series = self.series.get(name)
+            if series is None:
+                rows.append({"keyword_name": name, "years": None, "totals": None})
+                continue
+            rows.append(
+                {
+                    "keyword_name": name,
+                    "years": [year for year, _ in series],
+                    "totals": [total for _, total in series],
+                }
+            )
+        return rows
+
+    def _citation_trend(self, keyword_names):
+        return [
+            {"keyword_name": name, "year": year, "totalCitations": total}
+            for name in sorted(keyword_names)
+            for year, total in self._aggregate(name)
+        ]
+
+
+class FakeNeo4jDriver:
+    def __init__(self, graph, latency=0.0):
+        self.graph = graph
+        self.latency = latency
+
+    def session(self, **kwargs):
+        return FakeNeo4jSession(self.graph, self.latency)
+
+    def verify_connectivity(self):
+        pass
+
+    def close(self):
+        pass
+
+
+def mongomock_client():
+    try:
+        import mongomock
+    except ImportError:
+        raise SystemExit(
+            "The favorites benchmarks need mongomock: pip install mongomock"
+        )
+    return mongomock.MongoClient()
+
+
+class LocalStores:
+    """Seeds the stand-ins and points the app's clients at them.
+
+    Use as a context manager; on exit the pool and client registry go back
+    to the configured backends and the SQLite file is removed. ``latency``
+    seconds are added to every MySQL statement and Neo4j query.
+    """
+
+    def __init__(self, data, precomputed_citations=True, mongo=True, latency=0.0):
+        self.data = data
+        self.precomputed_citations = precomputed_citations
+        self.mongo = mongo
+        self.latency = latency
+        self.path = None
+        self._factory = None
+
+    def __enter__(self):
+        fd, self.path = tempfile.mkstemp(prefix="academicworld_bench_", suffix=".db")
+        os.close(fd)
+        seed_sqlite(self.data, self.path)
+
+        mysql_utils.pool.dispose()
+        self._factory = mysql_utils.pool.factory
+        mysql_utils.pool.factory = lambda: SQLiteConnection(self.path, self.latency)
+
+        graph = FakeNeo4jGraph(self.data, precomputed=self.precomputed_citations)
+        clients.registry.override("neo4j", FakeNeo4jDriver(graph, self.latency))
+        if self.mongo:
+            clients.registry.override("mongodb", mongomock_client())
+            mongodb_utils.ensure_indexes()
+
+        keyword_index.keywords.refresh()
+        return self
+
+    def __exit__(self, *exc):
+        mysql_utils.pool.dispose()
+        mysql_utils.pool.factory = self._factory
+        clients.registry.reset("neo4j")
+        clients.registry.reset("mongodb")
+        os.remove(self.path)
+        return False
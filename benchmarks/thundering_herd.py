@@ -0,0 +1,133 @@
+"""Thundering-herd simulation for request coalescing (singleflight.py).
+
+Each round empties the result cache and releases --herd threads at once, all
+searching the same keyword, the way sessions pile onto a trending keyword.
+The herd runs once with coalescing disabled and once enabled. The table shows
+how many MySQL and Neo4j queries each herd caused and how long the callers
+waited. Stand-ins come from benchmarks.stores, with --latency-ms added to
+every query.
+
+    python -m benchmarks.thundering_herd --herd 50 --rounds 20
+
+Exits with status 1 if, with coalescing enabled, any herd ran a query more
+than once.
+"""
+import argparse
+import sys
+import threading
+import time
+from db import cache, instrumentation, mysql_utils, neo4j_utils, singleflight
+from benchmarks import dataset
+from benchmarks.stats import format_table, summarize
+from benchmarks.stores import LocalStores
+
+COLUMNS = [
+    "coalescing",
+    "calls",
+    "errors",
+    "queries",
+    "max_per_herd",
+    "coalesced",
+    "p50_ms",
+    "p95_ms",
+    "max_ms",
+]
+
+
+def _search(keyword):
+    # The two cached reads behind a keyword search (see search.py)
+    mysql_utils.run_all_keyword_queries_transactional(keyword)
+    neo4j_utils.get_citation_trend_by_keyword(keyword)
+
+
+def run_herd(keyword, size):
+    # Releases size threads at once; returns ([latency], errors)
+    barrier = threading.Barrier(size)
+    latencies = [0.0] * size
+    errors = []
+
+    def caller(i):
+        barrier.wait()
+        start = time.perf_counter()
+        try:
+            _search(keyword)
+        except Exception as e:
+            errors.append(e)
+        latencies[i] = time.perf_counter() - start
+
+    threads = [threading.Thread(target=caller, args=(i,)) for i in range(size)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return latencies, errors
+
+
+def simulate(keywords, size, enabled):
+    singleflight.flights.enabled = enabled
+    singleflight.flights.reset()
+    latencies, errors, queries, max_per_herd = [], 0, 0, 0
+    started = time.perf_counter()
+    for keyword in keywords:
+        cache.invalidate()
+        instrumentation.metrics.reset()
+        herd, failed = run_herd(keyword, size)
+        latencies += herd
+        errors += len(failed)
+        calls = [s["calls"] for s in instrumentation.metrics.snapshot().values()]
+        queries += sum(calls)
+        max_per_herd = max(max_per_herd, *calls, 0)
+    stats = summarize(latencies, time.perf_counter() - started)
+    coalesced = sum(c["coalesced"] for c in singleflight.get_stats().values())
+    return {
+        "coalescing": "on" if enabled else "off",
+        "errors": errors,
+        "queries": queries,
+        "max_per_herd": max_per_herd,
+        "coalesced": coalesced,
+        **stats,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--scale", choices=sorted(dataset.SCALES), default="small")
+    parser.add_argument("--herd", type=int, default=50, help="concurrent callers")
+    parser.add_argument("--rounds", type=int, default=10)
+    parser.add_argument("--latency-ms", type=float, default=20.0)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args(argv)
+
+    print(f"Generating {args.scale} dataset...", file=sys.stderr)
+    data = dataset.generate(**dataset.SCALES[args.scale], seed=args.seed)
+    sampler = dataset.KeywordSampler(data, seed=args.seed + 1)
+    keywords = [sampler.keyword() for _ in range(args.rounds)]
+    cache.result_cache.configure(enabled=True)
+    # Room for the whole herd, so queries are not serialized by the pool
+    overflow = mysql_utils.pool.max_overflow
+    mysql_utils.pool.max_overflow = max(overflow, args.herd)
+
+    enabled = singleflight.flights.enabled
+    try:
+        with LocalStores(data, mongo=False, latency=args.latency_ms / 1000):
+            rows = [
+                simulate(keywords, args.herd, enabled=False),
+                simulate(keywords, args.herd, enabled=True),
+            ]
+    finally:
+        singleflight.flights.enabled = enabled
+        mysql_utils.pool.max_overflow = overflow
+    print(format_table(rows, COLUMNS))
+
+    if rows[1]["max_per_herd"] > 1 or rows[1]["errors"]:
+        print(
+            "Coalescing failed: a herd ran the same query more than once",
+            file=sys.stderr,
+        )
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
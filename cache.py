@@ -0,0 +1,350 @@
+import inspect
+import logging
+import os
+import pickle
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+from dotenv import load_dotenv
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+
+class LRUCache:
+    """In-process LRU cache with a per-entry TTL and a maximum entry count."""
+
+    def __init__(self, max_entries=1024, ttl=3600.0):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.evictions = 0
+
+    def get(self, key):
+        # Returns (found, value)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return False, None
+            expires_at, value = entry
+            if expires_at is not None and expires_at <= time.monotonic():
+                del self._entries[key]
+                return False, None
+            self._entries.move_to_end(key)
+            return True, value
+
+    def set(self, key, value, ttl=None):
+        ttl = self.ttl if ttl is None else ttl
+        expires_at = time.monotonic() + ttl if ttl else None
+        with self._lock:
+            self._entries[key] = (expires_at, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def delete(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self, prefix=None):
+        with self._lock:
+            if prefix is None:
+                self._entries.clear()
+                return
+            for key in [k for k in self._entries if k.startswith(prefix)]:
+                del self._entries[key]
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class RedisBackend:
+    # Shared across gunicorn workers and hosts. Requires the `redis` package.
+    def __init__(self, url):
+        import redis
+
+        self.client = redis.Redis.from_url(url)
+
+    def get(self, key):
+        raw = self.client.get(key)
+        if raw is None:
+            return False, None
+        return True, pickle.loads(raw)
+
+    def set(self, key, value, ttl=None):
+        self.client.set(key, pickle.dumps(value), ex=int(ttl) if ttl else None)
+
+    def delete(self, key):
+        self.client.delete(key)
+
+    def clear(self, prefix=None):
+        pattern = f"{prefix}*" if prefix else "*"
+        keys = list(self.client.scan_iter(match=pattern))
+        if keys:
+            self.client.delete(*keys)
+
+
+class SQLiteBackend:
+    # Local stand-in for a shared cache server: workers on the same host
+    # share hits through one SQLite file. Expired rows are deleted by the
+    # first write every purge_interval seconds.
+    def __init__(self, path, purge_interval=60.0):
+        self.path = path
+        self.purge_interval = purge_interval
+        self._purged_at = 0.0
+        self._local = threading.local()
+        conn = self._connection()
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS cache "
+            "(key TEXT PRIMARY KEY, value BLOB NOT NULL, expires_at REAL)"
+        )
+        conn.execute(
+            "CREATE INDEX IF NOT EXISTS cache_expires_at ON cache (expires_at)"
+        )
+        conn.commit()
+
+    def _connection(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5.0)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+        return conn
+
+    def get(self, key):
+        row = (
+            self._connection()
+            .execute("SELECT value, expires_at FROM cache WHERE key = ?", (key,))
+            .fetchone()
+        )
+        if row is None:
+            return False, None
+        value, expires_at = row
+        if expires_at is not None and expires_at <= time.time():
+            self.delete(key)
+            return False, None
+        return True, pickle.loads(value)
+
+    def set(self, key, value, ttl=None):
+        now = time.time()
+        expires_at = now + ttl if ttl else None
+        conn = self._connection()
+        conn.execute(
+            "INSERT OR REPLACE INTO cache (key, value, expires_at) VALUES (?, ?, ?)",
+            (key, pickle.dumps(value), expires_at),
+        )
+        if now - self._purged_at >= self.purge_interval:
+            self._purged_at = now
+            conn.execute("DELETE FROM cache WHERE expires_at < ?", (now,))
+        conn.commit()
+
+    def delete(self, key):
+        conn = self._connection()
+        conn.execute("DELETE FROM cache WHERE key = ?", (key,))
+        conn.commit()
+
+    def clear(self, prefix=None):
+        conn = self._connection()
+        if prefix is None:
+            conn.execute("DELETE FROM cache")
+        else:
+            conn.execute(
+                "DELETE FROM cache WHERE substr(key, 1, ?) = ?", (len(prefix), prefix)
+            )
+        conn.commit()
+
+
+def backend_from_url(url):
+    if not url:
+        return None
+    if url.startswith(("redis://", "rediss://", "unix://")):
+        return RedisBackend(url)
+    if url.startswith("sqlite:///"):
+        return SQLiteBackend(url[len("sqlite:///") :])
+    raise ValueError(f"Unsupported cache backend URL: {url}")
+
+
+def _bound_args(signature, args, kwargs):
+    # The call's arguments in parameter order, defaults filled in, so f(x),
+    # f(keyword=x) and f(x, limit=10) with limit=10 the default share a key
+    try:
+        bound = signature.bind(*args, **kwargs)
+    except TypeError:
+        # Let the call itself raise
+        return args, kwargs
+    bound.apply_defaults()
+    values = []
+    for name, value in bound.arguments.items():
+        if signature.parameters[name].kind is inspect.Parameter.VAR_KEYWORD:
+            value = sorted(value.items())
+        values.append(value)
+    return tuple(values), None
+
+
+class ResultCache:
+    """Two-level cache for query results.
+
+    Lookups go to the in-process LRU first and then to the optional shared
+    backend; shared hits are copied into the LRU. Shared backend errors are
+    logged and treated as misses so a cache outage never fails a request.
+    """
+
+    def __init__(
+        self, local=None, shared=None, enabled=True, key_prefix="aw", backend_url=None
+    ):
+        self.local = local if local is not None else LRUCache()
+        self.enabled = enabled
+        self.key_prefix = key_prefix
+        self._counters = {}
+        self._lock = threading.Lock()
+        self._shared = shared
+        # A backend given by URL is opened on first use, not at import
+        self._backend_url = backend_url
+
+    @property
+    def shared(self):
+        if self._backend_url is not None:
+            with self._lock:
+                if self._backend_url is not None:
+                    self._shared = backend_from_url(self._backend_url)
+                    self._backend_url = None
+        return self._shared
+
+    @shared.setter
+    def shared(self, backend):
+        with self._lock:
+            self._shared, self._backend_url = backend, None
+
+    def configure(self, enabled=None, max_entries=None, ttl=None, backend_url=None):
+        if enabled is not None:
+            self.enabled = enabled
+        if max_entries is not None:
+            self.local.max_entries = max_entries
+        if ttl is not None:
+            self.local.ttl = ttl
+        if backend_url is not None:
+            with self._lock:
+                self._shared, self._backend_url = None, backend_url
+
+    def _key(self, namespace, args, kwargs):
+        key = f"{self.key_prefix}:{namespace}:{args!r}"
+        if kwargs:
+            key += f":{sorted(kwargs.items())!r}"
+        return key
+
+    def _count(self, namespace, counter):
+        with self._lock:
+            counters = self._counters.setdefault(
+                namespace, {"hits": 0, "shared_hits": 0, "misses": 0, "errors": 0}
+            )
+            counters[counter] += 1
+
+    def get(self, namespace, args=(), kwargs=None):
+        key = self._key(namespace, args, kwargs)
+        found, value = self.local.get(key)
+        if found:
+            self._count(namespace, "hits")
+            return True, value
+        if self.shared is not None:
+            try:
+                found, value = self.shared.get(key)
+            except Exception:
+                logger.warning("Shared cache read failed for %s", key, exc_info=True)
+                self._count(namespace, "errors")
+                found = False
+            if found:
+                self.local.set(key, value)
+                self._count(namespace, "shared_hits")
+                return True, value
+        self._count(namespace, "misses")
+        return False, None
+
+    def set(self, namespace, value, args=(), kwargs=None, ttl=None):
+        key = self._key(namespace, args, kwargs)
+        self.local.set(key, value, ttl=ttl)
+        if self.shared is not None:
+            try:
+                self.shared.set(key, value, ttl=self.local.ttl if ttl is None else ttl)
+            except Exception:
+                logger.warning("Shared cache write failed for %s", key, exc_info=True)
+                self._count(namespace, "errors")
+
+    def invalidate(self, namespace=None, *args, **kwargs):
+        # invalidate() clears everything, invalidate(ns) clears a namespace,
+        # invalidate(ns, *args) clears a single call's result.
+        if namespace is None:
+            prefix, key = f"{self.key_prefix}:", None
+        elif args or kwargs:
+            prefix, key = None, self._key(namespace, args, kwargs)
+        else:
+            prefix, key = f"{self.key_prefix}:{namespace}:", None
+
+        if key is not None:
+            self.local.delete(key)
+        else:
+            self.local.clear(prefix)
+        if self.shared is not None:
+            try:
+                if key is not None:
+                    self.shared.delete(key)
+                else:
+                    self.shared.clear(prefix)
+            except Exception:
+                logger.warning("Shared cache invalidation failed", exc_info=True)
+
+    def stats(self):
+        with self._lock:
+            namespaces = {ns: dict(c) for ns, c in self._counters.items()}
+        return {
+            "enabled": self.enabled,
+            "entries": len(self.local),
+            "evictions": self.local.evictions,
+            "shared_backend": type(self.shared).__name__ if self.shared else None,
+            "namespaces": namespaces,
+        }
+
+    def cached(self, namespace, ttl=None):
+        def decorator(func):
+            signature = inspect.signature(func)
+
+            @wraps(func)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return func(*args, **kwargs)
+                key_args, key_kwargs = _bound_args(signature, args, kwargs)
+                found, value = self.get(namespace, key_args, key_kwargs)
+                if found:
+                    return value
+                value = func(*args, **kwargs)
+                self.set(namespace, value, key_args, key_kwargs, ttl=ttl)
+                return value
+
+            def invalidate(*args, **kwargs):
+                if not args and not kwargs:
+                    return self.invalidate(namespace)
+                key_args, key_kwargs = _bound_args(signature, args, kwargs)
+                return self.invalidate(namespace, *key_args, **(key_kwargs or {}))
+
+            wrapper.invalidate = invalidate
+            return wrapper
+
+        return decorator
+
+
+result_cache = ResultCache(
+    local=LRUCache(
+        max_entries=int(os.getenv("CACHE_MAX_ENTRIES", "1024")),
+        ttl=float(os.getenv("CACHE_TTL", "3600")),
+    ),
+    backend_url=os.getenv("CACHE_BACKEND_URL", ""),
+    enabled=os.getenv("CACHE_ENABLED", "1") == "1",
+)
+
+cached = result_cache.cached
+invalidate = result_cache.invalidate
+get_cache_stats = result_cache.stats
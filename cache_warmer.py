@@ -0,0 +1,157 @@
+import argparse
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dotenv import load_dotenv
+from db import cache, keyword_index, mysql_utils, neo4j_utils, search_stats
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# Most-searched keywords warmed per run
+WARM_TOP_N = int(os.getenv("WARM_TOP_N", "50"))
+# Keywords warmed at the same time; each uses one MySQL connection and one
+# Neo4j session at most
+WARM_CONCURRENCY = int(os.getenv("WARM_CONCURRENCY", "2"))
+# Seconds between runs after the startup one; 0 warms at startup only. Keep
+# it below CACHE_TTL so popular results never expire.
+WARM_INTERVAL = float(os.getenv("WARM_INTERVAL", "0"))
+WARM_ON_STARTUP = os.getenv("WARM_ON_STARTUP", "1") == "1"
+# Longest a keyword waits for live traffic to free the MySQL pool before it
+# is skipped
+WARM_MAX_WAIT = float(os.getenv("WARM_MAX_WAIT", "30"))
+
+
+def _pool_busy():
+    # Live requests already hold as many connections as the pool keeps idle;
+    # warming now would push them into overflow connections or waits
+    stats = mysql_utils.get_pool_stats()
+    return stats["in_use"] >= stats["size"]
+
+
+def warm_keyword(name, max_wait=WARM_MAX_WAIT):
+    # Runs the search's MySQL and Neo4j reads for one keyword so their
+    # results land in the result cache. Returns False if skipped.
+    match = keyword_index.keywords.resolve(name)
+    if match is None:
+        return False
+    deadline = time.monotonic() + max_wait
+    while _pool_busy():
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.05)
+    mysql_utils.get_keyword_rankings(match.keyword_id)
+    neo4j_utils.get_citation_trend_by_keyword(match.name)
+    return True
+
+
+def warm(keywords=None, top_n=WARM_TOP_N, concurrency=WARM_CONCURRENCY):
+    """Precomputes rankings and citation trends of the most-searched keywords.
+
+    ``keywords`` defaults to the ``top_n`` most searched according to
+    search_stats. At most ``concurrency`` keywords are warmed at a time, on
+    threads of their own, and each waits while live requests are using the
+    whole MySQL pool. Returns (warmed, skipped, failed) counts.
+    """
+    if not cache.result_cache.enabled:
+        logger.info("Result cache disabled; nothing to warm")
+        return 0, 0, 0
+    if keywords is None:
+        keywords = [keyword for keyword, _ in search_stats.stats.top(top_n)]
+
+    def run(name):
+        try:
+            return "warmed" if warm_keyword(name) else "skipped"
+        except Exception:
+            logger.warning("Warming '%s' failed", name, exc_info=True)
+            return "failed"
+
+    with ThreadPoolExecutor(
+        max_workers=max(1, concurrency), thread_name_prefix="cache-warmer"
+    ) as executor:
+        outcomes = list(executor.map(run, keywords))
+    return (
+        outcomes.count("warmed"),
+        outcomes.count("skipped"),
+        outcomes.count("failed"),
+    )
+
+
+class CacheWarmer:
+    """Background thread running warm() at startup and every ``interval``."""
+
+    def __init__(self, interval=WARM_INTERVAL, top_n=WARM_TOP_N):
+        self.interval = interval
+        self.top_n = top_n
+        self._thread = None
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+
+    def _run_once(self):
+        started = time.perf_counter()
+        warmed, skipped, failed = warm(top_n=self.top_n)
+        logger.info(
+            "Warmed %d keywords in %.1fs (%d skipped, %d failed)",
+            warmed,
+            time.perf_counter() - started,
+            skipped,
+            failed,
+        )
+
+    def _loop(self):
+        while True:
+            try:
+                self._run_once()
+            except Exception:
+                logger.warning("Cache warming failed", exc_info=True)
+            if self.interval <= 0 or self._stop.wait(self.interval):
+                return
+
+    def start(self):
+        # Cheap once running; called on every request by app.py
+        if self._thread is not None:
+            return
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._thread = threading.Thread(
+                target=self._loop, name="cache-warmer", daemon=True
+            )
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+
+warmer = CacheWarmer()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Search stats and cache warming")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    top_parser = subparsers.add_parser("top", help="show the most searched keywords")
+    top_parser.add_argument("-n", type=int, default=WARM_TOP_N)
+    warm_parser = subparsers.add_parser(
+        "warm", help="warm the shared cache (CACHE_BACKEND_URL) once"
+    )
+    warm_parser.add_argument("-n", type=int, default=WARM_TOP_N)
+    warm_parser.add_argument("--concurrency", type=int, default=WARM_CONCURRENCY)
+    args = parser.parse_args(argv)
+
+    if args.command == "top":
+        for keyword, count in search_stats.stats.top(args.n):
+            print(f"{count:8d}  {keyword}")
+    else:
+        started = time.perf_counter()
+        warmed, skipped, failed = warm(top_n=args.n, concurrency=args.concurrency)
+        print(
+            f"Warmed {warmed} keywords in {time.perf_counter() - started:.1f}s "
+            f"({skipped} skipped, {failed} failed)"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+import threading
+import time
+
+
+class BackendUnavailable(RuntimeError):
+    def __init__(self, backend, error):
+        super().__init__(f"{backend} is unavailable: {error}")
+        self.backend = backend
+
+
+class ClientRegistry:
+    """Creates database clients on first use instead of at import time.
+
+    Each backend registers a factory, plus an optional probe used by the
+    readiness check and an optional close hook. A backend that is down only
+    fails the calls that need it; the rest of the app keeps serving.
+    """
+
+    def __init__(self):
+        self._backends = {}
+        self._clients = {}
+        self._lock = threading.Lock()
+
+    def register(self, name, factory, probe=None, close=None):
+        self._backends[name] = {"factory": factory, "probe": probe, "close": close}
+
+    def get(self, name):
+        client = self._clients.get(name)
+        if client is not None:
+            return client
+        with self._lock:
+            client = self._clients.get(name)
+            if client is None:
+                try:
+                    client = self._backends[name]["factory"]()
+                except Exception as e:
+                    raise BackendUnavailable(name, e) from e
+                self._clients[name] = client
+        return client
+
+    def override(self, name, client):
+        # Swap in a ready-made client, e.g. a local stand-in for benchmarks
+        with self._lock:
+            self._clients[name] = client
+
+    def is_initialized(self, name):
+        return name in self._clients
+
+    def reset(self, name=None):
+        names = [name] if name is not None else list(self._clients)
+        for backend in names:
+            with self._lock:
+                client = self._clients.pop(backend, None)
+            close = self._backends.get(backend, {}).get("close")
+            if client is not None and close is not None:
+                try:
+                    close(client)
+                except Exception:
+                    pass
+
+    def liveness(self):
+        # The process is up; says nothing about the databases
+        return {"status": "ok", "initialized": sorted(self._clients)}
+
+    def readiness(self):
+        checks = {}
+        for name, backend in self._backends.items():
+            start = time.perf_counter()
+            try:
+                client = self.get(name)
+                if backend["probe"] is not None:
+                    backend["probe"](client)
+                checks[name] = {"ok": True}
+            except Exception as e:
+                checks[name] = {"ok": False, "error": str(e)}
+            checks[name]["latency_ms"] = round((time.perf_counter() - start) * 1000, 2)
+        return {"ready": all(c["ok"] for c in checks.values()), "backends": checks}
+
+
+registry = ClientRegistry()
@@ -0,0 +1,80 @@
+import math
+from itertools import combinations
+from db import neo4j_utils
+
+# Keywords shown per comparison chart; the rest still count towards overlap
+# and similarity
+TOP_KEYWORDS = 12
+
+
+def _cosine(a, b):
+    dot = sum(count * b[keyword] for keyword, count in a.items() if keyword in b)
+    norm = math.sqrt(sum(c * c for c in a.values()) * sum(c * c for c in b.values()))
+    return dot / norm if norm else 0.0
+
+
+def compare_universities(university_names, top_keywords=TOP_KEYWORDS):
+    """Research-profile comparison of several universities.
+
+    All keyword-count distributions come from one Neo4j query
+    (neo4j_utils.get_keyword_distributions), so the cost of the round trip
+    does not grow with the number of universities. Overlap and similarity
+    are computed here over the full distributions. Returns::
+
+        {
+            "universities": [name],      # found, in the order given
+            "missing": [name],           # no faculty keywords in the graph
+            "distributions": {name: [{"keyword", "count"}]},
+            "shares": {name: {keyword: share of the university's total}},
+            "keywords": [keyword],       # top_keywords by summed share
+            "shared": [keyword],         # keywords common to all of them
+            "pairs": [{"a", "b", "shared", "jaccard", "cosine"}],
+        }
+    """
+    distributions = neo4j_utils.get_keyword_distributions(list(university_names))
+    found = [name for name, counts in distributions.items() if counts]
+    missing = [name for name, counts in distributions.items() if not counts]
+
+    counts = {
+        name: {item["keyword"]: item["count"] for item in distributions[name]}
+        for name in found
+    }
+    shares = {}
+    for name, by_keyword in counts.items():
+        total = sum(by_keyword.values())
+        shares[name] = {keyword: c / total for keyword, c in by_keyword.items()}
+
+    combined = {}
+    for by_keyword in shares.values():
+        for keyword, share in by_keyword.items():
+            combined[keyword] = combined.get(keyword, 0.0) + share
+    keywords = sorted(combined, key=lambda keyword: (-combined[keyword], keyword))
+
+    shared = []
+    if found:
+        common = set.intersection(*(set(counts[name]) for name in found))
+        shared = [keyword for keyword in keywords if keyword in common]
+
+    pairs = []
+    for a, b in combinations(found, 2):
+        keywords_a, keywords_b = set(counts[a]), set(counts[b])
+        overlap = len(keywords_a & keywords_b)
+        pairs.append(
+            {
+                "a": a,
+                "b": b,
+                "shared": overlap,
+                "jaccard": overlap / len(keywords_a | keywords_b),
+                "cosine": _cosine(counts[a], counts[b]),
+            }
+        )
+
+    return {
+        "universities": found,
+        "missing": missing,
+        "distributions": {name: distributions[name] for name in found},
+        "shares": shares,
+        "keywords": keywords[:top_keywords],
+        "shared": shared,
+        "pairs": pairs,
+    }
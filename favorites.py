@@ -0,0 +1,205 @@
+import atexit
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from db import keyword_index, mongodb_utils, mysql_utils
+
+logger = logging.getLogger(__name__)
+
+
+def resolve_favorite(category, name):
+    # Favorites are stored as {"id", "name"} with the MySQL id of the
+    # professor, university or keyword. Returns None if nothing matches.
+    # Topics must match a keyword exactly (ignoring case) so a typo is never
+    # saved as a different keyword; see suggest_favorites.
+    if category == "topics":
+        match = keyword_index.keywords.lookup(name)
+        return {"id": match.keyword_id, "name": match.name} if match else None
+    if category == "professors":
+        found = mysql_utils.find_faculty(name)
+    else:
+        found = mysql_utils.find_university(name)
+    return {"id": found[0], "name": found[1]} if found else None
+
+
+def suggest_favorites(category, name, limit=5):
+    # "Did you mean" names for a topic resolve_favorite did not match: the
+    # closest keyword allowing typos first, then keywords with similar trigrams
+    if category != "topics":
+        return []
+    match = keyword_index.keywords.resolve(name)
+    names = [match.name] if match else []
+    names += keyword_index.keywords.similar(name, limit)
+    return list(dict.fromkeys(names))[:limit]
+
+
+def _same(stored, entry):
+    # Matches an entry against stored items, including bare legacy names
+    if isinstance(stored, dict):
+        return stored.get("id") == entry["id"]
+    return stored == entry["name"]
+
+
+def get_favorite_summaries(favs):
+    # Stats for every resolved favorite, at one query per category however
+    # long the lists are. Returns {category: [summary or {"name"}]} in list
+    # order; legacy name-only entries and deleted ids come back name-only.
+    summaries = {}
+    for category in mongodb_utils.CATEGORIES:
+        items = favs.get(category, [])
+        ids = [item["id"] for item in items if isinstance(item, dict)]
+        found = mysql_utils.get_summaries(category, ids) if ids else {}
+        summaries[category] = [
+            found.get(item["id"], {"name": item["name"]})
+            if isinstance(item, dict)
+            else {"name": item}
+            for item in items
+        ]
+    return summaries
+
+
+class FavoritesService:
+    """Per-session favorites with a bounded in-process cache.
+
+    Rendering a session already in the cache costs no MongoDB call, and an
+    add/remove is a single find_one_and_update that returns the new state.
+    Cached sessions are read again after ``ttl`` seconds, which picks up
+    changes made by other workers and refreshes the document's last_touched.
+    With ``write_behind`` enabled, changes to cached sessions are applied
+    locally and flushed to MongoDB in batches by a background thread.
+    """
+
+    def __init__(
+        self, max_sessions=10000, write_behind=False, flush_interval=1.0, ttl=30.0
+    ):
+        self.max_sessions = max_sessions
+        self.write_behind = write_behind
+        self.flush_interval = flush_interval
+        self.ttl = ttl
+        self._sessions = OrderedDict()
+        self._pending = []
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._flusher = None
+        self._stop = threading.Event()
+
+    @staticmethod
+    def _state(doc):
+        return {
+            category: list((doc or {}).get(category, []))
+            for category in mongodb_utils.CATEGORIES
+        }
+
+    def _remember(self, session_id, state):
+        with self._lock:
+            self._sessions[session_id] = (state, time.monotonic() + self.ttl)
+            self._sessions.move_to_end(session_id)
+            while len(self._sessions) > self.max_sessions:
+                self._sessions.popitem(last=False)
+
+    def _fresh(self, session_id):
+        # Cached state of a session, or None if missing or expired. Called
+        # with self._lock held.
+        entry = self._sessions.get(session_id)
+        if entry is None or entry[1] <= time.monotonic():
+            return None
+        self._sessions.move_to_end(session_id)
+        return entry[0]
+
+    def _cached(self, session_id):
+        with self._lock:
+            state = self._fresh(session_id)
+            if state is not None:
+                return {category: list(items) for category, items in state.items()}
+        return None
+
+    def get(self, session_id):
+        state = self._cached(session_id)
+        if state is not None:
+            return state
+        # Pending writes must land before reading the document back. The read
+        # also refreshes last_touched, so a session used only through the
+        # cache does not expire.
+        self.flush()
+        state = self._state(mongodb_utils.get_or_create_session(session_id))
+        self._remember(session_id, state)
+        return {category: list(items) for category, items in state.items()}
+
+    def _change(self, session_id, action, category, item):
+        if self.write_behind:
+            with self._lock:
+                state = self._fresh(session_id)
+                if state is not None:
+                    items = state[category]
+                    if action == "add" and item not in items:
+                        items.append(item)
+                    elif action == "remove":
+                        state[category] = [i for i in items if not _same(i, item)]
+                    self._pending.append((session_id, action, category, item))
+                    self._start_flusher()
+                    return {c: list(i) for c, i in state.items()}
+            # Queued changes to this session must land before this one, or
+            # they would be applied after it
+            self.flush()
+
+        if action == "add":
+            doc = mongodb_utils.add_favorite(session_id, category, item)
+        else:
+            doc = mongodb_utils.remove_favorite(session_id, category, item)
+        state = self._state(doc)
+        self._remember(session_id, state)
+        return {category: list(items) for category, items in state.items()}
+
+    def add(self, session_id, category, item):
+        return self._change(session_id, "add", category, item)
+
+    def remove(self, session_id, category, item):
+        return self._change(session_id, "remove", category, item)
+
+    def flush(self):
+        with self._flush_lock:
+            with self._lock:
+                changes, self._pending = self._pending, []
+            if not changes:
+                return
+            try:
+                mongodb_utils.apply_favorite_changes(changes)
+            except Exception:
+                logger.warning("Favorites flush failed, will retry", exc_info=True)
+                with self._lock:
+                    self._pending = changes + self._pending
+                raise
+
+    def _start_flusher(self):
+        # Called with self._lock held
+        if self._flusher is not None:
+            return
+        self._flusher = threading.Thread(
+            target=self._flush_loop, name="favorites-flush", daemon=True
+        )
+        self._flusher.start()
+        atexit.register(self.close)
+
+    def _flush_loop(self):
+        while not self._stop.wait(self.flush_interval):
+            try:
+                self.flush()
+            except Exception:
+                pass
+
+    def close(self):
+        self._stop.set()
+        try:
+            self.flush()
+        except Exception:
+            logger.error("Dropping unsaved favorites changes", exc_info=True)
+
+
+service = FavoritesService(
+    max_sessions=int(os.getenv("FAVORITES_CACHE_SIZE", "10000")),
+    write_behind=os.getenv("FAVORITES_WRITE_BEHIND", "0") == "1",
+    flush_interval=float(os.getenv("FAVORITES_FLUSH_INTERVAL", "1.0")),
+    ttl=float(os.getenv("FAVORITES_CACHE_TTL", "30")),
+)
@@ -0,0 +1,138 @@
+from dash import Patch
+
+# Result graphs are created once in the layout from these slim figure dicts.
+# Searches only send the new trace data as a Patch, so neither
+# plotly.graph_objs validation nor a full figure round trip happens per
+# request.
+
+
+def bar_figure(color):
+    return {
+        "data": [{"type": "bar", "x": [], "y": [], "marker": {"color": color}}],
+        "layout": {
+            "margin": {"t": 30, "b": 70},
+            "height": 250,
+            "xaxis": {"tickangle": -30},
+        },
+    }
+
+
+TREND_FIGURE = {
+    "data": [
+        {
+            "type": "scatter",
+            "mode": "lines+markers",
+            "x": [],
+            "y": [],
+            "name": "Citations",
+        }
+    ],
+    "layout": {
+        "xaxis": {"title": {"text": "Year"}},
+        "yaxis": {"title": {"text": "Total Citations"}},
+        "height": 350,
+    },
+}
+
+
+def xy_patch(x, y):
+    # Replaces the first trace's data and nothing else
+    patch = Patch()
+    patch["data"][0]["x"] = list(x)
+    patch["data"][0]["y"] = list(y)
+    return patch
+
+
+def ranking_patch(ranking):
+    # ranking is [(name, score)] as returned by mysql_utils
+    return xy_patch([name for name, _ in ranking], [score for _, score in ranking])
+
+
+def trends_patch(trends):
+    # trends is {name: [{"year", "totalCitations"}]} as returned by
+    # neo4j_utils; one line per keyword, replacing any previous lines
+    patch = Patch()
+    patch["data"] = [
+        {
+            "type": "scatter",
+            "mode": "lines+markers",
+            "x": [entry["year"] for entry in trend],
+            "y": [entry["totalCitations"] for entry in trend],
+            "name": name,
+        }
+        for name, trend in trends.items()
+    ]
+    patch["layout"]["showlegend"] = len(trends) > 1
+    return patch
+
+
+def trend_patch(trend):
+    return trends_patch({"Citations": trend})
+
+
+def comparison_figure(comparison):
+    # comparison is the result of comparison.compare_universities: one bar
+    # group per keyword, one bar per university, sized by the keyword's share
+    # of that university's faculty interests so sizes compare fairly
+    keywords = comparison["keywords"]
+    return {
+        "data": [
+            {
+                "type": "bar",
+                "name": name,
+                "x": keywords,
+                "y": [
+                    round(comparison["shares"][name].get(keyword, 0.0) * 100, 2)
+                    for keyword in keywords
+                ],
+            }
+            for name in comparison["universities"]
+        ],
+        "layout": {
+            "barmode": "group",
+            "margin": {"t": 30, "b": 90},
+            "height": 380,
+            "xaxis": {"tickangle": -30},
+            "yaxis": {"title": {"text": "% of faculty interests"}},
+            "legend": {"orientation": "h", "y": 1.15},
+        },
+    }
+
+
+def similarity_figure(comparison):
+    # Pairwise cosine similarity of the full keyword distributions
+    names = comparison["universities"]
+    similarity = {}
+    for pair in comparison["pairs"]:
+        similarity[pair["a"], pair["b"]] = pair["cosine"]
+        similarity[pair["b"], pair["a"]] = pair["cosine"]
+    z = [
+        [
+            1.0 if a == b else round(similarity.get((a, b), 0.0), 3)
+            for b in names
+        ]
+        for a in names
+    ]
+    return {
+        "data": [
+            {
+                "type": "heatmap",
+                "x": names,
+                "y": names,
+                "z": z,
+                "zmin": 0,
+                "zmax": 1,
+                "colorscale": "Blues",
+                "texttemplate": "%{z:.2f}",
+            }
+        ],
+        "layout": {
+            "margin": {"t": 10, "b": 90, "l": 160},
+            "height": 320,
+            "xaxis": {"tickangle": -30},
+        },
+    }
+
+
+def publication_rows(publications):
+    return [{"title": title, "score": f"{score:.2f}"} for title, score in publications]
@@ -0,0 +1,274 @@
+import logging
+import os
+import threading
+import time
+from collections import namedtuple
+from contextlib import contextmanager
+from functools import wraps
+from dotenv import load_dotenv
+from db import cache
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+slow_query_logger = logging.getLogger("db.slow_queries")
+
+# Queries slower than this are logged to db.slow_queries; 0 logs every query
+SLOW_QUERY_MS = float(os.getenv("SLOW_QUERY_MS", "500"))
+
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# One finished call to a database helper. started is a time.time() timestamp,
+# duration is in seconds, error the exception raised (None on success).
+QueryEvent = namedtuple(
+    "QueryEvent", ["backend", "function", "started", "duration", "rows", "error"]
+)
+
+
+def count_rows(result):
+    # Rows in a helper's return value: list length, the summed lengths of a
+    # dict of lists (rankings, trends), 1 for a single row or document, 0 for
+    # None
+    if result is None:
+        return 0
+    if isinstance(result, (list, set)):
+        return len(result)
+    if isinstance(result, dict):
+        values = list(result.values())
+        if values and all(isinstance(v, list) for v in values):
+            return sum(len(v) for v in values)
+        return 1
+    return 1
+
+
+class _Series:
+    __slots__ = ("calls", "rows", "duration", "buckets", "errors")
+
+    def __init__(self):
+        self.calls = 0
+        self.rows = 0
+        self.duration = 0.0
+        self.buckets = [0] * len(BUCKETS)
+        self.errors = {}
+
+
+class QueryMetrics:
+    """Per-(backend, function) call counts, latency histograms, rows and errors.
+
+    Every recorded call is also passed to the registered listeners and, if it
+    took longer than ``slow_query_ms``, logged to ``db.slow_queries``.
+    """
+
+    def __init__(self, slow_query_ms=SLOW_QUERY_MS):
+        self.slow_query_ms = slow_query_ms
+        self._series = {}
+        self._slow = 0
+        self._listeners = []
+        self._collectors = []
+        self._lock = threading.Lock()
+
+    def add_listener(self, listener):
+        # listener(QueryEvent) is called on the calling thread after each query
+        self._listeners.append(listener)
+        return listener
+
+    def remove_listener(self, listener):
+        self._listeners.remove(listener)
+
+    def add_collector(self, collector):
+        # collector() returns [(name, type, help, [(labels dict, value)])] for
+        # gauges rendered alongside the query metrics, e.g. pool usage
+        self._collectors.append(collector)
+        return collector
+
+    def record(self, event, args=()):
+        slow = event.duration * 1000 >= self.slow_query_ms
+        with self._lock:
+            series = self._series.get((event.backend, event.function))
+            if series is None:
+                series = self._series[(event.backend, event.function)] = _Series()
+            series.calls += 1
+            series.rows += event.rows or 0
+            series.duration += event.duration
+            for i, bound in enumerate(BUCKETS):
+                if event.duration <= bound:
+                    series.buckets[i] += 1
+            if event.error is not None:
+                name = type(event.error).__name__
+                series.errors[name] = series.errors.get(name, 0) + 1
+            if slow:
+                self._slow += 1
+
+        if slow:
+            slow_query_logger.warning(
+                "%s.%s took %.1fms (%s rows%s) args=%.200r",
+                event.backend,
+                event.function,
+                event.duration * 1000,
+                event.rows,
+                f", {type(event.error).__name__}" if event.error is not None else "",
+                args,
+            )
+        for listener in list(self._listeners):
+            try:
+                listener(event)
+            except Exception:
+                logger.exception("Query listener failed")
+
+    @contextmanager
+    def track(self, backend, function, args=()):
+        # Times the block; set .rows on the yielded object to report rows
+        started = time.time()
+        start = time.perf_counter()
+        probe = _Probe()
+        try:
+            yield probe
+        except Exception as e:
+            self.record(
+                QueryEvent(
+                    backend, function, started, time.perf_counter() - start, 0, e
+                ),
+                args,
+            )
+            raise
+        self.record(
+            QueryEvent(
+                backend,
+                function,
+                started,
+                time.perf_counter() - start,
+                probe.rows,
+                None,
+            ),
+            args,
+        )
+
+    def instrumented(self, backend, rows=count_rows):
+        # Decorator recording every call of a database helper. Apply it below
+        # @cache.cached so cache hits are not counted as queries.
+        def decorator(func):
+            @wraps(func)
+            def wrapper(*args, **kwargs):
+                with self.track(backend, func.__name__, args) as probe:
+                    result = func(*args, **kwargs)
+                    probe.rows = rows(result)
+                return result
+
+            return wrapper
+
+        return decorator
+
+    def snapshot(self):
+        # {(backend, function): {"calls", "rows", "errors", "duration"}}
+        with self._lock:
+            return {
+                key: {
+                    "calls": s.calls,
+                    "rows": s.rows,
+                    "errors": dict(s.errors),
+                    "duration": s.duration,
+                }
+                for key, s in self._series.items()
+            }
+
+    def reset(self):
+        with self._lock:
+            self._series.clear()
+            self._slow = 0
+
+    def render_prometheus(self):
+        # Prometheus text exposition format
+        with self._lock:
+            series = sorted(self._series.items())
+            lines = [
+                "# HELP db_query_duration_seconds Database helper call latency.",
+                "# TYPE db_query_duration_seconds histogram",
+            ]
+            for (backend, function), s in series:
+                labels = f'backend="{backend}",function="{function}"'
+                for bound, count in zip(BUCKETS, s.buckets):
+                    lines.append(
+                        f'db_query_duration_seconds_bucket{{{labels},le="{bound}"}} '
+                        f"{count}"
+                    )
+                lines.append(
+                    f'db_query_duration_seconds_bucket{{{labels},le="+Inf"}} {s.calls}'
+                )
+                lines.append(f"db_query_duration_seconds_sum{{{labels}}} {s.duration}")
+                lines.append(f"db_query_duration_seconds_count{{{labels}}} {s.calls}")
+
+            lines += [
+                "# HELP db_query_rows_total Rows returned by database helpers.",
+                "# TYPE db_query_rows_total counter",
+            ]
+            for (backend, function), s in series:
+                lines.append(
+                    f'db_query_rows_total{{backend="{backend}",function="{function}"}} '
+                    f"{s.rows}"
+                )
+
+            lines += [
+                "# HELP db_query_errors_total Database helper calls that raised.",
+                "# TYPE db_query_errors_total counter",
+            ]
+            for (backend, function), s in series:
+                for error, count in sorted(s.errors.items()):
+                    lines.append(
+                        f'db_query_errors_total{{backend="{backend}",'
+                        f'function="{function}",error="{error}"}} {count}'
+                    )
+
+            lines += [
+                "# HELP db_slow_queries_total Calls slower than SLOW_QUERY_MS.",
+                "# TYPE db_slow_queries_total counter",
+                f"db_slow_queries_total {self._slow}",
+            ]
+
+        for collector in list(self._collectors):
+            try:
+                metrics = collector()
+            except Exception:
+                logger.exception("Metrics collector failed")
+                continue
+            for name, kind, help_text, samples in metrics:
+                lines.append(f"# HELP {name} {help_text}")
+                lines.append(f"# TYPE {name} {kind}")
+                for labels, value in samples:
+                    label_text = ",".join(f'{k}="{v}"' for k, v in labels.items())
+                    sample = f"{name}{{{label_text}}}" if label_text else name
+                    lines.append(f"{sample} {value}")
+        return "\n".join(lines) + "\n"
+
+
+class _Probe:
+    __slots__ = ("rows",)
+
+    def __init__(self):
+        self.rows = 0
+
+
+def _cache_metrics():
+    stats = cache.get_cache_stats()
+    samples = {"hits": [], "misses": []}
+    for namespace, counters in stats["namespaces"].items():
+        for kind in samples:
+            samples[kind].append(({"namespace": namespace}, counters.get(kind, 0)))
+    return [
+        ("result_cache_hits_total", "counter", "Result cache hits.", samples["hits"]),
+        (
+            "result_cache_misses_total",
+            "counter",
+            "Result cache misses.",
+            samples["misses"],
+        ),
+    ]
+
+
+metrics = QueryMetrics()
+metrics.add_collector(_cache_metrics)
+
+instrumented = metrics.instrumented
+track = metrics.track
+add_listener = metrics.add_listener
+add_collector = metrics.add_collector
+render_prometheus = metrics.render_prometheus
@@ -0,0 +1,178 @@
+import bisect
+import os
+import threading
+import time
+from collections import namedtuple
+from db import mysql_utils
+
+REFRESH_INTERVAL = float(os.getenv("KEYWORD_INDEX_REFRESH", "3600"))
+SIMILAR_MIN_OVERLAP = 0.4
+
+KeywordMatch = namedtuple("KeywordMatch", ["keyword_id", "name", "exact"])
+
+
+def _trigrams(text):
+    padded = f"  {text} "
+    return {padded[i : i + 3] for i in range(len(padded) - 2)}
+
+
+def edit_distance(a, b, max_distance):
+    # Levenshtein distance, giving up (returning max_distance + 1) as soon as
+    # every path exceeds max_distance
+    if abs(len(a) - len(b)) > max_distance:
+        return max_distance + 1
+    previous = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        current = [i]
+        for j, cb in enumerate(b, 1):
+            current.append(
+                min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (ca != cb))
+            )
+        if min(current) > max_distance:
+            return max_distance + 1
+        previous = current
+    return previous[-1]
+
+
+class KeywordIndex:
+    """In-memory index of the MySQL keyword table.
+
+    Exact lookups go through a dict, prefix suggestions through a sorted
+    array, and typo-tolerant resolution through a trigram index whose
+    candidates are ranked by edit distance. Built once from MySQL and
+    reloaded every ``refresh_interval`` seconds.
+    """
+
+    def __init__(self, loader, refresh_interval=REFRESH_INTERVAL):
+        self.loader = loader
+        self.refresh_interval = refresh_interval
+        self._names = []
+        self._ids = {}
+        self._trigrams = {}
+        self._loaded_at = None
+        self._lock = threading.Lock()
+        self._load_lock = threading.Lock()
+
+    def _load(self):
+        ids = {}
+        for keyword_id, name in self.loader():
+            ids.setdefault(name.strip().lower(), keyword_id)
+        names = sorted(ids)
+        trigrams = {}
+        for position, name in enumerate(names):
+            for gram in _trigrams(name):
+                trigrams.setdefault(gram, []).append(position)
+        with self._lock:
+            self._names, self._ids, self._trigrams = names, ids, trigrams
+            self._loaded_at = time.monotonic()
+
+    def _stale(self):
+        loaded_at = self._loaded_at
+        return loaded_at is None or time.monotonic() - loaded_at > self.refresh_interval
+
+    def _ensure_fresh(self):
+        # One thread loads at a time. Callers wait for the first load, then
+        # find the index loaded instead of each loading it again; once there
+        # is a index, they keep using it while another thread reloads.
+        if not self._stale():
+            return
+        if not self._load_lock.acquire(blocking=self._loaded_at is None):
+            return
+        try:
+            if not self._stale():
+                return
+            if self._loaded_at is None:
+                self._load()
+            else:
+                try:
+                    self._load()
+                except Exception:
+                    # Keep serving the stale index until MySQL is back
+                    self._loaded_at = time.monotonic()
+        finally:
+            self._load_lock.release()
+
+    def refresh(self):
+        with self._load_lock:
+            self._load()
+
+    def __len__(self):
+        return len(self._names)
+
+    def suggest(self, prefix, limit=10):
+        # Keywords starting with prefix, then keywords with a word starting
+        # with it
+        self._ensure_fresh()
+        names = self._names
+        prefix = (prefix or "").strip().lower()
+        if not prefix:
+            return []
+
+        matches = []
+        start = bisect.bisect_left(names, prefix)
+        for name in names[start:]:
+            if not name.startswith(prefix) or len(matches) >= limit:
+                break
+            matches.append(name)
+
+        if len(matches) < limit:
+            seen = set(matches)
+            for name, _ in self._candidates(prefix):
+                if name not in seen and f" {prefix}" in f" {name}":
+                    matches.append(name)
+                    if len(matches) >= limit:
+                        break
+        return matches
+
+    def _candidates(self, term, limit=200):
+        # [(name, shared trigram count)] for the names sharing the most
+        # trigrams with term
+        counts = {}
+        for gram in _trigrams(term):
+            for position in self._trigrams.get(gram, ()):
+                counts[position] = counts.get(position, 0) + 1
+        best = sorted(counts, key=lambda position: -counts[position])[:limit]
+        return [(self._names[position], counts[position]) for position in best]
+
+    def similar(self, term, limit=5):
+        # Keywords sharing a good part of term's trigrams, for "did you mean"
+        # hints when resolve() finds nothing close enough
+        self._ensure_fresh()
+        term = (term or "").strip().lower()
+        if not term:
+            return []
+        required = len(_trigrams(term)) * SIMILAR_MIN_OVERLAP
+        return [
+            name for name, shared in self._candidates(term, limit) if shared >= required
+        ]
+
+    def lookup(self, term):
+        # Exact, case-insensitive match only; None if there is none
+        self._ensure_fresh()
+        term = (term or "").strip().lower()
+        keyword_id = self._ids.get(term)
+        return KeywordMatch(keyword_id, term, True) if keyword_id is not None else None
+
+    def resolve(self, term):
+        # Maps a typed keyword to (keyword_id, canonical name, exact) without
+        # touching MySQL; allows a few typos. Returns None if nothing is close.
+        self._ensure_fresh()
+        term = (term or "").strip().lower()
+        if not term:
+            return None
+        keyword_id = self._ids.get(term)
+        if keyword_id is not None:
+            return KeywordMatch(keyword_id, term, True)
+
+        max_distance = 1 if len(term) <= 5 else 2
+        best = None
+        for name, _ in self._candidates(term):
+            distance = edit_distance(term, name, max_distance)
+            if distance <= max_distance and (best is None or distance < best[0]):
+                best = (distance, name)
+        if best is None:
+            return None
+        return KeywordMatch(self._ids[best[1]], best[1], False)
+
+
+keywords = KeywordIndex(mysql_utils.get_all_keywords)
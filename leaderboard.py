@@ -0,0 +1,355 @@
+import argparse
+from mysql.connector import Error
+from db import mysql_utils
+
+# Materialized top-N rankings per keyword. The search path reads
+# keyword_leaderboard by primary key instead of aggregating faculty_keyword
+# on every request (see mysql_utils.run_all_keyword_queries_transactional).
+DEFAULT_TOP_N = 25
+REFRESH_BATCH_SIZE = 500
+
+LEADERBOARD_TABLE = "keyword_leaderboard"
+DIRTY_TABLE = "keyword_leaderboard_dirty"
+
+CREATE_LEADERBOARD_TABLE = """
+    CREATE TABLE IF NOT EXISTS {table} (
+        keyword_id INT NOT NULL,
+        kind VARCHAR(16) NOT NULL,
+        rank_pos SMALLINT NOT NULL,
+        entity_id INT NOT NULL,
+        name TEXT NOT NULL,
+        score DOUBLE NOT NULL,
+        PRIMARY KEY (keyword_id, kind, rank_pos)
+    );
+"""
+
+CREATE_DIRTY_TABLE = f"""
+    CREATE TABLE IF NOT EXISTS {DIRTY_TABLE} (
+        keyword_id INT NOT NULL PRIMARY KEY,
+        marked_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+    );
+"""
+
+# Any change to a keyword's scores, or to the names and affiliations its
+# rankings display, marks that keyword for the next refresh. Deletes on the
+# parent tables fire BEFORE the row goes so the keyword rows it cascades to
+# can still be found (cascaded deletes do not fire triggers).
+TRIGGERS = {
+    "trg_faculty_keyword_leaderboard_ins": f"""
+        CREATE TRIGGER trg_faculty_keyword_leaderboard_ins
+        AFTER INSERT ON faculty_keyword FOR EACH ROW
+        INSERT IGNORE INTO {DIRTY_TABLE} (keyword_id) VALUES (NEW.keyword_id)
+    """,
+    "trg_faculty_keyword_leaderboard_upd": f"""
+        CREATE TRIGGER trg_faculty_keyword_leaderboard_upd
+        AFTER UPDATE ON faculty_keyword FOR EACH ROW
+        INSERT IGNORE INTO {DIRTY_TABLE} (keyword_id)
+        VALUES (OLD.keyword_id), (NEW.keyword_id)
+    """,
+    "trg_faculty_keyword_leaderboard_del": f"""
+        CREATE TRIGGER trg_faculty_keyword_leaderboard_del
+        AFTER DELETE ON faculty_keyword FOR EACH ROW
+        INSERT IGNORE INTO {DIRTY_TABLE} (keyword_id) VALUES (OLD.keyword_id)
+    """,
+    "trg_publication_keyword_leaderboard_ins": f"""
+        CREATE TRIGGER trg_publication_keyword_leaderboard_ins
+        AFTER INSERT ON Publication_Keyword FOR EACH ROW
+        INSERT IGNORE INTO {DIRTY_TABLE} (keyword_id) VALUES (NEW.keyword_id)
+    """,
+    "trg_publication_keyword_leaderboard_upd": f"""
+        CREATE TRIGGER trg_publication_keyword_leaderboard_upd
+        AFTER UPDATE ON Publication_Keyword FOR EACH ROW
+        INSERT IGNORE INTO {DIRTY_TABLE} (keyword_id)
+        VALUES (OLD.keyword_id), (NEW.keyword_id)
+    """,
+    "trg_publication_keyword_leaderboard_del": f"""
+        CREATE TRIGGER trg_publication_keyword_leaderboard_del
+        AFTER DELETE ON Publication_Keyword FOR EACH ROW
+        INSERT IGNORE INTO {DIRTY_TABLE} (keyword_id) VALUES (OLD.keyword_id)
+    """,
+    "trg_faculty_leaderboard_upd": f"""
+        CREATE TRIGGER trg_faculty_leaderboard_upd
+        AFTER UPDATE ON faculty FOR EACH ROW
+        INSERT IGNORE INTO {DIRTY_TABLE} (keyword_id)
+        SELECT keyword_id FROM faculty_keyword
+        WHERE faculty_id = NEW.id
+          AND NOT (OLD.name <=> NEW.name AND OLD.university_id <=> NEW.university_id)
+    """,
+    "trg_faculty_leaderboard_del": f"""
+        CREATE TRIGGER trg_faculty_leaderboard_del
+        BEFORE DELETE ON faculty FOR EACH ROW
+        INSERT IGNORE INTO {DIRTY_TABLE} (keyword_id)
+        SELECT keyword_id FROM faculty_keyword WHERE faculty_id = OLD.id
+    """,
+    "trg_university_leaderboard_upd": f"""
+        CREATE TRIGGER trg_university_leaderboard_upd
+        AFTER UPDATE ON university FOR EACH ROW
+        INSERT IGNORE INTO {DIRTY_TABLE} (keyword_id)
+        SELECT fk.keyword_id FROM faculty f
+        JOIN faculty_keyword fk ON fk.faculty_id = f.id
+        WHERE f.university_id = NEW.id AND NOT (OLD.name <=> NEW.name)
+    """,
+    "trg_university_leaderboard_del": f"""
+        CREATE TRIGGER trg_university_leaderboard_del
+        BEFORE DELETE ON university FOR EACH ROW
+        INSERT IGNORE INTO {DIRTY_TABLE} (keyword_id)
+        SELECT fk.keyword_id FROM faculty f
+        JOIN faculty_keyword fk ON fk.faculty_id = f.id
+        WHERE f.university_id = OLD.id
+    """,
+    "trg_publication_leaderboard_upd": f"""
+        CREATE TRIGGER trg_publication_leaderboard_upd
+        AFTER UPDATE ON publication FOR EACH ROW
+        INSERT IGNORE INTO {DIRTY_TABLE} (keyword_id)
+        SELECT keyword_id FROM Publication_Keyword
+        WHERE publication_id = NEW.ID AND NOT (OLD.title <=> NEW.title)
+    """,
+    "trg_publication_leaderboard_del": f"""
+        CREATE TRIGGER trg_publication_leaderboard_del
+        BEFORE DELETE ON publication FOR EACH ROW
+        INSERT IGNORE INTO {DIRTY_TABLE} (keyword_id)
+        SELECT keyword_id FROM Publication_Keyword WHERE publication_id = OLD.ID
+    """,
+}
+
+# One INSERT ... SELECT per ranking, paired with the column its keyword
+# filter applies to. {keyword_filter} is either empty (full build) or an
+# IN (...) list of keyword ids (incremental refresh).
+RANKING_INSERTS = [
+    (
+        "fk.keyword_id",
+        """
+    INSERT INTO {table} (keyword_id, kind, rank_pos, entity_id, name, score)
+    SELECT keyword_id, 'universities', rank_pos, entity_id, name, score FROM (
+        SELECT fk.keyword_id, u.id AS entity_id, u.name AS name,
+               SUM(fk.score) AS score,
+               ROW_NUMBER() OVER (
+                   PARTITION BY fk.keyword_id ORDER BY SUM(fk.score) DESC, u.id
+               ) AS rank_pos
+        FROM faculty_keyword fk
+        JOIN faculty f ON fk.faculty_id = f.id
+        JOIN university u ON f.university_id = u.id
+        {keyword_filter}
+        GROUP BY fk.keyword_id, u.id, u.name
+    ) AS ranked
+    WHERE rank_pos <= %s;
+    """,
+    ),
+    (
+        "fk.keyword_id",
+        """
+    INSERT INTO {table} (keyword_id, kind, rank_pos, entity_id, name, score)
+    SELECT keyword_id, 'professors', rank_pos, entity_id, name, score FROM (
+        SELECT fk.keyword_id, f.id AS entity_id, f.name AS name,
+               SUM(fk.score) AS score,
+               ROW_NUMBER() OVER (
+                   PARTITION BY fk.keyword_id ORDER BY SUM(fk.score) DESC, f.id
+               ) AS rank_pos
+        FROM faculty_keyword fk
+        JOIN faculty f ON fk.faculty_id = f.id
+        {keyword_filter}
+        GROUP BY fk.keyword_id, f.id, f.name
+    ) AS ranked
+    WHERE rank_pos <= %s;
+    """,
+    ),
+    (
+        "pk.keyword_id",
+        """
+    INSERT INTO {table} (keyword_id, kind, rank_pos, entity_id, name, score)
+    SELECT keyword_id, 'publications', rank_pos, entity_id, name, score FROM (
+        SELECT pk.keyword_id, p.ID AS entity_id, p.title AS name,
+               pk.score AS score,
+               ROW_NUMBER() OVER (
+                   PARTITION BY pk.keyword_id ORDER BY pk.score DESC, p.ID
+               ) AS rank_pos
+        FROM Publication_Keyword pk
+        JOIN publication p ON pk.publication_id = p.ID
+        {keyword_filter}
+    ) AS ranked
+    WHERE rank_pos <= %s;
+    """,
+    ),
+]
+
+
+def _insert_rankings(cursor, table, top_n, keyword_ids=None):
+    for column, template in RANKING_INSERTS:
+        if keyword_ids is None:
+            keyword_filter = ""
+            params = (top_n,)
+        else:
+            placeholders = ", ".join(["%s"] * len(keyword_ids))
+            keyword_filter = f"WHERE {column} IN ({placeholders})"
+            params = (*keyword_ids, top_n)
+        cursor.execute(
+            template.format(table=table, keyword_filter=keyword_filter), params
+        )
+
+
+def _invalidate_cached_rankings(keyword_ids=None):
+    # Drop cached search results that read the old leaderboard rows. Entries
+    # keyed by id are dropped one by one; name-keyed entries are keyed on the
+    # text the user typed, so that namespace is cleared whenever anything
+    # changed. None means every keyword (after a full build).
+    if keyword_ids is None:
+        mysql_utils.get_keyword_rankings.invalidate()
+    else:
+        for keyword_id in keyword_ids:
+            mysql_utils.get_keyword_rankings.invalidate(keyword_id)
+    if keyword_ids is None or keyword_ids:
+        mysql_utils.run_all_keyword_queries_transactional.invalidate()
+
+
+def create_tables():
+    with mysql_utils.pool.connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute(CREATE_LEADERBOARD_TABLE.format(table=LEADERBOARD_TABLE))
+        cursor.execute(CREATE_DIRTY_TABLE)
+        conn.commit()
+        cursor.close()
+
+
+def install_triggers():
+    # Returns {trigger name: "created" | "exists" | error message}
+    report = {}
+    with mysql_utils.pool.connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute(
+            "SELECT trigger_name FROM information_schema.triggers "
+            "WHERE trigger_schema = DATABASE();"
+        )
+        existing = {row[0] for row in cursor.fetchall()}
+        for name, ddl in TRIGGERS.items():
+            if name in existing:
+                report[name] = "exists"
+                continue
+            try:
+                cursor.execute(ddl)
+                report[name] = "created"
+            except Error as e:
+                report[name] = f"failed: {e}"
+        cursor.close()
+    return report
+
+
+def build(top_n=DEFAULT_TOP_N):
+    # Full rebuild into a shadow table, then swap it in atomically so
+    # readers never see a half-built leaderboard.
+    create_tables()
+    shadow = f"{LEADERBOARD_TABLE}_new"
+    retired = f"{LEADERBOARD_TABLE}_old"
+    with mysql_utils.pool.connection() as conn:
+        cursor = conn.cursor()
+        try:
+            cursor.execute(f"DROP TABLE IF EXISTS {shadow};")
+            cursor.execute(CREATE_LEADERBOARD_TABLE.format(table=shadow))
+            # Anything marked before the rebuild starts is covered by it
+            cursor.execute(f"DELETE FROM {DIRTY_TABLE};")
+            _insert_rankings(cursor, shadow, top_n)
+            conn.commit()
+            cursor.execute(
+                f"RENAME TABLE {LEADERBOARD_TABLE} TO {retired}, "
+                f"{shadow} TO {LEADERBOARD_TABLE};"
+            )
+            cursor.execute(f"DROP TABLE {retired};")
+            cursor.execute(f"SELECT COUNT(DISTINCT keyword_id) FROM {LEADERBOARD_TABLE};")
+            keywords = cursor.fetchone()[0]
+        except Error as e:
+            conn.rollback()
+            raise RuntimeError(f"Leaderboard build failed: {e}") from e
+        finally:
+            cursor.close()
+    _invalidate_cached_rankings()
+    return keywords
+
+
+def refresh(top_n=DEFAULT_TOP_N, batch_size=REFRESH_BATCH_SIZE):
+    # Rebuild only keywords marked dirty by the triggers. Returns the number
+    # of keywords refreshed.
+    refreshed = []
+    with mysql_utils.pool.connection() as conn:
+        cursor = conn.cursor()
+        try:
+            while True:
+                conn.start_transaction()
+                cursor.execute(
+                    f"SELECT keyword_id FROM {DIRTY_TABLE} "
+                    f"ORDER BY keyword_id LIMIT %s FOR UPDATE;",
+                    (batch_size,),
+                )
+                keyword_ids = [row[0] for row in cursor.fetchall()]
+                if not keyword_ids:
+                    conn.commit()
+                    break
+
+                placeholders = ", ".join(["%s"] * len(keyword_ids))
+                cursor.execute(
+                    f"DELETE FROM {LEADERBOARD_TABLE} "
+                    f"WHERE keyword_id IN ({placeholders});",
+                    keyword_ids,
+                )
+                _insert_rankings(cursor, LEADERBOARD_TABLE, top_n, keyword_ids)
+                cursor.execute(
+                    f"DELETE FROM {DIRTY_TABLE} WHERE keyword_id IN ({placeholders});",
+                    keyword_ids,
+                )
+                conn.commit()
+                refreshed.extend(keyword_ids)
+        except Error as e:
+            conn.rollback()
+            raise RuntimeError(f"Leaderboard refresh failed: {e}") from e
+        finally:
+            cursor.close()
+            # Batches committed before a failure are live, so their cached
+            # rankings go either way
+            _invalidate_cached_rankings(refreshed)
+    return len(refreshed)
+
+
+def status():
+    with mysql_utils.pool.connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute(
+            f"SELECT COUNT(DISTINCT keyword_id), COUNT(*) FROM {LEADERBOARD_TABLE};"
+        )
+        keywords, rows = cursor.fetchone()
+        cursor.execute(f"SELECT COUNT(*) FROM {DIRTY_TABLE};")
+        dirty = cursor.fetchone()[0]
+        cursor.close()
+    return {"keywords": keywords, "rows": rows, "dirty": dirty}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Manage keyword leaderboard tables")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    build_parser = subparsers.add_parser("build", help="rebuild all leaderboards")
+    build_parser.add_argument("--top-n", type=int, default=DEFAULT_TOP_N)
+    refresh_parser = subparsers.add_parser(
+        "refresh", help="rebuild leaderboards for changed keywords"
+    )
+    refresh_parser.add_argument("--top-n", type=int, default=DEFAULT_TOP_N)
+    refresh_parser.add_argument("--batch-size", type=int, default=REFRESH_BATCH_SIZE)
+    subparsers.add_parser(
+        "install-triggers", help="track changes that affect keyword rankings"
+    )
+    subparsers.add_parser("status", help="show leaderboard size and pending refreshes")
+    args = parser.parse_args(argv)
+
+    if args.command == "build":
+        keywords = build(top_n=args.top_n)
+        print(f"Built leaderboards for {keywords} keywords (top {args.top_n}).")
+    elif args.command == "refresh":
+        refreshed = refresh(top_n=args.top_n, batch_size=args.batch_size)
+        print(f"Refreshed leaderboards for {refreshed} keywords.")
+    elif args.command == "install-triggers":
+        create_tables()
+        for name, outcome in install_triggers().items():
+            print(f"{name}: {outcome}")
+    elif args.command == "status":
+        for key, value in status().items():
+            print(f"{key}: {value}")
+
+
+if __name__ == "__main__":
+    main()
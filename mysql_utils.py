@@ -1,7 +1,12 @@
 import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
 from dotenv import load_dotenv
 import mysql.connector
 from mysql.connector import Error
+from db import cache, clients, instrumentation, singleflight, snapshot
 
 load_dotenv()
 
@@ -15,120 +20,689 @@ def get_mysql_connection():
     )
 
 
-def create_indexes():
-    conn = get_mysql_connection()
-    cursor = conn.cursor()
-
-    index_queries = [
-        ## NON PRIMARY KEY
-        # keyword
-        "CREATE INDEX IF NOT EXISTS idx_keyword_name ON keyword(name);",
-        ### ALL BELOW SHOULD EXIST BC THEY ARE PRIMARY KEY.
-        # faculty_keyword
-        "CREATE INDEX IF NOT EXISTS idx_faculty_keyword_keywordid ON faculty_keyword(keyword_id);",
-        "CREATE INDEX IF NOT EXISTS idx_faculty_keyword_facultyid ON faculty_keyword(faculty_id);",
-        # faculty -> university
-        "CREATE INDEX IF NOT EXISTS idx_faculty_universityid ON faculty(university_id);",
-        # publication_keyword
-        "CREATE INDEX IF NOT EXISTS idx_publication_keyword_keywordid ON Publication_Keyword(keyword_id);",
-        "CREATE INDEX IF NOT EXISTS idx_publication_keyword_pubid ON Publication_Keyword(publication_id);",
-    ]
+class PoolTimeoutError(RuntimeError):
+    pass
+
+
+class ConnectionPool:
+    """Thread-safe pool of MySQL connections.
+
+    Keeps up to ``size`` idle connections and opens up to ``max_overflow``
+    extra ones under load; overflow connections are closed when returned.
+    Connections are pinged on checkout and replaced if the server dropped them.
+    """
+
+    def __init__(self, factory, size=5, max_overflow=10, timeout=30.0):
+        self.factory = factory
+        self.size = size
+        self.max_overflow = max_overflow
+        self.timeout = timeout
+        self._idle = deque()
+        self._opened = 0
+        self._in_use = 0
+        self._cond = threading.Condition()
+        self._checkouts = 0
+        self._timeouts = 0
+        self._reconnects = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+
+    def acquire(self):
+        start = time.monotonic()
+        deadline = start + self.timeout
+        with self._cond:
+            while True:
+                if self._idle:
+                    conn = self._idle.pop()
+                    break
+                if self._opened < self.size + self.max_overflow:
+                    # Reserve the slot now, connect outside the lock
+                    self._opened += 1
+                    conn = None
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self._timeouts += 1
+                    raise PoolTimeoutError(
+                        f"Timed out after {self.timeout}s waiting for a MySQL connection."
+                    )
+                self._cond.wait(remaining)
+            self._in_use += 1
+            self._checkouts += 1
+            waited = time.monotonic() - start
+            self._wait_total += waited
+            self._wait_max = max(self._wait_max, waited)
 
-    for query in index_queries:
         try:
-            cursor.execute(query)
-        except:  # noqa: E722
+            if conn is not None and not self._is_healthy(conn):
+                self._close(conn)
+                conn = None
+                with self._cond:
+                    self._reconnects += 1
+            if conn is None:
+                conn = self.factory()
+        except Exception as e:
+            with self._cond:
+                self._opened -= 1
+                self._in_use -= 1
+                self._cond.notify()
+            if isinstance(e, Error):
+                raise clients.BackendUnavailable("mysql", e) from e
+            raise
+        return conn
+
+    def release(self, conn, discard=False):
+        if not discard:
+            try:
+                if conn.in_transaction:
+                    conn.rollback()
+            except Error:
+                discard = True
+
+        with self._cond:
+            self._in_use -= 1
+            keep = not discard and len(self._idle) < self.size
+            if keep:
+                self._idle.append(conn)
+            else:
+                self._opened -= 1
+            self._cond.notify()
+
+        if not keep:
+            self._close(conn)
+
+    @contextmanager
+    def connection(self):
+        conn = self.acquire()
+        discard = False
+        try:
+            yield conn
+        except BaseException as e:
+            # The connection may be in an unknown state after a driver error,
+            # including one the caller re-raised as another exception
+            discard = _caused_by_driver_error(e)
+            raise
+        finally:
+            self.release(conn, discard=discard)
+
+    def stats(self):
+        with self._cond:
+            return {
+                "size": self.size,
+                "max_overflow": self.max_overflow,
+                "opened": self._opened,
+                "in_use": self._in_use,
+                "idle": len(self._idle),
+                "checkouts": self._checkouts,
+                "timeouts": self._timeouts,
+                "reconnects": self._reconnects,
+                "wait_time_total": self._wait_total,
+                "wait_time_max": self._wait_max,
+                "wait_time_avg": (
+                    self._wait_total / self._checkouts if self._checkouts else 0.0
+                ),
+            }
+
+    def dispose(self):
+        with self._cond:
+            idle = list(self._idle)
+            self._idle.clear()
+            self._opened -= len(idle)
+        for conn in idle:
+            self._close(conn)
+
+    @staticmethod
+    def _is_healthy(conn):
+        try:
+            # is_connected() pings the server
+            return conn.is_connected()
+        except Error:
+            return False
+
+    @staticmethod
+    def _close(conn):
+        try:
+            conn.close()
+        except Error:
             pass
 
-    conn.commit()
-    cursor.close()
-    conn.close()
 
+def _caused_by_driver_error(exc):
+    # True if exc is a mysql Error or was raised while handling one
+    seen = set()
+    while exc is not None and id(exc) not in seen:
+        if isinstance(exc, Error):
+            return True
+        seen.add(id(exc))
+        exc = exc.__cause__ or exc.__context__
+    return False
 
-# Call index creation at python module load time
-create_indexes()
 
+# Connections are opened lazily on first checkout
+pool = ConnectionPool(
+    get_mysql_connection,
+    size=int(os.getenv("SQL_POOL_SIZE", "5")),
+    max_overflow=int(os.getenv("SQL_POOL_MAX_OVERFLOW", "10")),
+    timeout=float(os.getenv("SQL_POOL_TIMEOUT", "30")),
+)
 
-def keyword_exists(keyword: str) -> bool:
+
+def get_pool_stats():
+    return pool.stats()
+
+
+def _probe_pool(pool):
+    # Checking out a connection pings it (or opens a new one)
+    with pool.connection():
+        pass
+
+
+clients.registry.register(
+    "mysql", lambda: pool, probe=_probe_pool, close=ConnectionPool.dispose
+)
+
+
+def _pool_metrics():
+    stats = pool.stats()
+    return [
+        (name, kind, help_text, [({}, stats[key])])
+        for name, key, kind, help_text in (
+            ("mysql_pool_in_use", "in_use", "gauge", "MySQL connections checked out."),
+            ("mysql_pool_idle", "idle", "gauge", "Idle MySQL connections in the pool."),
+            (
+                "mysql_pool_timeouts_total",
+                "timeouts",
+                "counter",
+                "Checkouts that timed out.",
+            ),
+            (
+                "mysql_pool_wait_seconds_total",
+                "wait_time_total",
+                "counter",
+                "Seconds spent waiting for a connection.",
+            ),
+        )
+    ]
+
+
+instrumentation.add_collector(_pool_metrics)
+
+
+KEYWORD_ID_QUERY = "SELECT id FROM keyword WHERE name = %s LIMIT 1;"
+
+# All three top-5 rankings for a resolved keyword id in one statement. Each
+# ranking is a LIMITed derived table so the branches stay independent, and
+# rows are tagged with the list they belong to.
+KEYWORD_RANKINGS_QUERY = """
+    SELECT kind, entity_id, name, score FROM (
+        SELECT 'universities' AS kind, u.id AS entity_id, u.name AS name,
+               SUM(fk.score) AS score
+        FROM faculty_keyword fk
+        JOIN faculty f ON fk.faculty_id = f.id
+        JOIN university u ON f.university_id = u.id
+        WHERE fk.keyword_id = %s
+        GROUP BY u.id, u.name
+        ORDER BY score DESC
+        LIMIT 5
+    ) AS top_universities
+    UNION ALL
+    SELECT kind, entity_id, name, score FROM (
+        SELECT 'professors' AS kind, f.id AS entity_id, f.name AS name,
+               SUM(fk.score) AS score
+        FROM faculty_keyword fk
+        JOIN faculty f ON fk.faculty_id = f.id
+        WHERE fk.keyword_id = %s
+        GROUP BY f.id, f.name
+        ORDER BY score DESC
+        LIMIT 5
+    ) AS top_professors
+    UNION ALL
+    SELECT kind, entity_id, name, score FROM (
+        SELECT 'publications' AS kind, p.ID AS entity_id, p.title AS name,
+               pk.score AS score
+        FROM Publication_Keyword pk
+        JOIN publication p ON pk.publication_id = p.ID
+        WHERE pk.keyword_id = %s
+        ORDER BY pk.score DESC
+        LIMIT 5
+    ) AS top_publications
+    ORDER BY kind, score DESC;
+"""
+
+# Precomputed top-N rankings maintained by `python -m db.leaderboard`. When
+# enabled, searches read them by primary key and only fall back to the live
+# aggregation for keywords the leaderboard has no rows for.
+USE_LEADERBOARD = os.getenv("SQL_USE_LEADERBOARD", "0") == "1"
+
+LEADERBOARD_RANKINGS_QUERY = """
+    SELECT kind, entity_id, name, score
+    FROM keyword_leaderboard
+    WHERE keyword_id = %s AND rank_pos <= 5
+    ORDER BY kind, rank_pos;
+"""
+
+
+def _normalize_keyword(keyword):
     if keyword is not None:
         keyword = keyword.strip().lower()
-    query = "SELECT 1 FROM keyword WHERE name = %s LIMIT 1;"
-    conn = get_mysql_connection()
-    cursor = conn.cursor()
-    cursor.execute(query, (keyword,))
-    exists = cursor.fetchone() is not None
-    cursor.close()
-    conn.close()
-    return exists
+    return keyword
+
+
+def _fetch_keyword_id(cursor, keyword):
+    cursor.execute(KEYWORD_ID_QUERY, (keyword,))
+    row = cursor.fetchone()
+    return row[0] if row else None
+
+
+@snapshot.serves("keyword_id")
+@instrumentation.instrumented("mysql")
+def resolve_keyword_id(keyword: str):
+    keyword = _normalize_keyword(keyword)
+    with pool.connection() as conn:
+        cursor = conn.cursor()
+        keyword_id = _fetch_keyword_id(cursor, keyword)
+        cursor.close()
+    return keyword_id
+
+
+def keyword_exists(keyword: str) -> bool:
+    return resolve_keyword_id(keyword) is not None
+
+
+@snapshot.serves("all_keywords")
+@instrumentation.instrumented("mysql")
+def get_all_keywords():
+    # [(id, name)] for building the in-memory keyword index
+    with pool.connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("SELECT id, name FROM keyword;")
+        rows = cursor.fetchall()
+        cursor.close()
+    return rows
+
+
+def _group_rankings(rows):
+    results = {"universities": [], "professors": [], "publications": []}
+    for kind, _, name, score in rows:
+        results[kind].append((name, score))
+    return results
+
+
+def _fetch_rankings(cursor, keyword_id):
+    rows = []
+    if USE_LEADERBOARD:
+        cursor.execute(LEADERBOARD_RANKINGS_QUERY, (keyword_id,))
+        rows = cursor.fetchall()
+    if not rows:
+        cursor.execute(KEYWORD_RANKINGS_QUERY, (keyword_id,) * 3)
+        rows = cursor.fetchall()
+    return _group_rankings(rows)
 
 
+@cache.cached("keyword_rankings")
+@singleflight.coalesce("keyword_rankings")
+@snapshot.serves("keyword_rankings_by_name")
+@instrumentation.instrumented("mysql")
 def run_all_keyword_queries_transactional(keyword: str):
-    if keyword is not None:
-        keyword = keyword.strip().lower()
+    keyword = _normalize_keyword(keyword)
+
+    with pool.connection() as conn:
+        cursor = None
+        try:
+            # Start a read-only transaction with consistent snapshot
+            conn.start_transaction(readonly=True, isolation_level="REPEATABLE READ")
+            cursor = conn.cursor(prepared=True)
+
+            # Resolve the keyword once; the rankings are keyed on its id
+            keyword_id = _fetch_keyword_id(cursor, keyword)
+            if keyword_id is None:
+                conn.rollback()
+                raise ValueError(
+                    f"Keyword '{keyword}' does not exist in the database."
+                )
+
+            results = _fetch_rankings(cursor, keyword_id)
+
+            conn.commit()
+            return results
+
+        except Error as e:
+            conn.rollback()
+            raise RuntimeError(f"Transaction failed: {e}") from e
+
+        finally:
+            if cursor is not None:
+                cursor.close()
+
+
+@cache.cached("keyword_rankings_by_id")
+@singleflight.coalesce("keyword_rankings_by_id")
+@snapshot.serves("keyword_rankings")
+@instrumentation.instrumented("mysql")
+def get_keyword_rankings(keyword_id: int):
+    # Same as run_all_keyword_queries_transactional for a keyword already
+    # resolved to its id (e.g. by keyword_index), skipping the name lookup
+    with pool.connection() as conn:
+        cursor = None
+        try:
+            conn.start_transaction(readonly=True, isolation_level="REPEATABLE READ")
+            cursor = conn.cursor(prepared=True)
+            results = _fetch_rankings(cursor, keyword_id)
+            conn.commit()
+            return results
+
+        except Error as e:
+            conn.rollback()
+            raise RuntimeError(f"Transaction failed: {e}") from e
+
+        finally:
+            if cursor is not None:
+                cursor.close()
+
+
+# Rankings for several keywords at once, each entity scored by the weighted
+# sum of its per-keyword scores. {weights} expands to one "SELECT %s, %s" row
+# per keyword, so the statement text grows with the number of keywords (and
+# differs per count), while the aggregation only reads the rows matching them.
+WEIGHTED_RANKINGS_QUERY = """
+    WITH w (keyword_id, weight) AS ({weights})
+    SELECT kind, entity_id, name, score FROM (
+        SELECT 'universities' AS kind, u.id AS entity_id, u.name AS name,
+               SUM(fk.score * w.weight) AS score
+        FROM w
+        JOIN faculty_keyword fk ON fk.keyword_id = w.keyword_id
+        JOIN faculty f ON fk.faculty_id = f.id
+        JOIN university u ON f.university_id = u.id
+        GROUP BY u.id, u.name
+        ORDER BY score DESC, u.id
+        LIMIT %s
+    ) AS top_universities
+    UNION ALL
+    SELECT kind, entity_id, name, score FROM (
+        SELECT 'professors' AS kind, f.id AS entity_id, f.name AS name,
+               SUM(fk.score * w.weight) AS score
+        FROM w
+        JOIN faculty_keyword fk ON fk.keyword_id = w.keyword_id
+        JOIN faculty f ON fk.faculty_id = f.id
+        GROUP BY f.id, f.name
+        ORDER BY score DESC, f.id
+        LIMIT %s
+    ) AS top_professors
+    UNION ALL
+    SELECT kind, entity_id, name, score FROM (
+        SELECT 'publications' AS kind, p.ID AS entity_id, p.title AS name,
+               SUM(pk.score * w.weight) AS score
+        FROM w
+        JOIN Publication_Keyword pk ON pk.keyword_id = w.keyword_id
+        JOIN publication p ON pk.publication_id = p.ID
+        GROUP BY p.ID, p.title
+        ORDER BY score DESC, p.ID
+        LIMIT %s
+    ) AS top_publications
+    ORDER BY kind, score DESC;
+"""
+
+
+@cache.cached("weighted_rankings")
+@singleflight.coalesce("weighted_rankings")
+@snapshot.serves("weighted_rankings")
+@instrumentation.instrumented("mysql")
+def get_weighted_rankings(weights, limit=5):
+    # Same shape as get_keyword_rankings for ((keyword_id, weight), ...), in
+    # one statement
+    weights = tuple((int(keyword_id), float(weight)) for keyword_id, weight in weights)
+    if not weights:
+        return _group_rankings([])
+    query = WEIGHTED_RANKINGS_QUERY.format(
+        weights=" UNION ALL ".join(["SELECT %s, %s"] * len(weights))
+    )
+    params = [value for pair in weights for value in pair] + [limit] * 3
+
+    with pool.connection() as conn:
+        cursor = None
+        try:
+            conn.start_transaction(readonly=True, isolation_level="REPEATABLE READ")
+            cursor = conn.cursor(prepared=True)
+            cursor.execute(query, params)
+            results = _group_rankings(cursor.fetchall())
+            conn.commit()
+            return results
+
+        except Error as e:
+            conn.rollback()
+            raise RuntimeError(f"Transaction failed: {e}") from e
+
+        finally:
+            if cursor is not None:
+                cursor.close()
+
+
+# Keyset ("seek") pagination over the full rankings. {seek} is empty for the
+# first page; later pages continue strictly after the last row of the previous
+# page, ordered by the sort column with the entity id as tie-breaker, so every
+# page costs the same however deep it is. Aggregated scores are rounded so
+# they compare equal across executions.
+RANKING_PAGE_QUERIES = {
+    "universities": """
+        SELECT u.id AS entity_id, u.name AS name,
+            ROUND(SUM(fk.score), 6) AS total_score
+        FROM faculty_keyword fk
+        JOIN faculty f ON fk.faculty_id = f.id
+        JOIN university u ON f.university_id = u.id
+        WHERE fk.keyword_id = %s
+        GROUP BY u.id, u.name
+        {seek}
+        ORDER BY {order}
+        LIMIT %s;
+    """,
+    "professors": """
+        SELECT f.id AS entity_id, f.name AS name,
+            ROUND(SUM(fk.score), 6) AS total_score
+        FROM faculty_keyword fk
+        JOIN faculty f ON fk.faculty_id = f.id
+        WHERE fk.keyword_id = %s
+        GROUP BY f.id, f.name
+        {seek}
+        ORDER BY {order}
+        LIMIT %s;
+    """,
+    "publications": """
+        SELECT pk.publication_id AS entity_id, p.title AS name, pk.score AS score
+        FROM Publication_Keyword pk
+        JOIN publication p ON pk.publication_id = p.ID
+        WHERE pk.keyword_id = %s
+        {seek}
+        ORDER BY {order}
+        LIMIT %s;
+    """,
+}
 
-    if not keyword_exists(keyword):
-        raise ValueError(f"Keyword '{keyword}' does not exist in the database.")
+# kind -> (seek clause keyword, {sort key: column}, id column). The summed
+# score is aliased total_score so HAVING cannot resolve it to fk.score.
+RANKING_PAGE_COLUMNS = {
+    "universities": ("HAVING", {"score": "total_score", "name": "u.name"}, "u.id"),
+    "professors": ("HAVING", {"score": "total_score", "name": "f.name"}, "f.id"),
+    "publications": (
+        "AND",
+        {"score": "pk.score", "name": "p.title"},
+        "pk.publication_id",
+    ),
+}
 
-    conn = get_mysql_connection()
-    try:
-        # Start a read-only transaction with consistent snapshot
-        conn.start_transaction(readonly=True, isolation_level='REPEATABLE READ')
+
+def _ranking_page_query(kind, sort, descending, seek):
+    if kind not in RANKING_PAGE_QUERIES:
+        raise ValueError(f"Unknown ranking '{kind}'.")
+    clause, columns, id_column = RANKING_PAGE_COLUMNS[kind]
+    if sort not in columns:
+        raise ValueError(f"Cannot sort {kind} by '{sort}'.")
+    column = columns[sort]
+    direction, comparison = ("DESC", "<") if descending else ("ASC", ">")
+    seek_clause = ""
+    if seek:
+        seek_clause = (
+            f"{clause} ({column} {comparison} %s "
+            f"OR ({column} = %s AND {id_column} {comparison} %s))"
+        )
+    return RANKING_PAGE_QUERIES[kind].format(
+        seek=seek_clause, order=f"{column} {direction}, {id_column} {direction}"
+    )
+
+
+@cache.cached("ranking_pages")
+@singleflight.coalesce("ranking_pages")
+@snapshot.serves("ranking_page")
+@instrumentation.instrumented("mysql", rows=lambda page: len(page["rows"]))
+def get_ranking_page(
+    keyword_id: int, kind: str, sort="score", descending=True, after=None, limit=10
+):
+    # One page of the universities, professors or publications ranking for a
+    # keyword, sorted by "score" or "name". Returns
+    #   {"rows": [(entity_id, name, score)], "next": cursor or None}
+    # Pass "next" back as after= for the following page; it is None on the
+    # last page.
+    query = _ranking_page_query(kind, sort, descending, seek=after is not None)
+    params = [keyword_id]
+    if after is not None:
+        value, entity_id = after
+        params += [value, value, entity_id]
+    params.append(limit + 1)
+
+    with pool.connection() as conn:
         cursor = conn.cursor(prepared=True)
+        cursor.execute(query, params)
+        rows = cursor.fetchall()
+        cursor.close()
 
+    page = [tuple(row) for row in rows[:limit]]
+    following = None
+    if len(rows) > limit:
+        entity_id, name, score = page[-1]
+        following = (score if sort == "score" else name, entity_id)
+    return {"rows": page, "next": following}
+
+
+FACULTY_BY_NAME_QUERY = "SELECT id, name FROM faculty WHERE name = %s LIMIT 1;"
+UNIVERSITY_BY_NAME_QUERY = "SELECT id, name FROM university WHERE name = %s LIMIT 1;"
+
+
+def _find_by_name(query, name):
+    with pool.connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute(query, (name.strip(),))
+        row = cursor.fetchone()
+        cursor.close()
+    return (row[0], row[1]) if row else None
 
-        # Query 1: Top Universities
-        query_universities = """
-            SELECT u.name AS university_name, SUM(fk.score) AS total_score
-            FROM faculty_keyword fk
-            JOIN faculty f ON fk.faculty_id = f.id
-            JOIN university u ON f.university_id = u.id
-            JOIN keyword k ON fk.keyword_id = k.id
-            WHERE k.name = %s
-            GROUP BY u.id
-            ORDER BY total_score DESC
-            LIMIT 5;
-        """
-        cursor.execute(query_universities, (keyword,))
-        universities = cursor.fetchall()
-
-        # Query 2: Top Professors
-        query_professors = """
-            SELECT f.name AS professor_name, SUM(fk.score) AS total_score
-            FROM faculty_keyword fk
-            JOIN faculty f ON fk.faculty_id = f.id
-            JOIN keyword k ON fk.keyword_id = k.id
-            WHERE k.name = %s
-            GROUP BY f.id
-            ORDER BY total_score DESC
-            LIMIT 5;
-        """
-        cursor.execute(query_professors, (keyword,))
-        professors = cursor.fetchall()
-
-        # Query 3: Top Publications
-        query_publications = """
-            SELECT p.title AS publication_title, pk.score AS keyword_score
-            FROM Publication_Keyword pk
-            JOIN publication p ON pk.publication_id = p.ID
-            JOIN keyword k ON pk.keyword_id = k.id
-            WHERE k.name = %s
-            ORDER BY pk.score DESC
-            LIMIT 5;
-        """
-        cursor.execute(query_publications, (keyword,))
-        publications = cursor.fetchall()
-
-        conn.commit()
-        return {
-            "universities": universities,
-            "professors": professors,
-            "publications": publications,
-        }
 
-    except Error as e:
-        conn.rollback()
-        raise RuntimeError(f"Transaction failed: {e}")
+@instrumentation.instrumented("mysql")
+def find_faculty(name: str):
+    # (id, name) of the professor with this name, or None
+    return _find_by_name(FACULTY_BY_NAME_QUERY, name)
 
-    finally:
+
+@instrumentation.instrumented("mysql")
+def find_university(name: str):
+    # (id, name) of the university with this name, or None
+    return _find_by_name(UNIVERSITY_BY_NAME_QUERY, name)
+
+
+# Summaries for a batch of favorites, one statement per category whatever the
+# number of ids. {ids} expands to one placeholder per id; the CTE ranks each
+# entity's keywords (or, for topics, professors) so the top 3 can be
+# concatenated.
+PROFESSOR_SUMMARY_QUERY = """
+    WITH ranked AS (
+        SELECT fk.faculty_id AS entity_id, k.name AS label, fk.score AS score,
+               ROW_NUMBER() OVER (
+                   PARTITION BY fk.faculty_id ORDER BY fk.score DESC, k.id
+               ) AS rn
+        FROM faculty_keyword fk
+        JOIN keyword k ON k.id = fk.keyword_id
+        WHERE fk.faculty_id IN ({ids})
+    )
+    SELECT f.id, f.name,
+           (SELECT SUM(r.score) FROM ranked r WHERE r.entity_id = f.id),
+           (SELECT COUNT(*) FROM faculty_publication fp WHERE fp.faculty_id = f.id),
+           (SELECT GROUP_CONCAT(r.label ORDER BY r.rn SEPARATOR '|')
+            FROM ranked r WHERE r.entity_id = f.id AND r.rn <= 3)
+    FROM faculty f
+    WHERE f.id IN ({ids});
+"""
+
+UNIVERSITY_SUMMARY_QUERY = """
+    WITH ranked AS (
+        SELECT f.university_id AS entity_id, k.name AS label,
+               SUM(fk.score) AS score,
+               ROW_NUMBER() OVER (
+                   PARTITION BY f.university_id ORDER BY SUM(fk.score) DESC, k.id
+               ) AS rn
+        FROM faculty f
+        JOIN faculty_keyword fk ON fk.faculty_id = f.id
+        JOIN keyword k ON k.id = fk.keyword_id
+        WHERE f.university_id IN ({ids})
+        GROUP BY f.university_id, k.id, k.name
+    )
+    SELECT u.id, u.name,
+           (SELECT SUM(r.score) FROM ranked r WHERE r.entity_id = u.id),
+           (SELECT COUNT(DISTINCT fp.publication_id)
+            FROM faculty f
+            JOIN faculty_publication fp ON fp.faculty_id = f.id
+            WHERE f.university_id = u.id),
+           (SELECT GROUP_CONCAT(r.label ORDER BY r.rn SEPARATOR '|')
+            FROM ranked r WHERE r.entity_id = u.id AND r.rn <= 3)
+    FROM university u
+    WHERE u.id IN ({ids});
+"""
+
+TOPIC_SUMMARY_QUERY = """
+    WITH ranked AS (
+        SELECT fk.keyword_id AS entity_id, f.name AS label, fk.score AS score,
+               ROW_NUMBER() OVER (
+                   PARTITION BY fk.keyword_id ORDER BY fk.score DESC, f.id
+               ) AS rn
+        FROM faculty_keyword fk
+        JOIN faculty f ON f.id = fk.faculty_id
+        WHERE fk.keyword_id IN ({ids})
+    )
+    SELECT k.id, k.name,
+           (SELECT SUM(r.score) FROM ranked r WHERE r.entity_id = k.id),
+           (SELECT COUNT(*) FROM Publication_Keyword pk WHERE pk.keyword_id = k.id),
+           (SELECT GROUP_CONCAT(r.label ORDER BY r.rn SEPARATOR '|')
+            FROM ranked r WHERE r.entity_id = k.id AND r.rn <= 3)
+    FROM keyword k
+    WHERE k.id IN ({ids});
+"""
+
+SUMMARY_QUERIES = {
+    "professors": PROFESSOR_SUMMARY_QUERY,
+    "universities": UNIVERSITY_SUMMARY_QUERY,
+    "topics": TOPIC_SUMMARY_QUERY,
+}
+
+
+@instrumentation.instrumented("mysql", rows=len)
+def get_summaries(category: str, ids):
+    # {id: {"id", "name", "total_score", "publications", "top"}} where "top"
+    # is the 3 highest-scoring keywords (professors, universities) or
+    # professors (topics)
+    ids = list(dict.fromkeys(ids))
+    if not ids:
+        return {}
+    placeholders = ", ".join(["%s"] * len(ids))
+    query = SUMMARY_QUERIES[category].format(ids=placeholders)
+    with pool.connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute(query, ids * 2)
+        rows = cursor.fetchall()
         cursor.close()
-        conn.close()
+    return {
+        entity_id: {
+            "id": entity_id,
+            "name": name,
+            "total_score": float(total_score or 0),
+            "publications": int(publications or 0),
+            "top": top.split("|") if top else [],
+        }
+        for entity_id, name, total_score, publications, top in rows
+    }
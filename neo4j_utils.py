@@ -1,6 +1,10 @@
+import argparse
+import logging
+import sys
 from neo4j import GraphDatabase
 import os
 from dotenv import load_dotenv
+from db import cache, clients, instrumentation, singleflight, snapshot
 
 load_dotenv()
 URI = "bolt://localhost:7687"
@@ -11,38 +15,368 @@ AUTH = (
 )
 database = "academicworld"
 
-driver = GraphDatabase.driver(URI, auth=AUTH, database=database)
+CONNECTION_TIMEOUT = float(os.getenv("NEO4J_CONNECTION_TIMEOUT", "5"))
 
+logger = logging.getLogger(__name__)
 
+# Look up keywords the name_lower seek misses by scanning every KEYWORD's
+# name. Off by default: a miss is a keyword with no data, and keywords loaded
+# since the last bootstrap get name_lower from `bootstrap` or
+# `refresh-citations`.
+NAME_SCAN_FALLBACK = os.getenv("NEO4J_NAME_SCAN_FALLBACK", "0") == "1"
+
+
+def _create_driver():
+    return GraphDatabase.driver(
+        URI, auth=AUTH, database=database, connection_timeout=CONNECTION_TIMEOUT
+    )
+
+
+# The driver is created on first use, not at import time
+clients.registry.register(
+    "neo4j",
+    _create_driver,
+    probe=lambda driver: driver.verify_connectivity(),
+    close=lambda driver: driver.close(),
+)
+
+
+def get_driver():
+    return clients.registry.get("neo4j")
+
+
+ALL_UNIVERSITIES_QUERY = "MATCH (i:INSTITUTE) RETURN i.name AS name ORDER BY i.name"
+
+
+@snapshot.serves("all_universities")
+@instrumentation.instrumented("neo4j")
 def get_all_universities():
-    query = "MATCH (i:INSTITUTE) RETURN i.name AS name ORDER BY i.name"
-    with driver.session() as session:
-        result = session.run(query)
+    with get_driver().session() as session:
+        result = session.run(ALL_UNIVERSITIES_QUERY)
         return [r["name"] for r in result]
 
 
+# Both lookups start from an index seek on the anchor node (see
+# bootstrap_schema) instead of scanning every node of the label.
+UNIVERSITY_KEYWORDS_QUERY = """
+MATCH (i:INSTITUTE {name: $university_name})<-[:AFFILIATION_WITH]-(f:FACULTY),
+      (f)-[:INTERESTED_IN]->(k:KEYWORD)
+RETURN k.name AS keyword, COUNT(*) AS count
+ORDER BY count DESC
+LIMIT 10
+"""
+
+# KEYWORD.name_lower holds toLower(name) so case-insensitive lookups can use
+# an index; it is set by bootstrap_schema and refresh_citation_series.
+CITATION_TREND_QUERY = """
+UNWIND $keyword_names AS keyword_name
+MATCH (k:KEYWORD {name_lower: keyword_name})<-[:LABEL_BY]-(p:PUBLICATION)
+WHERE p.year IS NOT NULL
+RETURN keyword_name, p.year AS year, SUM(p.numCitations) AS totalCitations
+ORDER BY keyword_name, year
+"""
+
+# Same aggregation for keywords without name_lower; scans the KEYWORD label,
+# so it only runs with NAME_SCAN_FALLBACK for names the seek did not find
+CITATION_TREND_BY_NAME_QUERY = """
+UNWIND $keyword_names AS keyword_name
+MATCH (k:KEYWORD)<-[:LABEL_BY]-(p:PUBLICATION)
+WHERE toLower(k.name) = keyword_name AND p.year IS NOT NULL
+RETURN keyword_name, p.year AS year, SUM(p.numCitations) AS totalCitations
+ORDER BY keyword_name, year
+"""
+
+# Precomputed year -> citations series stored on the KEYWORD node as two
+# parallel lists (see refresh_citation_series).
+CITATION_SERIES_QUERY = """
+UNWIND $keyword_names AS keyword_name
+MATCH (k:KEYWORD {name_lower: keyword_name})
+RETURN keyword_name, k.citation_years AS years, k.citation_totals AS totals
+"""
+
+# Also sets name_lower, so keywords loaded since the last bootstrap become
+# reachable by the index seek
+REFRESH_CITATION_SERIES = """
+MATCH (k:KEYWORD)
+WHERE ($keyword_names IS NULL OR toLower(k.name) IN $keyword_names)
+  AND (NOT $missing_only OR k.citation_years IS NULL)
+CALL {
+    WITH k
+    OPTIONAL MATCH (k)<-[:LABEL_BY]-(p:PUBLICATION)
+    WHERE p.year IS NOT NULL
+    WITH k, p.year AS year, SUM(p.numCitations) AS total
+    ORDER BY year
+    WITH k, [x IN collect({year: year, total: total}) WHERE x.year IS NOT NULL] AS series
+    SET k.name_lower = toLower(k.name),
+        k.citation_years = [x IN series | x.year],
+        k.citation_totals = [x IN series | x.total],
+        k.citation_series_updated = datetime()
+} IN TRANSACTIONS OF 1000 ROWS
+"""
+
+
+@cache.cached("university_keywords")
+@singleflight.coalesce("university_keywords")
+@snapshot.serves("top_keywords_by_university")
+@instrumentation.instrumented("neo4j")
 def get_top_keywords_by_university(university_name):
-    query = """
-    MATCH (f:FACULTY)-[:AFFILIATION_WITH]->(i:INSTITUTE {name: $university_name}),
-          (f)-[:INTERESTED_IN]->(k:KEYWORD)
-    RETURN k.name AS keyword, COUNT(*) AS count
-    ORDER BY count DESC
-    LIMIT 10
-    """
-    with driver.session() as session:
-        result = session.run(query, university_name=university_name)
+    with get_driver().session() as session:
+        result = session.run(UNIVERSITY_KEYWORDS_QUERY, university_name=university_name)
         return [{"keyword": r["keyword"], "count": r["count"]} for r in result]
 
 
+# Full keyword-count distributions of several universities in one round trip;
+# each row of the UNWIND starts from the same index seek as above
+UNIVERSITY_DISTRIBUTIONS_QUERY = """
+UNWIND $university_names AS university_name
+MATCH (i:INSTITUTE {name: university_name})<-[:AFFILIATION_WITH]-(f:FACULTY),
+      (f)-[:INTERESTED_IN]->(k:KEYWORD)
+RETURN university_name, k.name AS keyword, COUNT(*) AS count
+ORDER BY university_name, count DESC, keyword
+"""
+
+
+@cache.cached("university_distributions")
+@singleflight.coalesce("university_distributions")
+@snapshot.serves("keyword_distributions")
+@instrumentation.instrumented("neo4j")
+def get_keyword_distributions(university_names):
+    # {university: [{"keyword", "count"}]} most frequent first, with every
+    # keyword rather than the top 10; unknown universities map to []
+    university_names = list(dict.fromkeys(university_names))
+    distributions = {name: [] for name in university_names}
+    with get_driver().session() as session:
+        result = session.run(
+            UNIVERSITY_DISTRIBUTIONS_QUERY, university_names=university_names
+        )
+        for r in result:
+            distributions[r["university_name"]].append(
+                {"keyword": r["keyword"], "count": r["count"]}
+            )
+    return distributions
+
+
+def _add_points(points, series):
+    # Adds (year, citations) pairs into {year: citations}
+    for year, total in series:
+        points[year] = points.get(year, 0) + total
+
+
 def get_citation_trend_by_keyword(keyword_name):
-    query = """
-    MATCH (p:PUBLICATION)-[:LABEL_BY]->(k:KEYWORD)
-    WHERE toLower(k.name) = toLower($keyword_name)
-    RETURN p.year AS year, SUM(p.numCitations) AS totalCitations
-    ORDER BY year
-    """
-    with driver.session() as session:
-        result = session.run(query, keyword_name=keyword_name)
-        return [
-            {"year": r["year"], "totalCitations": r["totalCitations"]} for r in result
+    # Cached and coalesced through get_citation_trends_by_keywords, so each
+    # trend is stored once whichever function asked for it
+    keyword_name = keyword_name.strip().lower()
+    return get_citation_trends_by_keywords([keyword_name])[keyword_name]
+
+
+@cache.cached("citation_trends")
+@singleflight.coalesce("citation_trends")
+@snapshot.serves("citation_trends")
+@instrumentation.instrumented("neo4j")
+def get_citation_trends_by_keywords(keyword_names):
+    # {keyword: [{"year", "totalCitations"}]} for several keywords in one
+    # round trip. Keywords without a precomputed series fall back to the live
+    # aggregation in a second query. Keywords the name_lower seek does not
+    # find have no trend (see NAME_SCAN_FALLBACK). Points are summed per
+    # year, so KEYWORD nodes sharing a lower-cased name make one trend.
+    keyword_names = list(dict.fromkeys(name.strip().lower() for name in keyword_names))
+    totals = {name: {} for name in keyword_names}
+    missing = []
+    with get_driver().session() as session:
+        result = session.run(CITATION_SERIES_QUERY, keyword_names=keyword_names)
+        found = set()
+        for r in result:
+            found.add(r["keyword_name"])
+            if r["years"] is None:
+                missing.append(r["keyword_name"])
+                continue
+            _add_points(totals[r["keyword_name"]], zip(r["years"], r["totals"]))
+
+        # One node without a series sends the whole name to the live query,
+        # which sums over all of its nodes
+        missing = list(dict.fromkeys(missing))
+        for name in missing:
+            totals[name] = {}
+        unindexed = []
+        if NAME_SCAN_FALLBACK:
+            unindexed = [name for name in keyword_names if name not in found]
+            if unindexed:
+                logger.warning(
+                    "No KEYWORD.name_lower for %s; scanning names. Run "
+                    "`python -m db.neo4j_utils bootstrap` to backfill it.",
+                    ", ".join(unindexed),
+                )
+        for query, names in (
+            (CITATION_TREND_QUERY, missing),
+            (CITATION_TREND_BY_NAME_QUERY, unindexed),
+        ):
+            if not names:
+                continue
+            for r in session.run(query, keyword_names=names):
+                _add_points(
+                    totals[r["keyword_name"]], [(r["year"], r["totalCitations"])]
+                )
+    return {
+        name: [
+            {"year": year, "totalCitations": total}
+            for year, total in sorted(points.items())
         ]
+        for name, points in totals.items()
+    }
+
+
+@instrumentation.instrumented("neo4j", rows=lambda updated: updated)
+def refresh_citation_series(keyword_names=None, missing_only=False):
+    # Materializes each keyword's citation series onto its KEYWORD node.
+    # Pass keyword_names to refresh only keywords whose publications changed.
+    # Returns the number of keywords updated.
+    if keyword_names is not None:
+        keyword_names = [name.strip().lower() for name in keyword_names]
+    with get_driver().session() as session:
+        summary = session.run(
+            REFRESH_CITATION_SERIES,
+            keyword_names=keyword_names,
+            missing_only=missing_only,
+        ).consume()
+    cache.invalidate("citation_trends")
+    # Four properties are set per keyword
+    return summary.counters.properties_set // 4
+
+
+# (name, statement, fallback). Uniqueness constraints are preferred since
+# they come with an index; if existing data violates one, a plain index is
+# created instead.
+SCHEMA_STATEMENTS = [
+    (
+        "institute_name",
+        "CREATE CONSTRAINT institute_name_unique IF NOT EXISTS "
+        "FOR (i:INSTITUTE) REQUIRE i.name IS UNIQUE",
+        "CREATE INDEX institute_name IF NOT EXISTS FOR (i:INSTITUTE) ON (i.name)",
+    ),
+    (
+        "keyword_name",
+        "CREATE CONSTRAINT keyword_name_unique IF NOT EXISTS "
+        "FOR (k:KEYWORD) REQUIRE k.name IS UNIQUE",
+        "CREATE INDEX keyword_name IF NOT EXISTS FOR (k:KEYWORD) ON (k.name)",
+    ),
+    (
+        "keyword_name_lower",
+        "CREATE INDEX keyword_name_lower IF NOT EXISTS "
+        "FOR (k:KEYWORD) ON (k.name_lower)",
+        None,
+    ),
+]
+
+BACKFILL_KEYWORD_NAME_LOWER = """
+MATCH (k:KEYWORD)
+WHERE k.name_lower IS NULL OR k.name_lower <> toLower(k.name)
+CALL { WITH k SET k.name_lower = toLower(k.name) } IN TRANSACTIONS OF 10000 ROWS
+"""
+
+
+def bootstrap_schema():
+    # Creates the constraints/indexes the lookup queries rely on and fills in
+    # KEYWORD.name_lower. Safe to re-run. Returns [(name, outcome)].
+    report = []
+    with get_driver().session() as session:
+        for name, statement, fallback in SCHEMA_STATEMENTS:
+            try:
+                session.run(statement).consume()
+                report.append((name, "ok"))
+            except Exception as e:
+                if fallback is None:
+                    report.append((name, f"failed: {e}"))
+                    continue
+                session.run(fallback).consume()
+                report.append((name, "ok (non-unique index)"))
+
+        summary = session.run(BACKFILL_KEYWORD_NAME_LOWER).consume()
+        report.append(
+            ("keyword_name_lower backfill", f"{summary.counters.properties_set} set")
+        )
+        session.run("CALL db.awaitIndexes(300)").consume()
+    return report
+
+
+def _plan_operators(plan):
+    operators = [plan.get("operatorType", "")]
+    for child in plan.get("children", []):
+        operators.extend(_plan_operators(child))
+    return operators
+
+
+def _uses_index_seek(operators):
+    # The plan finds its anchor through an index and never scans a label
+    return any("IndexSeek" in op for op in operators) and not any(
+        "LabelScan" in op or "AllNodesScan" in op for op in operators
+    )
+
+
+def profile_query(query, **params):
+    # Runs the query under PROFILE and returns the operator types of its plan
+    with get_driver().session() as session:
+        summary = session.run("PROFILE " + query, **params).consume()
+    return _plan_operators(summary.profile)
+
+
+def check_lookup_plans(keyword_name, university_name):
+    # Verifies the trend and university-keyword queries start with an index
+    # seek. Returns {query: {"operators": [...], "index_seek": bool}}.
+    plans = {
+        "citation_trend": profile_query(
+            CITATION_TREND_QUERY, keyword_names=[keyword_name.strip().lower()]
+        ),
+        "citation_series": profile_query(
+            CITATION_SERIES_QUERY, keyword_names=[keyword_name.strip().lower()]
+        ),
+        "university_keywords": profile_query(
+            UNIVERSITY_KEYWORDS_QUERY, university_name=university_name
+        ),
+    }
+    return {
+        name: {"operators": operators, "index_seek": _uses_index_seek(operators)}
+        for name, operators in plans.items()
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Neo4j schema maintenance")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    subparsers.add_parser("bootstrap", help="create constraints and indexes")
+    check_parser = subparsers.add_parser(
+        "check-plans", help="PROFILE the lookup queries and verify index seeks"
+    )
+    check_parser.add_argument("keyword")
+    check_parser.add_argument("university")
+    series_parser = subparsers.add_parser(
+        "refresh-citations", help="precompute per-keyword citation series"
+    )
+    series_parser.add_argument(
+        "keywords", nargs="*", help="only refresh these keywords (default: all)"
+    )
+    series_parser.add_argument(
+        "--missing-only",
+        action="store_true",
+        help="only keywords without a precomputed series",
+    )
+    args = parser.parse_args(argv)
+
+    if args.command == "bootstrap":
+        for name, outcome in bootstrap_schema():
+            print(f"{name}: {outcome}")
+    elif args.command == "check-plans":
+        plans = check_lookup_plans(args.keyword, args.university)
+        for name, plan in plans.items():
+            status = "index seek" if plan["index_seek"] else "NO INDEX SEEK"
+            print(f"{name}: {status} ({' -> '.join(plan['operators'])})")
+        if not all(plan["index_seek"] for plan in plans.values()):
+            sys.exit(1)
+    elif args.command == "refresh-citations":
+        updated = refresh_citation_series(
+            keyword_names=args.keywords or None, missing_only=args.missing_only
+        )
+        print(f"Refreshed citation series for {updated} keywords.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,269 @@
+import argparse
+import json
+import os
+import shutil
+import sys
+import threading
+import time
+import uuid
+import numpy as np
+from scipy import sparse
+from dotenv import load_dotenv
+from db import mysql_utils
+
+load_dotenv()
+
+RELATED_KEYWORDS_DIR = os.getenv("RELATED_KEYWORDS_DIR", "data/related_keywords")
+TOP_K = 20
+# Weight of faculty co-occurrence in the combined similarity; publications
+# get the rest
+FACULTY_WEIGHT = 0.5
+# Keywords per block of the similarity product, to bound memory
+BLOCK_SIZE = 1024
+FETCH_SIZE = 50000
+# Seconds between checks for a rebuilt table
+RELOAD_INTERVAL = 5.0
+
+FILES = ("keyword_ids", "names", "neighbors", "scores")
+
+
+def _load_pairs(cursor, query):
+    # (entity ids, keyword ids, scores) as arrays, read in batches
+    cursor.execute(query)
+    entities, keywords, scores = [], [], []
+    while True:
+        rows = cursor.fetchmany(FETCH_SIZE)
+        if not rows:
+            break
+        entity, keyword, score = zip(*rows)
+        entities.append(np.asarray(entity, dtype=np.int64))
+        keywords.append(np.asarray(keyword, dtype=np.int64))
+        scores.append(np.asarray(score, dtype=np.float32))
+    if not entities:
+        empty = np.empty(0, dtype=np.int64)
+        return empty, empty, np.empty(0, dtype=np.float32)
+    return np.concatenate(entities), np.concatenate(keywords), np.concatenate(scores)
+
+
+def _keyword_matrix(keyword_ids, entities, keywords, scores):
+    # keywords x entities CSR matrix with unit-length rows, so a row product
+    # is a cosine similarity
+    known = np.isin(keywords, keyword_ids)
+    entities, keywords, scores = entities[known], keywords[known], scores[known]
+    rows = np.searchsorted(keyword_ids, keywords)
+    _, columns = np.unique(entities, return_inverse=True)
+    matrix = sparse.csr_matrix(
+        (scores, (rows, columns)),
+        shape=(len(keyword_ids), int(columns.max()) + 1 if len(columns) else 0),
+    )
+    norms = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=1)).ravel())
+    norms[norms == 0] = 1.0
+    return (sparse.diags(1.0 / norms) @ matrix).tocsr()
+
+
+def _top_k(similarity, offset, top_k):
+    # (neighbors, scores) of the top_k entries per row of a CSR block,
+    # skipping each keyword itself; positions are -1 where a row has fewer
+    neighbors = np.full((similarity.shape[0], top_k), -1, dtype=np.int32)
+    scores = np.zeros((similarity.shape[0], top_k), dtype=np.float32)
+    for row in range(similarity.shape[0]):
+        start, end = similarity.indptr[row], similarity.indptr[row + 1]
+        columns = similarity.indices[start:end]
+        values = similarity.data[start:end]
+        keep = (columns != offset + row) & (values > 0)
+        columns, values = columns[keep], values[keep]
+        if len(values) > top_k:
+            best = np.argpartition(-values, top_k)[:top_k]
+            columns, values = columns[best], values[best]
+        order = np.argsort(-values, kind="stable")
+        neighbors[row, : len(order)] = columns[order]
+        scores[row, : len(order)] = values[order]
+    return neighbors, scores
+
+
+def _read_meta(directory):
+    try:
+        with open(os.path.join(directory, "meta.json")) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def build(output_dir=RELATED_KEYWORDS_DIR, top_k=TOP_K, faculty_weight=FACULTY_WEIGHT):
+    """Computes the top-K related keywords of every keyword and saves them.
+
+    Similarity is the cosine between keywords' faculty score vectors and
+    between their publication score vectors, mixed by ``faculty_weight``.
+    The result is written as .npy files that RelatedKeywords memory-maps.
+    Returns the number of keywords.
+    """
+    with mysql_utils.pool.connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("SELECT id, name FROM keyword ORDER BY id;")
+        keyword_rows = cursor.fetchall()
+        faculty = _load_pairs(
+            cursor, "SELECT faculty_id, keyword_id, score FROM faculty_keyword;"
+        )
+        publications = _load_pairs(
+            cursor,
+            "SELECT publication_id, keyword_id, score FROM Publication_Keyword;",
+        )
+        cursor.close()
+
+    keyword_ids = np.asarray([row[0] for row in keyword_rows], dtype=np.int64)
+    names = np.asarray([row[1] for row in keyword_rows], dtype=str)
+    by_faculty = _keyword_matrix(keyword_ids, *faculty)
+    by_publication = _keyword_matrix(keyword_ids, *publications)
+
+    neighbors = np.full((len(keyword_ids), top_k), -1, dtype=np.int32)
+    scores = np.zeros((len(keyword_ids), top_k), dtype=np.float32)
+    for start in range(0, len(keyword_ids), BLOCK_SIZE):
+        block = slice(start, start + BLOCK_SIZE)
+        similarity = faculty_weight * (by_faculty[block] @ by_faculty.T) + (
+            1 - faculty_weight
+        ) * (by_publication[block] @ by_publication.T)
+        neighbors[block], scores[block] = _top_k(
+            sparse.csr_matrix(similarity), start, top_k
+        )
+
+    arrays = {
+        "keyword_ids": keyword_ids,
+        "names": names,
+        "neighbors": neighbors,
+        "scores": scores,
+    }
+    # Each build goes to a new version subdirectory, and meta.json, which
+    # names it, is replaced last; readers switch to the new set as a whole
+    # and mappings of the old files stay valid meanwhile
+    version = f"{time.strftime('%Y%m%dT%H%M%S')}-{uuid.uuid4().hex[:8]}"
+    staging = os.path.join(output_dir, f".{version}.tmp")
+    shutil.rmtree(staging, ignore_errors=True)
+    os.makedirs(staging)
+    for name, array in arrays.items():
+        np.save(os.path.join(staging, f"{name}.npy"), array)
+    os.replace(staging, os.path.join(output_dir, version))
+
+    path = os.path.join(output_dir, "meta.json")
+    previous = _read_meta(output_dir).get("version")
+    meta = {
+        "version": version,
+        "built_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "keywords": len(keyword_ids),
+        "top_k": top_k,
+        "faculty_weight": faculty_weight,
+    }
+    with open(path + ".tmp", "w") as f:
+        json.dump(meta, f)
+    os.replace(path + ".tmp", path)
+
+    # The previous version is kept for readers still loading it
+    for entry in os.listdir(output_dir):
+        directory = os.path.join(output_dir, entry)
+        if entry not in (version, previous) and os.path.isdir(directory):
+            shutil.rmtree(directory, ignore_errors=True)
+    return len(keyword_ids)
+
+
+class RelatedKeywords:
+    """Memory-mapped top-K neighbor table written by build().
+
+    A lookup is a binary search over the sorted keyword ids and a slice of
+    the neighbor row; no database is involved. Files are mapped on first use
+    and remapped when a rebuild replaces them.
+    """
+
+    def __init__(self, path=RELATED_KEYWORDS_DIR, reload_interval=RELOAD_INTERVAL):
+        self.path = path
+        self.reload_interval = reload_interval
+        self._arrays = None
+        self._mtime = None
+        self._checked_at = None
+        self._lock = threading.Lock()
+
+    def _load(self):
+        now = time.monotonic()
+        checked_at = self._checked_at
+        if checked_at is not None and now - checked_at < self.reload_interval:
+            return self._arrays
+        with self._lock:
+            self._checked_at = now
+            try:
+                mtime = os.path.getmtime(os.path.join(self.path, "meta.json"))
+            except OSError:
+                self._arrays = None
+                return None
+            if self._arrays is None or mtime != self._mtime:
+                directory = os.path.join(
+                    self.path, _read_meta(self.path).get("version", "")
+                )
+                try:
+                    self._arrays = {
+                        name: np.load(
+                            os.path.join(directory, f"{name}.npy"), mmap_mode="r"
+                        )
+                        for name in FILES
+                    }
+                except (OSError, ValueError):
+                    # Keep the current table and try again on the next check
+                    return self._arrays
+                self._mtime = mtime
+        return self._arrays
+
+    def available(self):
+        return self._load() is not None
+
+    def related(self, keyword_id, limit=10):
+        # [(keyword_id, name, similarity)] most similar first; [] if the
+        # keyword is unknown or the table has not been built
+        arrays = self._load()
+        if arrays is None:
+            return []
+        keyword_ids = arrays["keyword_ids"]
+        row = np.searchsorted(keyword_ids, keyword_id)
+        if row >= len(keyword_ids) or keyword_ids[row] != keyword_id:
+            return []
+        neighbors = arrays["neighbors"][row, :limit]
+        scores = arrays["scores"][row, :limit]
+        return [
+            (int(keyword_ids[n]), str(arrays["names"][n]), float(score))
+            for n, score in zip(neighbors, scores)
+            if n >= 0
+        ]
+
+
+related = RelatedKeywords()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Related keywords table")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    build_parser = subparsers.add_parser(
+        "build", help="compute the table from MySQL (offline)"
+    )
+    build_parser.add_argument("--output", default=RELATED_KEYWORDS_DIR)
+    build_parser.add_argument("--top-k", type=int, default=TOP_K)
+    build_parser.add_argument(
+        "--faculty-weight", type=float, default=FACULTY_WEIGHT
+    )
+    lookup_parser = subparsers.add_parser("lookup", help="show a keyword's neighbors")
+    lookup_parser.add_argument("keyword_id", type=int)
+    lookup_parser.add_argument("--limit", type=int, default=10)
+    args = parser.parse_args(argv)
+
+    if args.command == "build":
+        started = time.perf_counter()
+        count = build(args.output, args.top_k, args.faculty_weight)
+        print(
+            f"Built related keywords for {count} keywords in "
+            f"{time.perf_counter() - started:.1f}s ({args.output})"
+        )
+    else:
+        neighbors = related.related(args.keyword_id, args.limit)
+        if not neighbors and not related.available():
+            sys.exit(f"No table in {related.path}; run the build command first.")
+        for keyword_id, name, score in neighbors:
+            print(f"{score:.3f}  {name} ({keyword_id})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+import argparse
+import sys
+from mysql.connector import Error
+from db import mysql_utils
+
+# Secondary indexes the keyword queries rely on: (name, table, columns)
+INDEXES = [
+    ## NON PRIMARY KEY
+    # keyword
+    ("idx_keyword_name", "keyword", ("name",)),
+    # faculty_keyword
+    ("idx_faculty_keyword_keywordid", "faculty_keyword", ("keyword_id",)),
+    ("idx_faculty_keyword_facultyid", "faculty_keyword", ("faculty_id",)),
+    # faculty -> university
+    ("idx_faculty_universityid", "faculty", ("university_id",)),
+    # publication_keyword
+    # (keyword_id, score, publication_id) serves both the keyword lookup and
+    # the score-ordered, keyset-paginated publication rankings
+    (
+        "idx_publication_keyword_keyword_score",
+        "Publication_Keyword",
+        ("keyword_id", "score", "publication_id"),
+    ),
+    ("idx_publication_keyword_pubid", "Publication_Keyword", ("publication_id",)),
+]
+
+# Indexes earlier versions created that a wider index above now covers:
+# (name, table). migrate() drops them once the covering index exists.
+OBSOLETE_INDEXES = [
+    # A prefix of idx_publication_keyword_keyword_score
+    ("idx_publication_keyword_keywordid", "Publication_Keyword"),
+]
+
+EXISTING_INDEXES_QUERY = """
+    SELECT table_name, index_name, column_name
+    FROM information_schema.statistics
+    WHERE table_schema = DATABASE()
+    ORDER BY table_name, index_name, seq_in_index;
+"""
+
+
+def get_existing_indexes(cursor):
+    # {table (lower-cased): {index name: [columns in order]}}
+    cursor.execute(EXISTING_INDEXES_QUERY)
+    existing = {}
+    for table, index, column in cursor.fetchall():
+        existing.setdefault(table.lower(), {}).setdefault(index, []).append(
+            column.lower()
+        )
+    return existing
+
+
+def _covering_index(table_indexes, columns, exclude=None):
+    # An index whose leading columns match serves the same lookups
+    wanted = [c.lower() for c in columns]
+    for index, index_columns in table_indexes.items():
+        if index != exclude and index_columns[: len(wanted)] == wanted:
+            return index
+    return None
+
+
+def migrate(dry_run=False):
+    # Returns [(index name, outcome)]; outcome is "exists", "covered by <index>",
+    # "created", "missing" (dry run), "dropped", "obsolete" (dry run) or
+    # "failed: <error>".
+    report = []
+    with mysql_utils.pool.connection() as conn:
+        cursor = conn.cursor()
+        existing = get_existing_indexes(cursor)
+        for name, table, columns in INDEXES:
+            table_indexes = existing.setdefault(table.lower(), {})
+            if name in table_indexes:
+                report.append((name, "exists"))
+                continue
+            covering = _covering_index(table_indexes, columns)
+            if covering is not None:
+                report.append((name, f"covered by {covering}"))
+                continue
+            if dry_run:
+                # Counted as created, so the obsolete indexes it covers show up
+                table_indexes[name] = [c.lower() for c in columns]
+                report.append((name, "missing"))
+                continue
+            try:
+                cursor.execute(f"CREATE INDEX {name} ON {table}({', '.join(columns)});")
+                table_indexes[name] = [c.lower() for c in columns]
+                report.append((name, "created"))
+            except Error as e:
+                report.append((name, f"failed: {e}"))
+
+        for name, table in OBSOLETE_INDEXES:
+            table_indexes = existing.get(table.lower(), {})
+            if name not in table_indexes:
+                continue
+            # Only dropped while another index still serves its lookups
+            columns = table_indexes[name]
+            if _covering_index(table_indexes, columns, exclude=name) is None:
+                continue
+            if dry_run:
+                report.append((name, "obsolete"))
+                continue
+            try:
+                cursor.execute(f"DROP INDEX {name} ON {table};")
+                report.append((name, "dropped"))
+            except Error as e:
+                report.append((name, f"failed: {e}"))
+        cursor.close()
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Create missing MySQL indexes")
+    parser.add_argument(
+        "--dry-run", action="store_true", help="report missing indexes only"
+    )
+    args = parser.parse_args(argv)
+
+    report = migrate(dry_run=args.dry_run)
+    for name, outcome in report:
+        print(f"{name}: {outcome}")
+    if any(outcome.startswith("failed") for _, outcome in report):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
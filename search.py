@@ -0,0 +1,275 @@
+import contextvars
+import math
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from db import keyword_index, mysql_utils, neo4j_utils
+
+# Per-source time budgets in seconds, measured from the start of the search
+SOURCE_TIMEOUTS = {
+    "rankings": float(os.getenv("SEARCH_MYSQL_TIMEOUT", "10")),
+    "citation_trend": float(os.getenv("SEARCH_NEO4J_TIMEOUT", "3")),
+}
+
+# Threads per source, shared across requests. A source that times out keeps
+# running in the background and its result still lands in the result cache;
+# each source has its own pool so hung Neo4j queries cannot starve rankings.
+SOURCE_WORKERS = {
+    "rankings": int(os.getenv("SEARCH_MYSQL_WORKERS", "8")),
+    "citation_trend": int(os.getenv("SEARCH_NEO4J_WORKERS", "4")),
+}
+
+_executors = {
+    source: ThreadPoolExecutor(
+        max_workers=workers, thread_name_prefix=f"search-{source}"
+    )
+    for source, workers in SOURCE_WORKERS.items()
+}
+
+
+SOURCES = ("rankings", "citation_trend")
+
+
+class SourceTimeout(TimeoutError):
+    def __init__(self, source, timeout):
+        super().__init__(f"{source} did not respond within {timeout:g}s")
+        self.source = source
+
+
+def _sources(match, keyword):
+    # {source: (function, argument)}. A keyword resolved by the in-memory
+    # index goes straight to the id-keyed rankings; if the index itself is
+    # unavailable, MySQL resolves the name inside the ranking transaction.
+    if match is None:
+        return {
+            "rankings": (mysql_utils.run_all_keyword_queries_transactional, keyword),
+            "citation_trend": (neo4j_utils.get_citation_trend_by_keyword, keyword),
+        }
+    return {
+        "rankings": (mysql_utils.get_keyword_rankings, match.keyword_id),
+        "citation_trend": (neo4j_utils.get_citation_trend_by_keyword, match.name),
+    }
+
+
+def unknown_keyword_error(keyword):
+    message = f"Keyword '{keyword}' does not exist in the database."
+    try:
+        similar = keyword_index.keywords.similar(keyword)
+    except Exception:
+        similar = []
+    if similar:
+        message += " Did you mean: " + ", ".join(similar) + "?"
+    return ValueError(message)
+
+
+def _timed(func, *args):
+    start = time.perf_counter()
+    try:
+        return func(*args), None, time.perf_counter() - start
+    except Exception as e:
+        return None, e, time.perf_counter() - start
+
+
+def _fan_out(sources, timeouts, started):
+    # Runs {source: (function, argument)} in parallel and returns
+    # (results, errors, timings) as described in search_keyword. Each source
+    # runs in a copy of the caller's context so its queries are attributed to
+    # the request being traced (see tracing.py).
+    futures = {
+        source: _executors[source].submit(
+            contextvars.copy_context().run, _timed, func, arg
+        )
+        for source, (func, arg) in sources.items()
+    }
+
+    results, errors, timings = {}, {}, {}
+    for source, future in futures.items():
+        remaining = max(0.0, started + timeouts[source] - time.perf_counter())
+        try:
+            value, error, elapsed = future.result(timeout=remaining)
+        except FutureTimeoutError:
+            errors[source] = SourceTimeout(source, timeouts[source])
+            timings[source] = round((time.perf_counter() - started) * 1000, 2)
+            continue
+        if error is not None:
+            errors[source] = error
+        else:
+            results[source] = value
+        timings[source] = round(elapsed * 1000, 2)
+    return results, errors, timings
+
+
+def search_keyword(keyword, timeouts=None, sources=SOURCES):
+    # Fans a keyword search out to MySQL (the ranking batch) and Neo4j (the
+    # citation trend) in parallel, or to just the given sources. Returns
+    #   {"keyword", "match", "results": {source: value},
+    #    "errors": {source: exception}, "timings": {source: milliseconds},
+    #    "total_ms"}
+    # "match" is the keyword_index.KeywordMatch the search ran for (None if
+    # the index was unavailable). A source that fails or exceeds its timeout
+    # shows up in "errors" without holding up the others.
+    keyword = keyword.strip().lower()
+    timeouts = {**SOURCE_TIMEOUTS, **(timeouts or {})}
+    started = time.perf_counter()
+
+    try:
+        match = keyword_index.keywords.resolve(keyword)
+    except Exception:
+        match = None
+    else:
+        if match is None:
+            return {
+                "keyword": keyword,
+                "match": None,
+                "results": {"citation_trend": []},
+                "errors": {"rankings": unknown_keyword_error(keyword)},
+                "timings": {},
+                "total_ms": round((time.perf_counter() - started) * 1000, 2),
+            }
+
+    selected = {
+        source: call
+        for source, call in _sources(match, keyword).items()
+        if source in sources
+    }
+    results, errors, timings = _fan_out(selected, timeouts, started)
+    return {
+        "keyword": keyword,
+        "match": match,
+        "results": results,
+        "errors": errors,
+        "timings": timings,
+        "total_ms": round((time.perf_counter() - started) * 1000, 2),
+    }
+
+
+def parse_keywords(text):
+    # "machine learning:2, robotics" -> [("machine learning", 2.0),
+    # ("robotics", 1.0)]. Keywords are separated by commas, and a trailing
+    # ":<number>" weights a keyword's scores; any other ":" or "+" is part of
+    # the keyword ("c++", "ontology: owl").
+    terms = []
+    for part in text.split(","):
+        name, value = part, 1.0
+        head, separator, weight = part.rpartition(":")
+        if separator:
+            try:
+                value = float(weight)
+            except ValueError:
+                pass
+            else:
+                name = head
+        name = name.strip().lower()
+        if not name:
+            continue
+        if not math.isfinite(value) or value <= 0:
+            raise ValueError(f"The weight for '{name}' must be a positive number.")
+        terms.append((name, value))
+    return terms
+
+
+def _resolve(name):
+    # KeywordMatch for name via the in-memory index, or MySQL if the index is
+    # unavailable; None if the keyword does not exist
+    try:
+        return keyword_index.keywords.resolve(name)
+    except Exception:
+        keyword_id = mysql_utils.resolve_keyword_id(name)
+        if keyword_id is None:
+            return None
+        return keyword_index.KeywordMatch(keyword_id, name, True)
+
+
+def search_keywords(text, timeouts=None, sources=SOURCES):
+    # Multi-keyword search: "a, b:2" ranks by the weighted sum of scores
+    # across all keywords in one MySQL statement and fetches every keyword's
+    # citation trend in one Neo4j query. A single unweighted keyword is a
+    # plain search_keyword. The result is search_keyword's, plus "matches"
+    # and "weights" ({keyword: weight}), and "citation_trend" is
+    # {keyword: trend}. Text that is itself a keyword ("c++", "ontology: owl")
+    # is searched as one keyword before it is split.
+    whole = (text or "").strip().lower()
+    try:
+        match = keyword_index.keywords.resolve(whole)
+    except Exception:
+        match = None
+    if match is not None and match.exact:
+        return search_keyword(whole, timeouts, sources)
+
+    try:
+        terms = parse_keywords(text or "")
+    except ValueError as e:
+        terms, error = [], e
+    else:
+        error = None
+    if len(terms) == 1 and terms[0][1] == 1.0:
+        return search_keyword(terms[0][0], timeouts, sources)
+
+    timeouts = {**SOURCE_TIMEOUTS, **(timeouts or {})}
+    started = time.perf_counter()
+    matches, weights, unknown = [], {}, []
+    if error is None:
+        for name, weight in terms:
+            try:
+                match = _resolve(name)
+            except Exception as e:
+                error = e
+                break
+            if match is None:
+                unknown.append(name)
+                continue
+            if match.name not in weights:
+                matches.append(match)
+            weights[match.name] = weights.get(match.name, 0.0) + weight
+    if error is None and len(unknown) == 1:
+        error = unknown_keyword_error(unknown[0])
+    elif error is None and unknown:
+        listed = ", ".join(f"'{name}'" for name in unknown)
+        error = ValueError(f"Keywords {listed} do not exist in the database.")
+    if error is None and not matches:
+        error = ValueError("Please enter a keyword.")
+
+    result = {
+        "keyword": ", ".join(name for name, _ in terms),
+        "match": None,
+        "matches": matches,
+        "weights": weights,
+        "results": {"citation_trend": {}},
+        "errors": {},
+        "timings": {},
+    }
+    if error is not None:
+        result["errors"]["rankings"] = error
+    else:
+        ids = tuple((match.keyword_id, weights[match.name]) for match in matches)
+        names = tuple(match.name for match in matches)
+        calls = {
+            "rankings": (mysql_utils.get_weighted_rankings, ids),
+            "citation_trend": (neo4j_utils.get_citation_trends_by_keywords, names),
+        }
+        selected = {source: calls[source] for source in sources}
+        results, errors, timings = _fan_out(selected, timeouts, started)
+        result.update(results=results, errors=errors, timings=timings)
+    result["total_ms"] = round((time.perf_counter() - started) * 1000, 2)
+    return result
+
+
+def citation_trend(keyword_names, timeouts=None):
+    # The citation trend source on its own, for keywords a search already
+    # resolved: one keyword's trend as a list, several as {keyword: trend}.
+    # Returns {"results", "errors", "timings", "total_ms"} like search_keyword.
+    timeouts = {**SOURCE_TIMEOUTS, **(timeouts or {})}
+    started = time.perf_counter()
+    names = tuple(keyword_names)
+    if len(names) == 1:
+        call = (neo4j_utils.get_citation_trend_by_keyword, names[0])
+    else:
+        call = (neo4j_utils.get_citation_trends_by_keywords, names)
+    results, errors, timings = _fan_out({"citation_trend": call}, timeouts, started)
+    return {
+        "results": results,
+        "errors": errors,
+        "timings": timings,
+        "total_ms": round((time.perf_counter() - started) * 1000, 2),
+    }
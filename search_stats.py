@@ -0,0 +1,108 @@
+import atexit
+import fcntl
+import json
+import logging
+import os
+import threading
+import time
+from collections import Counter
+from dotenv import load_dotenv
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+SEARCH_STATS_FILE = os.getenv("SEARCH_STATS_FILE", "data/search_stats.json")
+SEARCH_STATS_FLUSH_INTERVAL = float(os.getenv("SEARCH_STATS_FLUSH_INTERVAL", "30"))
+
+
+class SearchStats:
+    """How often each keyword has been searched, persisted to a JSON file.
+
+    Searches are counted in memory and merged into the file every
+    ``flush_interval`` seconds by a background thread, and at exit. The
+    merge holds an exclusive flock on a lock file next to it, so gunicorn
+    workers on the same host add to the same counts.
+    """
+
+    def __init__(
+        self, path=SEARCH_STATS_FILE, flush_interval=SEARCH_STATS_FLUSH_INTERVAL
+    ):
+        self.path = path
+        self.flush_interval = flush_interval
+        self._pending = Counter()
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._flusher = None
+        self._stop = threading.Event()
+
+    def record(self, *keywords):
+        keywords = [k.strip().lower() for k in keywords if k and k.strip()]
+        if not keywords:
+            return
+        with self._lock:
+            self._pending.update(keywords)
+            self._start_flusher()
+
+    def _read(self):
+        try:
+            with open(self.path) as f:
+                return Counter(json.load(f).get("counts", {}))
+        except FileNotFoundError:
+            return Counter()
+        except (OSError, ValueError):
+            logger.warning("Ignoring unreadable %s", self.path, exc_info=True)
+            return Counter()
+
+    def flush(self):
+        with self._flush_lock:
+            with self._lock:
+                pending, self._pending = self._pending, Counter()
+            if not pending:
+                return
+            try:
+                directory = os.path.dirname(self.path)
+                if directory:
+                    os.makedirs(directory, exist_ok=True)
+                with open(self.path + ".lock", "a") as lock:
+                    fcntl.flock(lock, fcntl.LOCK_EX)
+                    counts = self._read()
+                    counts.update(pending)
+                    tmp = f"{self.path}.tmp-{os.getpid()}"
+                    with open(tmp, "w") as f:
+                        json.dump(
+                            {"updated_at": time.time(), "counts": dict(counts)}, f
+                        )
+                    os.replace(tmp, self.path)
+            except OSError:
+                logger.warning("Could not save search stats", exc_info=True)
+                with self._lock:
+                    self._pending.update(pending)
+
+    def top(self, n=20):
+        # [(keyword, count)] most searched first, including unsaved searches
+        counts = self._read()
+        with self._lock:
+            counts.update(self._pending)
+        return counts.most_common(n)
+
+    def _start_flusher(self):
+        # Called with self._lock held
+        if self._flusher is not None:
+            return
+        self._flusher = threading.Thread(
+            target=self._flush_loop, name="search-stats-flush", daemon=True
+        )
+        self._flusher.start()
+        atexit.register(self.close)
+
+    def _flush_loop(self):
+        while not self._stop.wait(self.flush_interval):
+            self.flush()
+
+    def close(self):
+        self._stop.set()
+        self.flush()
+
+
+stats = SearchStats()
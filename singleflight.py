@@ -0,0 +1,136 @@
+import inspect
+import os
+import threading
+from functools import wraps
+from dotenv import load_dotenv
+from db import cache, instrumentation
+
+load_dotenv()
+
+SINGLEFLIGHT_ENABLED = os.getenv("SINGLEFLIGHT_ENABLED", "1") == "1"
+
+
+class _Call:
+    __slots__ = ("done", "value", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+        self.error = None
+
+
+class SingleFlight:
+    """Coalesces concurrent identical calls into one execution.
+
+    The first caller for a key (the leader) runs the function; callers that
+    arrive with the same key while it is running wait and get the leader's
+    result, or its exception. Nothing is kept once the call returns, so this
+    complements the result cache rather than replacing it: it covers the
+    moment a popular entry is missing and every request misses at once.
+    Works across the threads of one process.
+    """
+
+    def __init__(self, enabled=True):
+        self.enabled = enabled
+        self._calls = {}
+        self._lock = threading.Lock()
+        self._counters = {}
+
+    def _count(self, namespace, counter, amount=1):
+        # Called with self._lock held
+        counters = self._counters.setdefault(
+            namespace, {"leaders": 0, "coalesced": 0}
+        )
+        counters[counter] += amount
+
+    def do(self, key, namespace, func, *args, **kwargs):
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+                self._count(namespace, "leaders")
+            else:
+                self._count(namespace, "coalesced")
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.value
+
+        try:
+            call.value = func(*args, **kwargs)
+            return call.value
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+    def coalesce(self, namespace):
+        # Decorator; goes between @cache.cached and the function so that only
+        # cache misses are coalesced. Calls are keyed on their bound arguments,
+        # as the cache keys them, so both layers agree on what is the same call.
+        def decorator(func):
+            signature = inspect.signature(func)
+
+            @wraps(func)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return func(*args, **kwargs)
+                key_args, key_kwargs = cache._bound_args(signature, args, kwargs)
+                key = f"{namespace}:{key_args!r}"
+                if key_kwargs:
+                    key += f":{sorted(key_kwargs.items())!r}"
+                return self.do(key, namespace, func, *args, **kwargs)
+
+            return wrapper
+
+        return decorator
+
+    def in_flight(self):
+        with self._lock:
+            return len(self._calls)
+
+    def stats(self):
+        with self._lock:
+            return {ns: dict(c) for ns, c in self._counters.items()}
+
+    def reset(self):
+        with self._lock:
+            self._counters.clear()
+
+
+flights = SingleFlight(enabled=SINGLEFLIGHT_ENABLED)
+
+coalesce = flights.coalesce
+get_stats = flights.stats
+
+
+def _singleflight_metrics():
+    stats = flights.stats()
+    return [
+        (
+            f"singleflight_{counter}_total",
+            "counter",
+            help_text,
+            [({"namespace": ns}, c[counter]) for ns, c in sorted(stats.items())],
+        )
+        for counter, help_text in (
+            ("leaders", "Calls that ran the query themselves."),
+            ("coalesced", "Calls that shared the result of an identical call."),
+        )
+    ] + [
+        (
+            "singleflight_in_flight",
+            "gauge",
+            "Calls running now.",
+            [({}, flights.in_flight())],
+        )
+    ]
+
+
+instrumentation.add_collector(_singleflight_metrics)
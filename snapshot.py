@@ -0,0 +1,372 @@
+import json
+import os
+import threading
+from functools import wraps
+import numpy as np
+from dotenv import load_dotenv
+from db import instrumentation
+
+load_dotenv()
+
+# DATA_BACKEND=snapshot answers the read paths from a local snapshot written
+# by `python -m db.snapshot_export` instead of MySQL and Neo4j
+DATA_BACKEND = os.getenv("DATA_BACKEND", "live")
+SNAPSHOT_DIR = os.getenv("SNAPSHOT_DIR", "data/snapshot")
+
+FORMAT_VERSION = 1
+
+
+def read_meta(directory):
+    try:
+        with open(os.path.join(directory, "snapshot.json")) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_strings(directory, name, values):
+    # A string column is its UTF-8 bytes back to back plus an offsets array
+    encoded = [value.encode() for value in values]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    np.cumsum([len(value) for value in encoded], out=offsets[1:])
+    np.save(os.path.join(directory, f"{name}.offsets.npy"), offsets)
+    np.save(
+        os.path.join(directory, f"{name}.utf8.npy"),
+        np.frombuffer(b"".join(encoded), dtype=np.uint8),
+    )
+
+
+def grouped_offsets(rows, count):
+    # Offsets into arrays sorted by rows, so group i is [ptr[i], ptr[i + 1])
+    ptr = np.zeros(count + 1, dtype=np.int64)
+    np.cumsum(np.bincount(rows, minlength=count), out=ptr[1:])
+    return ptr
+
+
+class StringColumn:
+    def __init__(self, directory, name):
+        self._offsets = np.load(
+            os.path.join(directory, f"{name}.offsets.npy"), mmap_mode="r"
+        )
+        self._data = np.load(
+            os.path.join(directory, f"{name}.utf8.npy"), mmap_mode="r"
+        )
+        self._index = None
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._offsets) - 1
+
+    def __getitem__(self, i):
+        return bytes(self._data[self._offsets[i] : self._offsets[i + 1]]).decode()
+
+    def tolist(self):
+        return [self[i] for i in range(len(self))]
+
+    def position(self, value):
+        # Row of value, or None; the index is built on first use
+        if self._index is None:
+            with self._lock:
+                if self._index is None:
+                    self._index = {}
+                    for i, item in enumerate(self.tolist()):
+                        self._index.setdefault(item, i)
+        return self._index.get(value)
+
+
+class Snapshot:
+    """Read-only, in-process copy of the data behind the search read paths.
+
+    Columns are memory-mapped .npy files, with each keyword's faculty and
+    publication scores stored contiguously, so a ranking is an array slice
+    plus a vectorized group-by. Answers in the same shapes as the mysql_utils
+    and neo4j_utils functions it stands in for.
+    """
+
+    ARRAYS = (
+        "keyword_ids",
+        "university_ids",
+        "faculty_ids",
+        "faculty_university",
+        "fk_ptr",
+        "fk_faculty",
+        "fk_score",
+        "publication_ids",
+        "pk_ptr",
+        "pk_publication",
+        "pk_score",
+        "uk_ptr",
+        "uk_keyword",
+        "uk_count",
+        "ct_ptr",
+        "ct_year",
+        "ct_total",
+    )
+    STRINGS = (
+        "keyword_names",
+        "university_names",
+        "faculty_names",
+        "publication_titles",
+        "graph_universities",
+        "graph_keywords",
+        "citation_keywords",
+    )
+
+    def __init__(self, path=SNAPSHOT_DIR):
+        with open(os.path.join(path, "snapshot.json")) as f:
+            self.meta = json.load(f)
+        if self.meta.get("version") != FORMAT_VERSION:
+            raise RuntimeError(
+                f"Snapshot in {path} has format {self.meta.get('version')}, "
+                f"expected {FORMAT_VERSION}; export it again."
+            )
+        # snapshot.json names the version subdirectory holding the files
+        path = os.path.join(path, self.meta.get("directory", ""))
+        self.path = path
+        for name in self.ARRAYS:
+            array = np.load(os.path.join(path, f"{name}.npy"), mmap_mode="r")
+            setattr(self, name, array)
+        for name in self.STRINGS:
+            setattr(self, name, StringColumn(path, name))
+        self._keyword_rows = None
+
+    # MySQL read paths
+
+    def _keyword_row(self, keyword_id):
+        row = int(np.searchsorted(self.keyword_ids, keyword_id))
+        if row < len(self.keyword_ids) and self.keyword_ids[row] == keyword_id:
+            return row
+        return None
+
+    def keyword_id(self, keyword):
+        # Lowest id wins for duplicate names, like the MySQL lookup by id order
+        if self._keyword_rows is None:
+            rows = {}
+            for keyword_id, name in self.all_keywords():
+                rows.setdefault(name.strip().lower(), keyword_id)
+            self._keyword_rows = rows
+        return self._keyword_rows.get((keyword or "").strip().lower())
+
+    def all_keywords(self):
+        return list(zip(self.keyword_ids.tolist(), self.keyword_names.tolist()))
+
+    def _faculty_scores(self, rows_weights):
+        # (faculty ids, summed weighted scores) over the given keyword rows
+        faculty, scores = [], []
+        for row, weight in rows_weights:
+            part = slice(self.fk_ptr[row], self.fk_ptr[row + 1])
+            faculty.append(self.fk_faculty[part])
+            scores.append(self.fk_score[part] * weight)
+        return _sum_by(faculty, scores)
+
+    def _publication_scores(self, rows_weights):
+        publications, scores = [], []
+        for row, weight in rows_weights:
+            part = slice(self.pk_ptr[row], self.pk_ptr[row + 1])
+            publications.append(self.pk_publication[part])
+            scores.append(self.pk_score[part] * weight)
+        return _sum_by(publications, scores)
+
+    def _entity_scores(self, kind, rows_weights):
+        # (entity ids, scores) for every entity matching the keywords
+        if kind == "publications":
+            return self._publication_scores(rows_weights)
+        faculty, scores = self._faculty_scores(rows_weights)
+        if kind == "professors":
+            return faculty, np.round(scores, 6)
+        positions = np.searchsorted(self.faculty_ids, faculty)
+        universities = self.faculty_university[positions]
+        # -1 marks faculty without a university
+        known = universities >= 0
+        return _sum_by([universities[known]], [scores[known]], decimals=6)
+
+    def _name(self, kind, entity_id):
+        ids, names = {
+            "universities": (self.university_ids, self.university_names),
+            "professors": (self.faculty_ids, self.faculty_names),
+            "publications": (self.publication_ids, self.publication_titles),
+        }[kind]
+        return names[int(np.searchsorted(ids, entity_id))]
+
+    def _top(self, kind, rows_weights, limit):
+        ids, scores = self._entity_scores(kind, rows_weights)
+        order = np.lexsort((ids, -scores))[:limit]
+        return [(self._name(kind, ids[i]), float(scores[i])) for i in order]
+
+    def weighted_rankings(self, weights, limit=5):
+        rows_weights = []
+        for keyword_id, weight in weights:
+            row = self._keyword_row(keyword_id)
+            if row is not None:
+                rows_weights.append((row, float(weight)))
+        return {
+            kind: self._top(kind, rows_weights, limit)
+            for kind in ("universities", "professors", "publications")
+        }
+
+    def keyword_rankings(self, keyword_id):
+        return self.weighted_rankings([(keyword_id, 1.0)])
+
+    def keyword_rankings_by_name(self, keyword):
+        keyword_id = self.keyword_id(keyword)
+        if keyword_id is None:
+            raise ValueError(
+                f"Keyword '{(keyword or '').strip().lower()}' does not exist in the "
+                "database."
+            )
+        return self.keyword_rankings(keyword_id)
+
+    def ranking_page(
+        self, keyword_id, kind, sort="score", descending=True, after=None, limit=10
+    ):
+        # Same contract as mysql_utils.get_ranking_page
+        if kind not in ("universities", "professors", "publications"):
+            raise ValueError(f"Unknown ranking '{kind}'.")
+        if sort not in ("score", "name"):
+            raise ValueError(f"Cannot sort {kind} by '{sort}'.")
+        row = self._keyword_row(keyword_id)
+        ids, scores = self._entity_scores(
+            kind, [(row, 1.0)] if row is not None else []
+        )
+        if sort == "score":
+            order = np.lexsort((ids, scores))
+            if descending:
+                order = order[::-1]
+            if after is not None:
+                value, entity_id = after
+                values, ordered_ids = scores[order], ids[order]
+                tied = values == value
+                if descending:
+                    keep = (values < value) | (tied & (ordered_ids < entity_id))
+                else:
+                    keep = (values > value) | (tied & (ordered_ids > entity_id))
+                order = order[keep]
+            selected = [
+                (int(ids[i]), self._name(kind, ids[i]), float(scores[i]))
+                for i in order[: limit + 1]
+            ]
+        else:
+            entries = sorted(
+                (self._name(kind, entity_id), int(entity_id), float(score))
+                for entity_id, score in zip(ids, scores)
+            )
+            if descending:
+                entries.reverse()
+            if after is not None:
+                after = tuple(after)
+                entries = [
+                    entry
+                    for entry in entries
+                    if (entry[:2] < after if descending else entry[:2] > after)
+                ]
+            selected = [
+                (entity_id, name, score)
+                for name, entity_id, score in entries[: limit + 1]
+            ]
+
+        page = selected[:limit]
+        following = None
+        if len(selected) > limit:
+            entity_id, name, score = page[-1]
+            following = (score if sort == "score" else name, entity_id)
+        return {"rows": page, "next": following}
+
+    # Neo4j read paths
+
+    def all_universities(self):
+        return self.graph_universities.tolist()
+
+    def top_keywords_by_university(self, university_name):
+        row = self.graph_universities.position(university_name)
+        if row is None:
+            return []
+        # Pairs are stored most frequent first
+        start = self.uk_ptr[row]
+        part = slice(start, min(self.uk_ptr[row + 1], start + 10))
+        return [
+            {"keyword": self.graph_keywords[k], "count": int(c)}
+            for k, c in zip(self.uk_keyword[part], self.uk_count[part])
+        ]
+
+    def keyword_distributions(self, university_names):
+        distributions = {}
+        for name in dict.fromkeys(university_names):
+            row = self.graph_universities.position(name)
+            if row is None:
+                distributions[name] = []
+                continue
+            part = slice(self.uk_ptr[row], self.uk_ptr[row + 1])
+            distributions[name] = [
+                {"keyword": self.graph_keywords[k], "count": int(c)}
+                for k, c in zip(self.uk_keyword[part], self.uk_count[part])
+            ]
+        return distributions
+
+    def citation_trends(self, keyword_names):
+        trends = {}
+        for name in keyword_names:
+            name = name.strip().lower()
+            row = self.citation_keywords.position(name)
+            if row is None:
+                trends[name] = []
+                continue
+            part = slice(self.ct_ptr[row], self.ct_ptr[row + 1])
+            trends[name] = [
+                {"year": int(year), "totalCitations": int(total)}
+                for year, total in zip(self.ct_year[part], self.ct_total[part])
+            ]
+        return trends
+
+
+def _sum_by(keys, values, decimals=None):
+    # Groups concatenated keys and sums their values: (unique keys, sums)
+    keys = np.concatenate(keys) if keys else np.empty(0, dtype=np.int64)
+    values = np.concatenate(values) if values else np.empty(0, dtype=np.float64)
+    unique, inverse = np.unique(keys, return_inverse=True)
+    sums = np.bincount(inverse, weights=values, minlength=len(unique))
+    if decimals is not None:
+        sums = np.round(sums, decimals)
+    return unique, sums
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def enabled():
+    return DATA_BACKEND == "snapshot"
+
+
+def get_store():
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = Snapshot(SNAPSHOT_DIR)
+    return _store
+
+
+def reset():
+    # Drops the mapped snapshot; the next call loads SNAPSHOT_DIR again
+    global _store
+    with _store_lock:
+        _store = None
+
+
+def serves(method):
+    # Decorator for a mysql_utils/neo4j_utils read function: with
+    # DATA_BACKEND=snapshot the call is answered by Snapshot.<method> instead.
+    # Goes between @cache.cached and @instrumentation.instrumented.
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            if not enabled():
+                return func(*args, **kwargs)
+            with instrumentation.track("snapshot", method, args) as probe:
+                result = getattr(get_store(), method)(*args, **kwargs)
+                probe.rows = instrumentation.count_rows(result)
+            return result
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,251 @@
+import argparse
+import json
+import os
+import shutil
+import time
+import uuid
+import numpy as np
+from db import mysql_utils, neo4j_utils, snapshot
+
+FETCH_SIZE = 50000
+
+UNIVERSITY_KEYWORD_COUNTS_QUERY = """
+MATCH (i:INSTITUTE)<-[:AFFILIATION_WITH]-(f:FACULTY)-[:INTERESTED_IN]->(k:KEYWORD)
+RETURN i.name AS university, k.name AS keyword, COUNT(*) AS count
+"""
+
+CITATION_TOTALS_QUERY = """
+MATCH (k:KEYWORD)<-[:LABEL_BY]-(p:PUBLICATION)
+WHERE p.year IS NOT NULL
+RETURN toLower(k.name) AS keyword_name, p.year AS year,
+       SUM(p.numCitations) AS totalCitations
+"""
+
+
+def _fetch_columns(cursor, query, dtypes):
+    # One array per selected column, read in batches
+    cursor.execute(query)
+    columns = [[] for _ in dtypes]
+    while True:
+        rows = cursor.fetchmany(FETCH_SIZE)
+        if not rows:
+            break
+        for column, values, dtype in zip(columns, zip(*rows), dtypes):
+            column.append(np.asarray(values, dtype=dtype))
+    return [
+        np.concatenate(column) if column else np.empty(0, dtype=dtype)
+        for column, dtype in zip(columns, dtypes)
+    ]
+
+
+def _fetch_names(cursor, query):
+    # (sorted ids, names) for an "SELECT id, name ... ORDER BY id" query
+    cursor.execute(query)
+    rows = cursor.fetchall()
+    return (
+        np.asarray([row[0] for row in rows], dtype=np.int64),
+        [row[1] or "" for row in rows],
+    )
+
+
+def _group(keyword_ids, keywords, entity_ids, entities, scores):
+    # Drops pairs whose keyword or entity is unknown (as the joins would) and
+    # sorts the rest by keyword: (offsets, entities, scores)
+    known = np.isin(keywords, keyword_ids) & np.isin(entities, entity_ids)
+    keywords, entities, scores = keywords[known], entities[known], scores[known]
+    rows = np.searchsorted(keyword_ids, keywords)
+    order = np.argsort(rows, kind="stable")
+    return (
+        snapshot.grouped_offsets(rows, len(keyword_ids)),
+        entities[order],
+        scores[order],
+    )
+
+
+def _export_mysql():
+    with mysql_utils.pool.connection() as conn:
+        cursor = conn.cursor()
+        keyword_ids, keyword_names = _fetch_names(
+            cursor, "SELECT id, name FROM keyword ORDER BY id;"
+        )
+        university_ids, university_names = _fetch_names(
+            cursor, "SELECT id, name FROM university ORDER BY id;"
+        )
+        faculty_ids, faculty_names = _fetch_names(
+            cursor, "SELECT id, name FROM faculty ORDER BY id;"
+        )
+        (faculty_university,) = _fetch_columns(
+            cursor,
+            "SELECT COALESCE(university_id, -1) FROM faculty ORDER BY id;",
+            [np.int64],
+        )
+        publication_ids, publication_titles = _fetch_names(
+            cursor, "SELECT ID, title FROM publication ORDER BY ID;"
+        )
+        faculty_keyword = _fetch_columns(
+            cursor,
+            "SELECT keyword_id, faculty_id, score FROM faculty_keyword;",
+            [np.int64, np.int64, np.float64],
+        )
+        publication_keyword = _fetch_columns(
+            cursor,
+            "SELECT keyword_id, publication_id, score FROM Publication_Keyword;",
+            [np.int64, np.int64, np.float64],
+        )
+        cursor.close()
+
+    faculty_university[~np.isin(faculty_university, university_ids)] = -1
+    fk_ptr, fk_faculty, fk_score = _group(
+        keyword_ids, faculty_keyword[0], faculty_ids, *faculty_keyword[1:]
+    )
+    pk_ptr, pk_publication, pk_score = _group(
+        keyword_ids, publication_keyword[0], publication_ids, *publication_keyword[1:]
+    )
+    arrays = {
+        "keyword_ids": keyword_ids,
+        "university_ids": university_ids,
+        "faculty_ids": faculty_ids,
+        "faculty_university": faculty_university,
+        "fk_ptr": fk_ptr,
+        "fk_faculty": fk_faculty,
+        "fk_score": fk_score,
+        "publication_ids": publication_ids,
+        "pk_ptr": pk_ptr,
+        "pk_publication": pk_publication,
+        "pk_score": pk_score,
+    }
+    strings = {
+        "keyword_names": keyword_names,
+        "university_names": university_names,
+        "faculty_names": faculty_names,
+        "publication_titles": publication_titles,
+    }
+    counts = {
+        "keywords": len(keyword_ids),
+        "universities": len(university_ids),
+        "faculty": len(faculty_ids),
+        "publications": len(publication_ids),
+        "faculty_keyword": len(fk_faculty),
+        "publication_keyword": len(pk_publication),
+    }
+    return arrays, strings, counts
+
+
+def _export_neo4j():
+    with neo4j_utils.get_driver().session() as session:
+        result = session.run(neo4j_utils.ALL_UNIVERSITIES_QUERY)
+        universities = list(dict.fromkeys(r["name"] for r in result))
+        pairs = [
+            (r["university"], r["keyword"], r["count"])
+            for r in session.run(UNIVERSITY_KEYWORD_COUNTS_QUERY)
+        ]
+        citations = [
+            (r["keyword_name"], r["year"], r["totalCitations"])
+            for r in session.run(CITATION_TOTALS_QUERY)
+        ]
+
+    # University keyword counts, grouped by university, most frequent first
+    university_rows = {name: i for i, name in enumerate(universities)}
+    keywords = sorted({keyword for _, keyword, _ in pairs})
+    keyword_rows = {keyword: i for i, keyword in enumerate(keywords)}
+    pairs = sorted(
+        (university_rows[university], -count, keyword)
+        for university, keyword, count in pairs
+        if university in university_rows
+    )
+    uk_rows = np.asarray([pair[0] for pair in pairs], dtype=np.int64)
+
+    # Citation totals, grouped by keyword, by year
+    citation_keywords = sorted({name for name, _, _ in citations})
+    citation_rows = {name: i for i, name in enumerate(citation_keywords)}
+    citations = sorted(
+        (citation_rows[name], year, total) for name, year, total in citations
+    )
+    ct_rows = np.asarray([row for row, _, _ in citations], dtype=np.int64)
+
+    arrays = {
+        "uk_ptr": snapshot.grouped_offsets(uk_rows, len(universities)),
+        "uk_keyword": np.asarray(
+            [keyword_rows[keyword] for _, _, keyword in pairs], dtype=np.int64
+        ),
+        "uk_count": np.asarray([-count for _, count, _ in pairs], dtype=np.int64),
+        "ct_ptr": snapshot.grouped_offsets(ct_rows, len(citation_keywords)),
+        "ct_year": np.asarray([year for _, year, _ in citations], dtype=np.int64),
+        "ct_total": np.asarray(
+            [total or 0 for _, _, total in citations], dtype=np.int64
+        ),
+    }
+    strings = {
+        "graph_universities": universities,
+        "graph_keywords": keywords,
+        "citation_keywords": citation_keywords,
+    }
+    counts = {
+        "graph_universities": len(universities),
+        "university_keyword_pairs": len(pairs),
+        "citation_points": len(citations),
+    }
+    return arrays, strings, counts
+
+
+def export(output_dir=snapshot.SNAPSHOT_DIR):
+    """Writes a snapshot of MySQL and Neo4j that DATA_BACKEND=snapshot reads.
+
+    Each export goes to a new version subdirectory of ``output_dir``, and
+    snapshot.json, which names it, is atomically replaced last, so readers
+    always find a complete snapshot; processes that already mapped the old
+    files keep reading them until restarted. Returns the metadata written to
+    snapshot.json.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    version = f"{time.strftime('%Y%m%dT%H%M%S')}-{uuid.uuid4().hex[:8]}"
+    staging = os.path.join(output_dir, f".{version}.tmp")
+    shutil.rmtree(staging, ignore_errors=True)
+    os.makedirs(staging)
+
+    mysql_arrays, mysql_strings, mysql_counts = _export_mysql()
+    neo4j_arrays, neo4j_strings, neo4j_counts = _export_neo4j()
+    for name, array in {**mysql_arrays, **neo4j_arrays}.items():
+        np.save(os.path.join(staging, f"{name}.npy"), array)
+    for name, values in {**mysql_strings, **neo4j_strings}.items():
+        snapshot.save_strings(staging, name, values)
+    os.replace(staging, os.path.join(output_dir, version))
+
+    path = os.path.join(output_dir, "snapshot.json")
+    previous = snapshot.read_meta(output_dir).get("directory")
+    meta = {
+        "version": snapshot.FORMAT_VERSION,
+        "directory": version,
+        "exported_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "counts": {**mysql_counts, **neo4j_counts},
+    }
+    with open(path + ".tmp", "w") as f:
+        json.dump(meta, f, indent=2)
+    os.replace(path + ".tmp", path)
+
+    # The previous version is kept for readers still loading it
+    for entry in os.listdir(output_dir):
+        directory = os.path.join(output_dir, entry)
+        if entry not in (version, previous) and os.path.isdir(directory):
+            shutil.rmtree(directory, ignore_errors=True)
+    return meta
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Export MySQL and Neo4j to a read-only snapshot"
+    )
+    parser.add_argument("--output", default=snapshot.SNAPSHOT_DIR)
+    args = parser.parse_args(argv)
+
+    started = time.perf_counter()
+    meta = export(args.output)
+    counts = ", ".join(f"{count} {name}" for name, count in meta["counts"].items())
+    print(
+        f"Exported snapshot to {args.output} in "
+        f"{time.perf_counter() - started:.1f}s ({counts})"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+import time
+from db.cache import LRUCache, ResultCache, SQLiteBackend
+
+
+def test_keyword_and_positional_calls_share_a_key():
+    results = ResultCache(local=LRUCache())
+    calls = []
+
+    @results.cached("rankings")
+    def rankings(keyword, limit=5):
+        calls.append((keyword, limit))
+        return [keyword] * limit
+
+    assert rankings("ai") == ["ai"] * 5
+    assert rankings(keyword="ai") == ["ai"] * 5
+    assert rankings("ai", limit=5) == ["ai"] * 5
+    assert rankings("ai", 5) == ["ai"] * 5
+    assert calls == [("ai", 5)]
+
+    rankings("ai", limit=2)
+    assert calls == [("ai", 5), ("ai", 2)]
+
+    rankings.invalidate(keyword="ai")
+    rankings("ai")
+    assert calls == [("ai", 5), ("ai", 2), ("ai", 5)]
+
+
+def test_sqlite_backend_round_trip(tmp_path):
+    backend = SQLiteBackend(str(tmp_path / "cache.db"))
+    backend.set("k", {"rows": [1, 2]}, ttl=60)
+    assert backend.get("k") == (True, {"rows": [1, 2]})
+    backend.delete("k")
+    assert backend.get("k") == (False, None)
+
+
+def _rows(backend):
+    return backend._connection().execute("SELECT key FROM cache").fetchall()
+
+
+def test_sqlite_backend_purges_expired_rows_on_write(tmp_path):
+    backend = SQLiteBackend(str(tmp_path / "cache.db"), purge_interval=0.05)
+    backend.set("expiring", 1, ttl=0.01)
+    backend.set("kept", 2)
+    time.sleep(0.1)
+
+    # Never read again, so only the purge can remove it
+    backend.set("new", 3, ttl=60)
+    assert sorted(_rows(backend)) == [("kept",), ("new",)]
+
+
+def test_sqlite_backend_purges_at_most_once_per_interval(tmp_path):
+    backend = SQLiteBackend(str(tmp_path / "cache.db"), purge_interval=3600)
+    backend.set("first", 1)
+    backend.set("expiring", 1, ttl=0.01)
+    time.sleep(0.05)
+    backend.set("other", 2)
+    assert ("expiring",) in _rows(backend)
+    assert backend.get("expiring") == (False, None)
+
+
+def test_backend_url_is_opened_on_first_use(tmp_path):
+    path = tmp_path / "cache.db"
+    results = ResultCache(local=LRUCache(), backend_url=f"sqlite:///{path}")
+    assert not path.exists()
+
+    results.set("rankings", ["ai"], args=("ai",))
+    assert isinstance(results.shared, SQLiteBackend)
+    assert path.exists()
+    assert results.shared.get(results._key("rankings", ("ai",), None)) == (
+        True,
+        ["ai"],
+    )
@@ -0,0 +1,93 @@
+import pytest
+from db import cache, mysql_utils
+from db.mysql_utils import ConnectionPool, Error
+
+
+class _Cursor:
+    def __init__(self, conn):
+        self.conn = conn
+
+    def execute(self, query, params=()):
+        if self.conn.fail_with is not None:
+            raise self.conn.fail_with
+
+    def fetchone(self):
+        return (1,)
+
+    def fetchall(self):
+        return []
+
+    def close(self):
+        pass
+
+
+class _Connection:
+    def __init__(self):
+        self.fail_with = None
+        self.closed = False
+        self.in_transaction = False
+
+    def cursor(self, prepared=False):
+        return _Cursor(self)
+
+    def start_transaction(self, readonly=False, isolation_level=None):
+        self.in_transaction = True
+
+    def commit(self):
+        self.in_transaction = False
+
+    def rollback(self):
+        self.in_transaction = False
+
+    def is_connected(self):
+        return not self.closed
+
+    def close(self):
+        self.closed = True
+
+
+@pytest.fixture
+def pool(monkeypatch):
+    pool = ConnectionPool(_Connection, size=2, max_overflow=0, timeout=1.0)
+    monkeypatch.setattr(mysql_utils, "pool", pool)
+    enabled = cache.result_cache.enabled
+    cache.result_cache.configure(enabled=False)
+    yield pool
+    cache.result_cache.configure(enabled=enabled)
+
+
+def _checkout(pool):
+    with pool.connection() as conn:
+        return conn
+
+
+@pytest.mark.parametrize(
+    "query",
+    [
+        lambda: mysql_utils.get_keyword_rankings(1),
+        lambda: mysql_utils.run_all_keyword_queries_transactional("ai"),
+        lambda: mysql_utils.get_weighted_rankings(((1, 1.0),)),
+    ],
+)
+def test_driver_error_discards_the_connection(pool, query):
+    conn = _checkout(pool)
+    conn.fail_with = Error("Lost connection to MySQL server during query")
+
+    with pytest.raises(RuntimeError):
+        query()
+
+    assert conn.closed
+    assert pool.stats()["idle"] == 0
+    assert pool.stats()["opened"] == 0
+    assert _checkout(pool) is not conn
+
+
+def test_other_errors_return_the_connection(pool):
+    conn = _checkout(pool)
+
+    with pytest.raises(ValueError):
+        with pool.connection():
+            raise ValueError("not a driver error")
+
+    assert not conn.closed
+    assert _checkout(pool) is conn
@@ -0,0 +1,27 @@
+import pytest
+from db import favorites, keyword_index
+from db.keyword_index import KeywordIndex
+
+
+@pytest.fixture(autouse=True)
+def keywords(monkeypatch):
+    index = KeywordIndex(
+        lambda: [(1, "Machine Learning"), (2, "machine vision"), (3, "data mining")]
+    )
+    monkeypatch.setattr(keyword_index, "keywords", index)
+    return index
+
+
+def test_topic_favorite_needs_an_exact_match():
+    assert favorites.resolve_favorite("topics", " MACHINE learning ") == {
+        "id": 1,
+        "name": "machine learning",
+    }
+    assert favorites.resolve_favorite("topics", "machine lerning") is None
+
+
+def test_typo_is_suggested_instead_of_saved():
+    suggestions = favorites.suggest_favorites("topics", "machine lerning")
+    assert suggestions[0] == "machine learning"
+    assert len(suggestions) == len(set(suggestions))
+    assert favorites.suggest_favorites("professors", "jon smith") == []
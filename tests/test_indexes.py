@@ -0,0 +1,61 @@
+import threading
+import time
+import pytest
+from db.keyword_index import KeywordIndex
+from db.university_index import UniversityIndex
+
+HERD = 20
+
+
+def _slow_loader(calls, rows):
+    def loader():
+        calls.append(threading.get_ident())
+        time.sleep(0.2)
+        return rows
+
+    return loader
+
+
+def _herd(func, size=HERD):
+    barrier = threading.Barrier(size)
+    results = [None] * size
+
+    def caller(i):
+        barrier.wait()
+        results[i] = func()
+
+    threads = [threading.Thread(target=caller, args=(i,)) for i in range(size)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+
+INDEXES = [
+    (KeywordIndex, [(1, "machine learning")], lambda index: index.suggest("mach")),
+    (UniversityIndex, ["Cornell University"], lambda index: index.search("corn")),
+]
+
+
+@pytest.mark.parametrize("index_class, rows, lookup", INDEXES)
+def test_first_lookups_load_once(index_class, rows, lookup):
+    calls = []
+    index = index_class(_slow_loader(calls, rows))
+    results = _herd(lambda: lookup(index))
+    assert len(calls) == 1
+    assert all(result == results[0] and result for result in results)
+
+
+@pytest.mark.parametrize("index_class, rows, lookup", INDEXES)
+def test_reload_does_not_block_lookups(index_class, rows, lookup):
+    calls = []
+    index = index_class(_slow_loader(calls, rows), refresh_interval=60.0)
+    index.refresh()
+    index._loaded_at -= 120
+    started = time.monotonic()
+    results = _herd(lambda: lookup(index))
+    # One caller reloads; the rest answer from the loaded index meanwhile
+    assert len(calls) == 2
+    assert all(result == results[0] and result for result in results)
+    assert time.monotonic() - started < 0.2 * 2
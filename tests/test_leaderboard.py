@@ -0,0 +1,92 @@
+import pytest
+from db import leaderboard, mysql_utils
+
+
+class _Cursor:
+    def __init__(self, dirty_batches):
+        self.dirty_batches = dirty_batches
+        self.rows = []
+
+    def execute(self, query, params=()):
+        if f"SELECT keyword_id FROM {leaderboard.DIRTY_TABLE}" in query:
+            self.rows = self.dirty_batches.pop(0) if self.dirty_batches else []
+        else:
+            self.rows = [(len(params),)]
+
+    def fetchone(self):
+        return self.rows[0]
+
+    def fetchall(self):
+        return self.rows
+
+    def close(self):
+        pass
+
+
+class _Connection:
+    def __init__(self, dirty_batches):
+        self.dirty_batches = dirty_batches
+
+    def cursor(self):
+        return _Cursor(self.dirty_batches)
+
+    def start_transaction(self):
+        pass
+
+    def commit(self):
+        pass
+
+    def rollback(self):
+        pass
+
+
+class _Pool:
+    def __init__(self, dirty_batches):
+        self.conn = _Connection(dirty_batches)
+
+    def connection(self):
+        pool = self
+
+        class _Checkout:
+            def __enter__(self):
+                return pool.conn
+
+            def __exit__(self, *exc):
+                return False
+
+        return _Checkout()
+
+
+@pytest.fixture
+def invalidated(monkeypatch):
+    calls = {"by_id": [], "by_name": []}
+    monkeypatch.setattr(
+        mysql_utils.get_keyword_rankings,
+        "invalidate",
+        lambda *args: calls["by_id"].append(args),
+    )
+    monkeypatch.setattr(
+        mysql_utils.run_all_keyword_queries_transactional,
+        "invalidate",
+        lambda *args: calls["by_name"].append(args),
+    )
+    return calls
+
+
+def test_build_invalidates_every_cached_ranking(monkeypatch, invalidated):
+    monkeypatch.setattr(mysql_utils, "pool", _Pool([]))
+    leaderboard.build()
+    assert invalidated == {"by_id": [()], "by_name": [()]}
+
+
+def test_refresh_invalidates_refreshed_keywords(monkeypatch, invalidated):
+    monkeypatch.setattr(mysql_utils, "pool", _Pool([[(3,), (7,)], [(9,)]]))
+    assert leaderboard.refresh() == 3
+    assert invalidated["by_id"] == [(3,), (7,), (9,)]
+    assert invalidated["by_name"] == [()]
+
+
+def test_refresh_with_nothing_dirty_keeps_cache(monkeypatch, invalidated):
+    monkeypatch.setattr(mysql_utils, "pool", _Pool([]))
+    assert leaderboard.refresh() == 0
+    assert invalidated == {"by_id": [], "by_name": []}
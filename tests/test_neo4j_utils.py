@@ -0,0 +1,230 @@
+import pytest
+from db import cache, clients, neo4j_utils
+
+# PROFILE output shaped like neo4j's ResultSummary.profile
+SEEK_PLAN = {
+    "operatorType": "ProduceResults@neo4j",
+    "children": [
+        {
+            "operatorType": "Projection@neo4j",
+            "children": [
+                {"operatorType": "NodeIndexSeek@neo4j", "children": []},
+            ],
+        }
+    ],
+}
+
+SCAN_PLAN = {
+    "operatorType": "ProduceResults@neo4j",
+    "children": [
+        {
+            "operatorType": "Filter@neo4j",
+            "children": [
+                {"operatorType": "NodeByLabelScan@neo4j", "children": []},
+                {"operatorType": "NodeIndexSeek@neo4j"},
+            ],
+        }
+    ],
+}
+
+
+def test_plan_operators_walks_children_depth_first():
+    assert neo4j_utils._plan_operators(SCAN_PLAN) == [
+        "ProduceResults@neo4j",
+        "Filter@neo4j",
+        "NodeByLabelScan@neo4j",
+        "NodeIndexSeek@neo4j",
+    ]
+    assert neo4j_utils._plan_operators({}) == [""]
+
+
+@pytest.mark.parametrize(
+    "plan, index_seek",
+    [
+        (SEEK_PLAN, True),
+        (SCAN_PLAN, False),
+        ({"operatorType": "AllNodesScan@neo4j"}, False),
+        ({"operatorType": "ProduceResults@neo4j"}, False),
+    ],
+)
+def test_index_seek_decision(plan, index_seek):
+    operators = neo4j_utils._plan_operators(plan)
+    assert neo4j_utils._uses_index_seek(operators) is index_seek
+
+
+def test_check_lookup_plans_reports_each_query(monkeypatch):
+    plans = {
+        neo4j_utils.CITATION_TREND_QUERY: SEEK_PLAN,
+        neo4j_utils.CITATION_SERIES_QUERY: SEEK_PLAN,
+        neo4j_utils.UNIVERSITY_KEYWORDS_QUERY: SCAN_PLAN,
+    }
+    monkeypatch.setattr(
+        neo4j_utils,
+        "profile_query",
+        lambda query, **params: neo4j_utils._plan_operators(plans[query]),
+    )
+    result = neo4j_utils.check_lookup_plans("Data Mining", "MIT")
+    assert result["citation_trend"]["index_seek"]
+    assert result["citation_series"]["index_seek"]
+    assert not result["university_keywords"]["index_seek"]
+    assert result["university_keywords"]["operators"][-1] == "NodeIndexSeek@neo4j"
+
+
+class _Session:
+    # Answers the trend queries from {name_lower: [node]}, where a node is
+    # {"series": [(year, total)] or None, "points": [(year, total)]}.
+    # Nodes listed under None have no name_lower (loaded after bootstrap)
+    # and are matched by name.
+    def __init__(self, graph, queries):
+        self.graph = graph
+        self.queries = queries
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def _live(self, keyword_names, nodes_of):
+        rows = []
+        for name in keyword_names:
+            totals = {}
+            for node in nodes_of(name):
+                for year, total in node["points"]:
+                    totals[year] = totals.get(year, 0) + total
+            rows += [
+                {"keyword_name": name, "year": year, "totalCitations": total}
+                for year, total in sorted(totals.items())
+            ]
+        return rows
+
+    def run(self, query, keyword_names):
+        self.queries.append((query, keyword_names))
+        if query == neo4j_utils.CITATION_SERIES_QUERY:
+            rows = []
+            for name in keyword_names:
+                for node in self.graph.get(name, []):
+                    series = node["series"]
+                    years = totals = None
+                    if series is not None:
+                        years, totals = [y for y, _ in series], [t for _, t in series]
+                    rows.append(
+                        {"keyword_name": name, "years": years, "totals": totals}
+                    )
+            return rows
+        if query == neo4j_utils.CITATION_TREND_QUERY:
+            return self._live(keyword_names, lambda name: self.graph.get(name, []))
+        if query == neo4j_utils.CITATION_TREND_BY_NAME_QUERY:
+            return self._live(
+                keyword_names,
+                lambda name: [
+                    node
+                    for node in self.graph.get(None, [])
+                    if node["name"].lower() == name
+                ],
+            )
+        return []
+
+
+class _Driver:
+    def __init__(self, graph):
+        self.graph = graph
+        self.queries = []
+
+    def session(self, **kwargs):
+        return _Session(self.graph, self.queries)
+
+    def close(self):
+        pass
+
+
+@pytest.fixture
+def use_graph():
+    enabled = cache.result_cache.enabled
+    cache.result_cache.configure(enabled=False)
+
+    def use(graph):
+        driver = _Driver(graph)
+        clients.registry.override("neo4j", driver)
+        return driver
+
+    try:
+        yield use
+    finally:
+        clients.registry.reset("neo4j")
+        cache.result_cache.configure(enabled=enabled)
+
+
+def _node(series=None, points=(), name=None):
+    return {"series": series, "points": list(points), "name": name}
+
+
+def test_seek_miss_is_no_data_without_a_scan(use_graph):
+    driver = use_graph({None: [_node(points=[(2021, 7)], name="New Keyword")]})
+    trends = neo4j_utils.get_citation_trends_by_keywords(["New Keyword", "unknown"])
+    assert trends == {"new keyword": [], "unknown": []}
+    assert [query for query, _ in driver.queries] == [
+        neo4j_utils.CITATION_SERIES_QUERY
+    ]
+
+
+def test_name_scan_fallback_behind_flag(use_graph, monkeypatch):
+    monkeypatch.setattr(neo4j_utils, "NAME_SCAN_FALLBACK", True)
+    driver = use_graph(
+        {
+            "indexed": [_node(series=[(2020, 5)])],
+            None: [_node(points=[(2021, 7)], name="New Keyword")],
+        }
+    )
+    trends = neo4j_utils.get_citation_trends_by_keywords(
+        ["Indexed", "New Keyword", "unknown"]
+    )
+    assert trends == {
+        "indexed": [{"year": 2020, "totalCitations": 5}],
+        "new keyword": [{"year": 2021, "totalCitations": 7}],
+        "unknown": [],
+    }
+    assert driver.queries[-1] == (
+        neo4j_utils.CITATION_TREND_BY_NAME_QUERY,
+        ["new keyword", "unknown"],
+    )
+
+
+@pytest.mark.parametrize("precomputed", [True, False])
+def test_duplicate_names_are_counted_once(use_graph, precomputed):
+    points = [(2019, 2), (2020, 3)]
+    driver = use_graph(
+        {"ml": [_node(series=points if precomputed else None, points=points)]}
+    )
+    trends = neo4j_utils.get_citation_trends_by_keywords(["ML", "ml", " Ml "])
+    assert trends == {
+        "ml": [
+            {"year": 2019, "totalCitations": 2},
+            {"year": 2020, "totalCitations": 3},
+        ]
+    }
+    assert all(names == ["ml"] for _, names in driver.queries)
+
+
+@pytest.mark.parametrize(
+    "first, second",
+    [
+        ([(2019, 2), (2020, 3)], [(2020, 10)]),
+        ([(2019, 2), (2020, 3)], None),
+    ],
+)
+def test_nodes_sharing_a_name_are_summed_per_year(use_graph, first, second):
+    use_graph(
+        {
+            "ml": [
+                _node(series=first, points=[(2019, 2), (2020, 3)]),
+                _node(series=second, points=[(2020, 10)]),
+            ]
+        }
+    )
+    assert neo4j_utils.get_citation_trends_by_keywords(["ml"]) == {
+        "ml": [
+            {"year": 2019, "totalCitations": 2},
+            {"year": 2020, "totalCitations": 13},
+        ]
+    }
@@ -0,0 +1,53 @@
+import pytest
+from db import cache, mysql_utils
+from benchmarks import dataset
+from benchmarks.stores import LocalStores
+
+
+@pytest.fixture(scope="module")
+def keyword_id():
+    # Few universities and many faculty per keyword, so summed scores tie
+    # and pages end inside groups of equal scores
+    data = dataset.generate(
+        universities=50, faculty=600, keywords=12, publications=800, seed=11
+    )
+    enabled = cache.result_cache.enabled
+    cache.result_cache.configure(enabled=False)
+    try:
+        with LocalStores(data, mongo=False):
+            yield data["keyword"][0][0]
+    finally:
+        cache.result_cache.configure(enabled=enabled)
+
+
+def _walk(keyword_id, kind, sort, descending, limit):
+    rows, after = [], None
+    for _ in range(1000):
+        page = mysql_utils.get_ranking_page(
+            keyword_id, kind, sort, descending, after, limit
+        )
+        assert len(page["rows"]) <= limit
+        rows += page["rows"]
+        after = page["next"]
+        if after is None:
+            return rows
+    pytest.fail(f"Paging {kind} by {sort} did not end")
+
+
+@pytest.mark.parametrize("kind", ["universities", "professors", "publications"])
+@pytest.mark.parametrize("sort", ["score", "name"])
+@pytest.mark.parametrize("descending", [True, False])
+def test_pages_return_every_row_once(keyword_id, kind, sort, descending):
+    everything = mysql_utils.get_ranking_page(
+        keyword_id, kind, sort, descending, limit=100000
+    )["rows"]
+    assert everything
+
+    rows = _walk(keyword_id, kind, sort, descending, limit=7)
+
+    ids = [row[0] for row in rows]
+    assert len(ids) == len(set(ids))
+    assert sorted(ids) == sorted(row[0] for row in everything)
+    column = 2 if sort == "score" else 1
+    keys = [(row[column], row[0]) for row in rows]
+    assert keys == sorted(keys, reverse=descending)
@@ -0,0 +1,145 @@
+import threading
+import time
+import pytest
+from db.singleflight import SingleFlight
+
+HERD = 20
+
+
+def _herd(flights, key, func, size=HERD):
+    # Runs size callers of the same key at once; returns (results, errors)
+    barrier = threading.Barrier(size)
+    results, errors = [None] * size, [None] * size
+
+    def caller(i):
+        barrier.wait()
+        try:
+            results[i] = flights.do(key, "test", func)
+        except Exception as e:
+            errors[i] = e
+
+    threads = [threading.Thread(target=caller, args=(i,)) for i in range(size)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results, errors
+
+
+def _slow(calls, value=None, error=None):
+    # Holds the leader long enough for the whole herd to join it
+    def func():
+        calls.append(threading.get_ident())
+        time.sleep(0.2)
+        if error is not None:
+            raise error
+        return value if value is not None else object()
+
+    return func
+
+
+def test_same_key_runs_once_and_shares_the_result():
+    flights, calls = SingleFlight(), []
+    results, errors = _herd(flights, "k", _slow(calls))
+    assert len(calls) == 1
+    assert errors == [None] * HERD
+    assert all(result is results[0] for result in results)
+    assert flights.stats() == {"test": {"leaders": 1, "coalesced": HERD - 1}}
+    assert flights.in_flight() == 0
+
+
+def test_error_reaches_every_waiter():
+    flights, calls = SingleFlight(), []
+    failure = RuntimeError("backend down")
+    results, errors = _herd(flights, "k", _slow(calls, error=failure))
+    assert len(calls) == 1
+    assert all(error is failure for error in errors)
+    assert results == [None] * HERD
+    assert flights.in_flight() == 0
+
+
+def test_next_call_after_completion_runs_again():
+    flights, calls = SingleFlight(), []
+    func = _slow(calls)
+    first = flights.do("k", "test", func)
+    second = flights.do("k", "test", func)
+    assert len(calls) == 2
+    assert first is not second
+
+    with pytest.raises(ValueError):
+        flights.do("k", "test", _slow(calls, error=ValueError()))
+    assert flights.do("k", "test", lambda: "recovered") == "recovered"
+
+
+def test_different_keys_do_not_coalesce():
+    flights, calls = SingleFlight(), []
+    started = threading.Barrier(2, timeout=5)
+
+    def func():
+        calls.append(threading.get_ident())
+        # Both calls must be running at once to get past the barrier
+        started.wait()
+        return len(calls)
+
+    threads = [
+        threading.Thread(target=flights.do, args=(key, "test", func))
+        for key in ("a", "b")
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(calls) == 2
+    assert flights.stats() == {"test": {"leaders": 2, "coalesced": 0}}
+
+
+def test_coalesce_keys_on_arguments():
+    flights, calls = SingleFlight(), []
+
+    @flights.coalesce("lookup")
+    def lookup(name, limit=10):
+        calls.append((name, limit))
+        return name
+
+    assert lookup("a") == "a"
+    assert lookup("a", limit=5) == "a"
+    assert calls == [("a", 10), ("a", 5)]
+
+    flights.enabled = False
+    lookup("a")
+    assert flights.stats()["lookup"] == {"leaders": 2, "coalesced": 0}
+
+
+def test_coalesce_treats_equivalent_calls_as_one():
+    flights, calls = SingleFlight(), []
+    started = threading.Event()
+    release = threading.Event()
+
+    @flights.coalesce("lookup")
+    def lookup(name, limit=10):
+        calls.append((name, limit))
+        started.set()
+        release.wait(5)
+        return name
+
+    leader = threading.Thread(target=lookup, args=("a",))
+    leader.start()
+    assert started.wait(5)
+    # Same bound arguments as lookup("a"), spelled differently
+    followers = [
+        threading.Thread(target=lookup, kwargs={"name": "a"}),
+        threading.Thread(target=lookup, args=("a", 10)),
+        threading.Thread(target=lookup, args=("a",), kwargs={"limit": 10}),
+    ]
+    for thread in followers:
+        thread.start()
+    deadline = time.monotonic() + 2
+    while flights.stats()["lookup"]["coalesced"] < len(followers):
+        if time.monotonic() > deadline:
+            break
+        time.sleep(0.01)
+    release.set()
+    for thread in [leader, *followers]:
+        thread.join()
+    assert calls == [("a", 10)]
+    assert flights.stats()["lookup"] == {"leaders": 1, "coalesced": 3}
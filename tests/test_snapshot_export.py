@@ -0,0 +1,58 @@
+import json
+import os
+import numpy as np
+import pytest
+from db import snapshot, snapshot_export
+
+
+@pytest.fixture
+def exports(monkeypatch):
+    # Each export writes one array whose value counts the exports so far
+    count = {"n": 0}
+
+    def export_mysql():
+        count["n"] += 1
+        return {"keyword_ids": np.asarray([count["n"]])}, {}, {"keywords": 1}
+
+    monkeypatch.setattr(snapshot_export, "_export_mysql", export_mysql)
+    monkeypatch.setattr(snapshot_export, "_export_neo4j", lambda: ({}, {}, {}))
+    return count
+
+
+def _versions(directory):
+    return sorted(
+        entry
+        for entry in os.listdir(directory)
+        if os.path.isdir(os.path.join(directory, entry))
+    )
+
+
+def test_export_points_snapshot_json_at_a_version(tmp_path, exports):
+    meta = snapshot_export.export(str(tmp_path))
+    assert _versions(tmp_path) == [meta["directory"]]
+    assert snapshot.read_meta(str(tmp_path)) == meta
+    keyword_ids = np.load(tmp_path / meta["directory"] / "keyword_ids.npy")
+    assert keyword_ids.tolist() == [1]
+
+
+def test_export_keeps_current_and_previous_versions(tmp_path, exports):
+    first = snapshot_export.export(str(tmp_path))
+    second = snapshot_export.export(str(tmp_path))
+    third = snapshot_export.export(str(tmp_path))
+    assert _versions(tmp_path) == sorted([second["directory"], third["directory"]])
+    assert first["directory"] not in _versions(tmp_path)
+    with open(tmp_path / "snapshot.json") as f:
+        assert json.load(f)["directory"] == third["directory"]
+
+
+def test_failed_export_leaves_previous_snapshot(tmp_path, exports, monkeypatch):
+    meta = snapshot_export.export(str(tmp_path))
+
+    def fail():
+        raise RuntimeError("Neo4j unavailable")
+
+    monkeypatch.setattr(snapshot_export, "_export_neo4j", fail)
+    with pytest.raises(RuntimeError):
+        snapshot_export.export(str(tmp_path))
+    assert snapshot.read_meta(str(tmp_path)) == meta
+    assert os.path.isdir(tmp_path / meta["directory"])
@@ -0,0 +1,210 @@
+import contextvars
+import json
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from functools import wraps
+import flask
+from dotenv import load_dotenv
+from db import instrumentation
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+TRACING_ENABLED = os.getenv("TRACING_ENABLED", "1") == "1"
+# Traces are appended to this file in the Chrome trace event format; open it
+# in chrome://tracing, Perfetto or speedscope. Unset to keep traces in memory.
+TRACE_FILE = os.getenv("TRACE_FILE")
+
+# Server-Timing metric for each span category; db spans are broken down by
+# backend
+TIMING_NAMES = {"callback": "callback", "figure": "figure", "serialize": "serialize"}
+
+_current = contextvars.ContextVar("trace", default=None)
+
+
+class Trace:
+    """Spans recorded while serving one request.
+
+    Spans carry wall-clock start times and the thread they ran on, so work
+    fanned out to other threads (see search.py) lines up in the timeline.
+    """
+
+    def __init__(self, name):
+        self.name = name
+        self.started = time.time()
+        self.spans = []
+        self.callback_ended = None
+        self._lock = threading.Lock()
+
+    def add(self, name, category, started, duration, **args):
+        with self._lock:
+            self.spans.append(
+                {
+                    "name": name,
+                    "cat": category,
+                    "ts": started,
+                    "dur": duration,
+                    "tid": threading.get_ident(),
+                    "args": args,
+                }
+            )
+
+    def timings(self):
+        # {Server-Timing metric: milliseconds}. Spans in the same category
+        # are summed, so parallel db calls can add up to more than the total.
+        totals = {}
+        with self._lock:
+            spans = list(self.spans)
+        for span in spans:
+            if span["cat"] == "db":
+                metric = span["args"].get("backend", "db")
+            else:
+                metric = TIMING_NAMES.get(span["cat"])
+            if metric is not None:
+                totals[metric] = totals.get(metric, 0.0) + span["dur"] * 1000
+        return totals
+
+    def chrome_events(self):
+        pid = os.getpid()
+        with self._lock:
+            spans = list(self.spans)
+        return [
+            {
+                "name": span["name"],
+                "cat": span["cat"],
+                "ph": "X",
+                "ts": round(span["ts"] * 1e6, 1),
+                "dur": round(span["dur"] * 1e6, 1),
+                "pid": pid,
+                "tid": span["tid"],
+                "args": span["args"],
+            }
+            for span in spans
+        ]
+
+
+def current_trace():
+    return _current.get()
+
+
+@contextmanager
+def span(name, category="app", **args):
+    # Records the block as a span of the current request; a no-op outside one
+    trace = _current.get()
+    if trace is None:
+        yield
+        return
+    started = time.time()
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        trace.add(name, category, started, time.perf_counter() - start, **args)
+
+
+def traced(func):
+    # Wraps a Dash callback. Dash serializes the callback's return value
+    # after it returns, so the time from here to after_request is recorded as
+    # the serialize span.
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        trace = _current.get()
+        try:
+            with span(func.__name__, "callback"):
+                return func(*args, **kwargs)
+        finally:
+            if trace is not None:
+                trace.callback_ended = time.time()
+
+    return wrapper
+
+
+def _record_query(event):
+    # Instrumentation listener: database helper calls become db spans
+    trace = _current.get()
+    if trace is not None:
+        trace.add(
+            f"{event.backend}.{event.function}",
+            "db",
+            event.started,
+            event.duration,
+            backend=event.backend,
+            rows=event.rows,
+            error=type(event.error).__name__ if event.error is not None else None,
+        )
+
+
+class TraceWriter:
+    # Appends events to a JSON array file; the closing bracket is optional in
+    # the Chrome trace format, so the file stays valid while it grows
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def write(self, events):
+        if not events:
+            return
+        lines = "".join(json.dumps(event) + ",\n" for event in events)
+        with self._lock:
+            with open(self.path, "a") as f:
+                if f.tell() == 0:
+                    f.write("[\n")
+                f.write(lines)
+
+
+def _request_name():
+    if flask.request.path.endswith("_dash-update-component"):
+        body = flask.request.get_json(silent=True) or {}
+        return f"callback {body.get('output', '?')}"
+    return f"{flask.request.method} {flask.request.path}"
+
+
+def install(server, trace_file=TRACE_FILE):
+    """Traces every request served by ``server``.
+
+    Adds a Server-Timing header with the time spent per database backend,
+    in callbacks, building figures and serializing, and appends each trace
+    to ``trace_file`` if set.
+    """
+    writer = TraceWriter(trace_file) if trace_file else None
+    instrumentation.add_listener(_record_query)
+
+    @server.before_request
+    def _start_trace():
+        flask.g.trace = Trace(_request_name())
+        flask.g.trace_token = _current.set(flask.g.trace)
+
+    @server.after_request
+    def _finish_trace(response):
+        trace = flask.g.get("trace")
+        if trace is None:
+            return response
+        now = time.time()
+        ended = trace.callback_ended
+        if ended is not None:
+            trace.add("serialize", "serialize", ended, now - ended)
+        trace.add(trace.name, "request", trace.started, now - trace.started)
+
+        timings = trace.timings()
+        timings["total"] = (now - trace.started) * 1000
+        response.headers["Server-Timing"] = ", ".join(
+            f"{metric};dur={ms:.1f}" for metric, ms in timings.items()
+        )
+        if writer is not None:
+            try:
+                writer.write(trace.chrome_events())
+            except OSError:
+                logger.warning(
+                    "Could not write trace to %s", writer.path, exc_info=True
+                )
+        return response
+
+    @server.teardown_request
+    def _end_trace(exc):
+        token = flask.g.pop("trace_token", None)
+        if token is not None:
+            _current.reset(token)
@@ -0,0 +1,112 @@
+import bisect
+import difflib
+import os
+import threading
+import time
+from db import neo4j_utils
+
+REFRESH_INTERVAL = float(os.getenv("UNIVERSITY_INDEX_REFRESH", "3600"))
+FUZZY_CUTOFF = 0.75
+
+
+class UniversityIndex:
+    """Sorted in-memory list of university names for type-ahead search.
+
+    Loaded from Neo4j on first use and reloaded once it is older than
+    ``refresh_interval`` seconds. If a reload fails the previous list keeps
+    being served.
+    """
+
+    def __init__(self, loader, refresh_interval=REFRESH_INTERVAL):
+        self.loader = loader
+        self.refresh_interval = refresh_interval
+        self._names = []
+        self._keys = []
+        self._loaded_at = None
+        self._lock = threading.Lock()
+        self._load_lock = threading.Lock()
+
+    def _load(self):
+        names = sorted(set(self.loader()), key=str.lower)
+        keys = [name.lower() for name in names]
+        with self._lock:
+            self._names, self._keys = names, keys
+            self._loaded_at = time.monotonic()
+
+    def _stale(self):
+        loaded_at = self._loaded_at
+        return loaded_at is None or time.monotonic() - loaded_at > self.refresh_interval
+
+    def _ensure_fresh(self):
+        # One thread loads at a time. Callers wait for the first load, then
+        # find the list loaded instead of each loading it again; once there
+        # is a list, they keep using it while another thread reloads.
+        if not self._stale():
+            return
+        if not self._load_lock.acquire(blocking=self._loaded_at is None):
+            return
+        try:
+            if not self._stale():
+                return
+            if self._loaded_at is None:
+                self._load()
+            else:
+                try:
+                    self._load()
+                except Exception:
+                    # Keep serving the stale list until the backend is back
+                    self._loaded_at = time.monotonic()
+        finally:
+            self._load_lock.release()
+
+    def refresh(self):
+        with self._load_lock:
+            self._load()
+
+    def names(self):
+        self._ensure_fresh()
+        return list(self._names)
+
+    def search(self, query, limit=20):
+        # Prefix matches first, then names containing the query as a word,
+        # then close fuzzy matches.
+        self._ensure_fresh()
+        names, keys = self._names, self._keys
+        query = (query or "").strip().lower()
+        if not query:
+            return names[:limit]
+
+        matches = []
+        start = bisect.bisect_left(keys, query)
+        for i in range(start, len(keys)):
+            if not keys[i].startswith(query) or len(matches) >= limit:
+                break
+            matches.append(names[i])
+
+        if len(matches) < limit:
+            seen = set(matches)
+            for name, key in zip(names, keys):
+                if name not in seen and f" {query}" in f" {key}":
+                    matches.append(name)
+                    if len(matches) >= limit:
+                        break
+
+        if len(matches) < limit:
+            # Typo tolerance: compare the query against the same-length start
+            # of each word in the name
+            seen = set(matches)
+            scored = []
+            for name, key in zip(names, keys):
+                if name in seen:
+                    continue
+                ratio = max(
+                    difflib.SequenceMatcher(None, query, word[: len(query)]).ratio()
+                    for word in [key] + key.split()
+                )
+                if ratio >= FUZZY_CUTOFF:
+                    scored.append((-ratio, name))
+            matches.extend(name for _, name in sorted(scored)[: limit - len(matches)])
+        return matches
+
+
+universities = UniversityIndex(neo4j_utils.get_all_universities)